@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+from metricas import EstatisticaLatencia
+
+
+class AgendadorChats:
+    """
+    Agenda o processamento das mensagens do bot:
+    - uma fila FIFO por chat (as mensagens de um chat são respondidas em ordem);
+    - chats diferentes são processados em paralelo;
+    - limites globais de concorrência para o trabalho pesado (LLM e ASR);
+    - descarte de carga: quando a fila do chat ou o total pendente estoura, 'enviar' retorna False.
+    """
+
+    def __init__(self, max_por_chat: int = 5, max_total: int = 100, limite_llm: int = 2, limite_asr: int = 1):
+        self.max_por_chat = max_por_chat
+        self.max_total = max_total
+        # Envolva as chamadas ao Ollama/Whisper com 'async with agendador.limite_llm' (ou limite_asr)
+        self.limite_llm = asyncio.Semaphore(limite_llm)
+        self.limite_asr = asyncio.Semaphore(limite_asr)
+
+        self._filas: dict[int, asyncio.Queue] = {}
+        self._workers: dict[int, asyncio.Task] = {}
+        self.pendentes = 0
+        self.descartadas = 0
+        self.concluidas = 0
+        self.falhas = 0
+        self.espera = EstatisticaLatencia()
+        self.servico = EstatisticaLatencia()
+
+    def enviar(self, chat_id: int, trabalho) -> bool:
+        """
+        Enfileira 'trabalho' (função sem argumentos que retorna um awaitable) na fila do chat.
+        Retorna False se a mensagem foi descartada por excesso de carga.
+        """
+        fila = self._filas.get(chat_id)
+        if fila is None:
+            fila = self._filas[chat_id] = asyncio.Queue()
+
+        if fila.qsize() >= self.max_por_chat or self.pendentes >= self.max_total:
+            self.descartadas += 1
+            return False
+
+        fila.put_nowait((trabalho, time.perf_counter()))
+        self.pendentes += 1
+        if chat_id not in self._workers:
+            self._workers[chat_id] = asyncio.create_task(self._worker(chat_id))
+        return True
+
+    async def _worker(self, chat_id: int) -> None:
+        fila = self._filas[chat_id]
+        try:
+            while not fila.empty():
+                trabalho, enfileirado_em = fila.get_nowait()
+                inicio = time.perf_counter()
+                self.espera.registrar(inicio - enfileirado_em)
+                try:
+                    await trabalho()
+                    self.concluidas += 1
+                except Exception:
+                    # O trabalho é responsável por avisar o usuário; o worker segue com a fila
+                    self.falhas += 1
+                finally:
+                    self.pendentes -= 1
+                    self.servico.registrar(time.perf_counter() - inicio)
+        finally:
+            # Chat ocioso: libera o worker e a fila
+            del self._workers[chat_id]
+            if fila.empty():
+                del self._filas[chat_id]
+
+    def metricas(self) -> dict:
+        return {
+            "chats_ativos": len(self._workers),
+            "pendentes": self.pendentes,
+            "concluidas": self.concluidas,
+            "falhas": self.falhas,
+            "descartadas": self.descartadas,
+            "espera_fila": self.espera.resumo(),
+            "tempo_servico": self.servico.resumo(),
+        }
@@ -0,0 +1,182 @@
+import importlib.util
+import json
+import time
+from pathlib import Path
+
+from audio import preparar
+from cache_traducao import normalizar_texto
+
+# Amostras em português usadas por benchmarks/asr.py para comparar os backends: referencias.jsonl
+# lista {"arquivo": ..., "texto": ...}; os áudios ficam na mesma pasta (OGG/Opus, como o Telegram
+# envia). Os áudios não vêm no repositório: grave as frases de referencias.jsonl antes de comparar.
+PASTA_AMOSTRAS = Path(__file__).parent / "amostras_asr"
+
+
+class BackendWhisper:
+    """openai-whisper (PyTorch). Suporta decodificação em lote de áudios curtos."""
+
+    nome = "whisper"
+    modulo = "whisper"
+
+    def carregar(self, modelo: str):
+        import whisper
+        return whisper.load_model(modelo)
+
+    def transcrever(self, modelo, audio, idioma: str) -> str:
+        return modelo.transcribe(audio, language=idioma)["text"]
+
+    def transcrever_lote(self, modelo, audios: list, idioma: str) -> list[str]:
+        """
+        Decodifica vários áudios curtos (até 30 s) em uma única passada do modelo,
+        empilhando os espectrogramas em um batch.
+        """
+        import torch
+        import whisper
+
+        mels = [
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(a)), n_mels=modelo.dims.n_mels)
+            for a in audios
+        ]
+        opcoes = whisper.DecodingOptions(language=idioma, fp16=modelo.device.type == "cuda")
+        resultados = whisper.decode(modelo, torch.stack(mels).to(modelo.device), opcoes)
+        return [r.text for r in resultados]
+
+    def memoria_mb(self, modelo) -> float:
+        """Estima a memória ocupada pelos pesos do modelo (em MB)."""
+        try:
+            total = sum(p.numel() * p.element_size() for p in modelo.parameters())
+            return total / (1024 * 1024)
+        except Exception:
+            return 0.0
+
+
+class BackendFasterWhisper:
+    """faster-whisper (CTranslate2) na CPU com pesos quantizados (int8 por padrão)."""
+
+    nome = "faster-whisper"
+    modulo = "faster_whisper"
+
+    def __init__(self, compute_type: str = "int8", cpu_threads: int = 0, beam_size: int = 1):
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.beam_size = beam_size
+
+    def carregar(self, modelo: str):
+        from faster_whisper import WhisperModel
+        return WhisperModel(modelo, device="cpu", compute_type=self.compute_type, cpu_threads=self.cpu_threads)
+
+    def transcrever(self, modelo, audio, idioma: str) -> str:
+        segmentos, _ = modelo.transcribe(audio, language=idioma, beam_size=self.beam_size)
+        return "".join(segmento.text for segmento in segmentos)
+
+    def transcrever_lote(self, modelo, audios: list, idioma: str) -> list[str]:
+        # O CTranslate2 já paraleliza cada áudio nas threads da CPU; em lote, um após o outro
+        return [self.transcrever(modelo, audio, idioma) for audio in audios]
+
+    def memoria_mb(self, modelo) -> float:
+        # Os pesos ficam fora do Python (CTranslate2); não entram no limite de memória
+        return 0.0
+
+
+BACKENDS = {
+    BackendWhisper.nome: BackendWhisper,
+    BackendFasterWhisper.nome: BackendFasterWhisper,
+}
+
+
+def backend_disponivel(nome: str) -> bool:
+    """O pacote do backend está instalado? (sem importá-lo, o que custa segundos)"""
+    return nome in BACKENDS and importlib.util.find_spec(BACKENDS[nome].modulo) is not None
+
+
+def criar_backend(nome: str):
+    try:
+        return BACKENDS[nome]()
+    except KeyError:
+        raise ValueError(f"Backend de ASR desconhecido: {nome} (use um de {', '.join(BACKENDS)})") from None
+
+
+# --- Comparação dos backends ---
+
+def taxa_erro_palavras(referencia: str, hipotese: str) -> float:
+    """WER: distância de edição entre as palavras (normalizadas) dividida pelo tamanho da referência."""
+    ref = normalizar_texto(referencia).split()
+    hip = normalizar_texto(hipotese).split()
+    if not ref:
+        return 0.0 if not hip else 1.0
+    anterior = list(range(len(hip) + 1))
+    for i, palavra_ref in enumerate(ref, 1):
+        atual = [i] + [0] * len(hip)
+        for j, palavra_hip in enumerate(hip, 1):
+            atual[j] = min(anterior[j] + 1, atual[j - 1] + 1, anterior[j - 1] + (palavra_ref != palavra_hip))
+        anterior = atual
+    return anterior[-1] / len(ref)
+
+
+def carregar_amostras(pasta: Path = PASTA_AMOSTRAS) -> list[tuple[bytes, str]]:
+    """Lê as amostras de referência (bytes do áudio, texto esperado). Áudios ausentes são ignorados."""
+    referencias = pasta / "referencias.jsonl"
+    if not referencias.exists():
+        return []
+    amostras = []
+    for linha in referencias.read_text(encoding="utf-8").splitlines():
+        if not linha.strip():
+            continue
+        registro = json.loads(linha)
+        caminho = pasta / registro["arquivo"]
+        if caminho.exists():
+            amostras.append((caminho.read_bytes(), registro["texto"]))
+    return amostras
+
+
+def avaliar(backend, modelo: str, amostras: list, idioma: str = "pt") -> dict:
+    """Carrega o modelo e mede WER médio e tempo de transcrição nas amostras (já decodificadas)."""
+    inicio = time.perf_counter()
+    carregado = backend.carregar(modelo)
+    carga = time.perf_counter() - inicio
+
+    erros, duracao = [], 0.0
+    for audio, texto in amostras:
+        inicio = time.perf_counter()
+        hipotese = backend.transcrever(carregado, audio, idioma)
+        duracao += time.perf_counter() - inicio
+        erros.append(taxa_erro_palavras(texto, hipotese))
+    return {
+        "backend": backend.nome,
+        "modelo": modelo,
+        "wer": round(sum(erros) / len(erros), 3),
+        "segundos": round(duracao, 2),
+        "carga_s": round(carga, 2),
+    }
+
+
+def escolher_backend(candidatos: list[tuple[str, str]], limiar_wer: float, idioma: str = "pt",
+                     amostras: list | None = None, log=print) -> tuple[str, str, list[dict]]:
+    """
+    Avalia cada (backend, modelo) nas amostras e escolhe o mais rápido com WER <= limiar_wer
+    (ou, se nenhum atingir o limiar, o de menor WER). Sem amostras, fica com o primeiro
+    candidato instalado, sem verificar a qualidade (com um aviso no log).
+    Retorna (backend, modelo, relatório).
+    """
+    instalados = [c for c in candidatos if backend_disponivel(c[0])]
+    for nome_backend in sorted({c[0] for c in candidatos} - {c[0] for c in instalados}):
+        log(f"{nome_backend} não está instalado")
+    if not instalados:
+        return (*candidatos[0], [])
+
+    if amostras is None:
+        amostras = carregar_amostras()
+    if not amostras:
+        log("⚠️ Sem áudios de referência em amostras_asr/: usando o primeiro candidato instalado, sem medir o WER")
+        return (*instalados[0], [])
+    decodificadas = [(preparar(dados), texto) for dados, texto in amostras]
+
+    relatorio = []
+    for nome_backend, modelo in instalados:
+        resultado = avaliar(criar_backend(nome_backend), modelo, decodificadas, idioma)
+        log(f"{nome_backend}/{modelo}: WER {resultado['wer']:.1%} em {resultado['segundos']}s")
+        relatorio.append(resultado)
+
+    aprovados = [r for r in relatorio if r["wer"] <= limiar_wer]
+    escolhido = min(aprovados, key=lambda r: r["segundos"]) if aprovados else min(relatorio, key=lambda r: r["wer"])
+    return escolhido["backend"], escolhido["modelo"], relatorio
@@ -0,0 +1,76 @@
+import subprocess
+from io import BytesIO
+
+import numpy as np
+
+# Formato esperado pelo Whisper: mono, 16 kHz, float32 em [-1, 1]
+TAXA_AMOSTRAGEM = 16000
+
+
+def _decodificar_pyav(dados: bytes) -> np.ndarray:
+    """Decodifica em memória com PyAV (libav no próprio processo, sem ffmpeg externo)."""
+    import av
+
+    blocos = []
+    with av.open(BytesIO(dados)) as container:
+        reamostrador = av.AudioResampler(format="flt", layout="mono", rate=TAXA_AMOSTRAGEM)
+        for quadro in container.decode(audio=0):
+            for convertido in reamostrador.resample(quadro):
+                blocos.append(convertido.to_ndarray().reshape(-1))
+        # Esvazia o buffer interno do reamostrador
+        for convertido in reamostrador.resample(None):
+            blocos.append(convertido.to_ndarray().reshape(-1))
+    if not blocos:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(blocos).astype(np.float32, copy=False)
+
+
+def _decodificar_ffmpeg(dados: bytes) -> np.ndarray:
+    """Alternativa sem PyAV: ffmpeg lendo do stdin e escrevendo no stdout (sem arquivos em disco)."""
+    comando = [
+        "ffmpeg", "-nostdin", "-loglevel", "error", "-i", "pipe:0",
+        "-f", "f32le", "-ac", "1", "-ar", str(TAXA_AMOSTRAGEM), "pipe:1",
+    ]
+    saida = subprocess.run(comando, input=dados, capture_output=True, check=True).stdout
+    return np.frombuffer(saida, dtype=np.float32)
+
+
+def decodificar(dados: bytes) -> np.ndarray:
+    """Decodifica o áudio (OGG/Opus das mensagens de voz) para um array float32 mono de 16 kHz."""
+    try:
+        return _decodificar_pyav(dados)
+    except ImportError:
+        return _decodificar_ffmpeg(dados)
+
+
+def aparar_silencio(audio: np.ndarray, limiar_db: float = -40.0, janela_s: float = 0.02,
+                    margem_s: float = 0.2) -> np.ndarray:
+    """
+    Remove o silêncio do início e do fim: janelas com energia (RMS) abaixo de 'limiar_db'
+    em relação ao pico são descartadas, mantendo 'margem_s' de folga em cada ponta.
+    """
+    janela = int(TAXA_AMOSTRAGEM * janela_s)
+    n_janelas = len(audio) // janela
+    if n_janelas == 0:
+        return audio
+
+    quadros = audio[:n_janelas * janela].reshape(n_janelas, janela)
+    rms = np.sqrt(np.mean(quadros * quadros, axis=1))
+    pico = float(rms.max())
+    if pico == 0.0:
+        return audio[:0]
+
+    ativos = np.flatnonzero(rms >= pico * 10 ** (limiar_db / 20))
+    margem = int(TAXA_AMOSTRAGEM * margem_s)
+    inicio = max(0, ativos[0] * janela - margem)
+    fim = min(len(audio), (ativos[-1] + 1) * janela + margem)
+    return audio[inicio:fim]
+
+
+def preparar(dados: bytes) -> np.ndarray:
+    """Bytes da mensagem de voz -> array pronto para o Whisper (decodificado e sem silêncio nas pontas)."""
+    return aparar_silencio(decodificar(dados))
+
+
+def duracao_s(audio: np.ndarray) -> float:
+    return len(audio) / TAXA_AMOSTRAGEM
@@ -0,0 +1,212 @@
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from indices import BUSCA_NOMES, INDICES
+from metricas import EstatisticaLatencia
+
+CAMINHO_BANCO = "brasileirao.db"
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS times (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nome TEXT NOT NULL UNIQUE,
+        estado TEXT,
+        pontos INTEGER DEFAULT 0,
+        vitorias INTEGER DEFAULT 0,
+        empates INTEGER DEFAULT 0,
+        derrotas INTEGER DEFAULT 0,
+        saldo_gols INTEGER DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS partidas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        data DATE NOT NULL,
+        mandante_id INTEGER NOT NULL,
+        visitante_id INTEGER NOT NULL,
+        gols_mandante INTEGER,
+        gols_visitante INTEGER,
+        FOREIGN KEY (mandante_id) REFERENCES times(id),
+        FOREIGN KEY (visitante_id) REFERENCES times(id)
+    )
+    """,
+]
+
+
+def _sql_aplicar_partida(ref: str, sinal: str) -> str:
+    """
+    Atualiza os contadores de 'times' com o resultado da partida 'ref' (NEW ou OLD),
+    somando (sinal '+') ou subtraindo (sinal '-') a partida dos dois times.
+    """
+    comandos = []
+    for time_id, gols_pro, gols_contra in (
+        ("mandante_id", "gols_mandante", "gols_visitante"),
+        ("visitante_id", "gols_visitante", "gols_mandante"),
+    ):
+        gp, gc = f"{ref}.{gols_pro}", f"{ref}.{gols_contra}"
+        comandos.append(f"""
+        UPDATE times SET
+            pontos = pontos {sinal} (CASE WHEN {gp} > {gc} THEN 3 WHEN {gp} = {gc} THEN 1 ELSE 0 END),
+            vitorias = vitorias {sinal} ({gp} > {gc}),
+            empates = empates {sinal} ({gp} = {gc}),
+            derrotas = derrotas {sinal} ({gp} < {gc}),
+            saldo_gols = saldo_gols {sinal} ({gp} - {gc})
+        WHERE id = {ref}.{time_id};""")
+    return "".join(comandos)
+
+
+def _condicao_jogada(ref: str) -> str:
+    # Partidas sem placar (ainda não disputadas) não contam na classificação
+    return f"{ref}.gols_mandante IS NOT NULL AND {ref}.gols_visitante IS NOT NULL"
+
+
+# Triggers que mantêm a classificação em 'times' atualizada a cada partida inserida,
+# corrigida ou removida, sem precisar reprocessar todas as partidas
+SCHEMA += [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS partidas_classificacao_insert
+    AFTER INSERT ON partidas WHEN {_condicao_jogada("NEW")}
+    BEGIN {_sql_aplicar_partida("NEW", "+")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS partidas_classificacao_delete
+    AFTER DELETE ON partidas WHEN {_condicao_jogada("OLD")}
+    BEGIN {_sql_aplicar_partida("OLD", "-")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS partidas_classificacao_update_remove
+    AFTER UPDATE ON partidas WHEN {_condicao_jogada("OLD")}
+    BEGIN {_sql_aplicar_partida("OLD", "-")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS partidas_classificacao_update_adiciona
+    AFTER UPDATE ON partidas WHEN {_condicao_jogada("NEW")}
+    BEGIN {_sql_aplicar_partida("NEW", "+")}
+    END
+    """,
+]
+
+# Índices e busca de nomes (ver indices.py)
+SCHEMA += INDICES + BUSCA_NOMES
+
+# Pragmas aplicados em todas as conexões
+PRAGMAS = [
+    "PRAGMA journal_mode = WAL",       # leitores não bloqueiam o escritor (e vice-versa)
+    "PRAGMA synchronous = NORMAL",     # seguro com WAL e bem mais rápido que FULL
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA cache_size = -16000",      # ~16 MB de cache de páginas por conexão
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",    # 256 MB
+    "PRAGMA foreign_keys = ON",
+]
+
+
+def conectar(caminho: str = CAMINHO_BANCO, somente_leitura: bool = False) -> sqlite3.Connection:
+    """Abre uma conexão com os pragmas ajustados."""
+    conn = sqlite3.connect(caminho, check_same_thread=False)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    if somente_leitura:
+        # Garante que conexões de leitura nunca escrevam no banco
+        conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+def inicializar_schema(conn: sqlite3.Connection) -> None:
+    """Cria as tabelas caso não existam. Deve rodar uma única vez, na inicialização."""
+    for comando in SCHEMA:
+        conn.execute(comando)
+    conn.commit()
+
+
+class PoolConexoes:
+    """
+    Pool de conexões SQLite: várias conexões de leitura (para SELECTs) e um único
+    escritor serializado. O schema é criado uma vez, na construção do pool.
+    """
+
+    def __init__(self, caminho: str = CAMINHO_BANCO, max_leitores: int = 4, timeout: float = 30.0):
+        self.caminho = caminho
+        self.max_leitores = max_leitores
+        self.timeout = timeout
+
+        self._escritor = conectar(caminho)
+        inicializar_schema(self._escritor)
+        self._lock_escrita = threading.Lock()
+
+        self._leitores: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._lock_criacao = threading.Lock()
+        self._leitores_criados = 0
+
+        self.espera_leitura = EstatisticaLatencia()
+        self.espera_escrita = EstatisticaLatencia()
+
+    def _obter_leitor(self) -> sqlite3.Connection:
+        try:
+            return self._leitores.get_nowait()
+        except queue.Empty:
+            pass
+        # Cria conexões de leitura sob demanda, até o limite
+        with self._lock_criacao:
+            if self._leitores_criados < self.max_leitores:
+                self._leitores_criados += 1
+                try:
+                    return conectar(self.caminho, somente_leitura=True)
+                except Exception:
+                    # Devolve a vaga: senão cada falha reduziria o pool para sempre
+                    self._leitores_criados -= 1
+                    raise
+        return self._leitores.get(timeout=self.timeout)
+
+    @contextmanager
+    def leitura(self):
+        """Empresta uma conexão somente-leitura do pool."""
+        inicio = time.perf_counter()
+        conn = self._obter_leitor()
+        self.espera_leitura.registrar(time.perf_counter() - inicio)
+        try:
+            yield conn
+        finally:
+            # Encerra qualquer transação de leitura aberta antes de devolver a conexão
+            if conn.in_transaction:
+                conn.rollback()
+            self._leitores.put(conn)
+
+    @contextmanager
+    def escrita(self):
+        """Empresta a conexão de escrita (uma por vez). Faz commit ao final ou rollback em caso de erro."""
+        inicio = time.perf_counter()
+        if not self._lock_escrita.acquire(timeout=self.timeout):
+            raise TimeoutError("Tempo esgotado aguardando a conexão de escrita")
+        self.espera_escrita.registrar(time.perf_counter() - inicio)
+        try:
+            yield self._escritor
+            self._escritor.commit()
+        except Exception:
+            self._escritor.rollback()
+            raise
+        finally:
+            self._lock_escrita.release()
+
+    def estatisticas(self) -> dict:
+        return {
+            "leitores_criados": self._leitores_criados,
+            "leitores_livres": self._leitores.qsize(),
+            "espera_leitura": self.espera_leitura.resumo(),
+            "espera_escrita": self.espera_escrita.resumo(),
+        }
+
+    def fechar(self) -> None:
+        while True:
+            try:
+                self._leitores.get_nowait().close()
+            except queue.Empty:
+                break
+        self._escritor.close()
@@ -0,0 +1,109 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import aiosqlite
+
+from banco import CAMINHO_BANCO, PRAGMAS, SCHEMA
+from metricas import EstatisticaLatencia
+
+
+async def conectar_async(caminho: str = CAMINHO_BANCO, somente_leitura: bool = False) -> aiosqlite.Connection:
+    """Abre uma conexão aiosqlite (cada uma roda em sua própria thread) com os pragmas ajustados."""
+    conn = await aiosqlite.connect(caminho)
+    for pragma in PRAGMAS:
+        await conn.execute(pragma)
+    if somente_leitura:
+        await conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+class PoolAssincrono:
+    """
+    Versão assíncrona do PoolConexoes: leitores aiosqlite em paralelo e um único escritor
+    serializado por um asyncio.Lock. Nenhuma chamada bloqueia o event loop do servidor, mas
+    cada comando passa pela thread da conexão: com consultas rápidas (ou vindas do cache de
+    resultados) a vazão fica abaixo do pool síncrono (benchmarks/carga_mcp.py).
+
+    'fechar' precisa ser chamado no encerramento: cada conexão aiosqlite tem uma thread
+    que, aberta, impede o processo de terminar.
+    """
+
+    def __init__(self, caminho: str = CAMINHO_BANCO, max_leitores: int = 4, timeout: float = 30.0):
+        self.caminho = caminho
+        self.max_leitores = max_leitores
+        self.timeout = timeout
+        self._escritor: aiosqlite.Connection | None = None
+        self._lock_escrita = asyncio.Lock()
+        self._leitores: asyncio.LifoQueue[aiosqlite.Connection] = asyncio.LifoQueue()
+        self._leitores_criados = 0
+
+        self.espera_leitura = EstatisticaLatencia()
+        self.espera_escrita = EstatisticaLatencia()
+
+    async def abrir(self) -> "PoolAssincrono":
+        """Abre o escritor e cria o schema (uma única vez)."""
+        self._escritor = await conectar_async(self.caminho)
+        for comando in SCHEMA:
+            await self._escritor.execute(comando)
+        await self._escritor.commit()
+        return self
+
+    async def _obter_leitor(self) -> aiosqlite.Connection:
+        try:
+            return self._leitores.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        if self._leitores_criados < self.max_leitores:
+            # Reserva a vaga antes do await para não ultrapassar o limite
+            self._leitores_criados += 1
+            try:
+                return await conectar_async(self.caminho, somente_leitura=True)
+            except Exception:
+                self._leitores_criados -= 1
+                raise
+        return await asyncio.wait_for(self._leitores.get(), self.timeout)
+
+    @asynccontextmanager
+    async def leitura(self):
+        """Empresta uma conexão somente-leitura do pool."""
+        inicio = time.perf_counter()
+        conn = await self._obter_leitor()
+        self.espera_leitura.registrar(time.perf_counter() - inicio)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                await conn.rollback()
+            self._leitores.put_nowait(conn)
+
+    @asynccontextmanager
+    async def escrita(self):
+        """Empresta a conexão de escrita (uma por vez). Faz commit ao final ou rollback em caso de erro."""
+        inicio = time.perf_counter()
+        await asyncio.wait_for(self._lock_escrita.acquire(), self.timeout)
+        self.espera_escrita.registrar(time.perf_counter() - inicio)
+        try:
+            yield self._escritor
+            await self._escritor.commit()
+        except Exception:
+            await self._escritor.rollback()
+            raise
+        finally:
+            self._lock_escrita.release()
+
+    def estatisticas(self) -> dict:
+        return {
+            "leitores_criados": self._leitores_criados,
+            "leitores_livres": self._leitores.qsize(),
+            "espera_leitura": self.espera_leitura.resumo(),
+            "espera_escrita": self.espera_escrita.resumo(),
+        }
+
+    async def fechar(self) -> None:
+        while not self._leitores.empty():
+            await self._leitores.get_nowait().close()
+            self._leitores_criados -= 1
+        if self._escritor is not None:
+            await self._escritor.close()
+            self._escritor = None
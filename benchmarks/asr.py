@@ -0,0 +1,39 @@
+"""
+Compara os backends de ASR (asr.py) nas amostras de referência em português
+(amostras_asr/referencias.jsonl): WER, tempo de transcrição e tempo de carga do modelo,
+e sugere o backend para BACKEND_ASR (o mais rápido com WER até --limiar-wer). Os áudios
+não vêm no repositório: grave as frases de referencias.jsonl na pasta amostras_asr/.
+
+Uso (na raiz do repositório):
+    python -m benchmarks.asr --limiar-wer 0.25 --candidatos faster-whisper:small whisper:small whisper:base
+"""
+import argparse
+import sys
+
+from asr import carregar_amostras, escolher_backend
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limiar-wer", type=float, default=0.25)
+    parser.add_argument("--candidatos", nargs="+",
+                        default=["faster-whisper:small", "faster-whisper:base", "whisper:small", "whisper:base"])
+    args = parser.parse_args()
+
+    candidatos = [tuple(c.split(":", 1)) for c in args.candidatos]
+    amostras = carregar_amostras()
+    print(f"{len(amostras)} amostras de referência")
+    if not amostras:
+        print("Grave os áudios listados em amostras_asr/referencias.jsonl para comparar os backends.")
+        sys.exit(1)
+
+    backend, modelo, relatorio = escolher_backend(candidatos, args.limiar_wer, amostras=amostras)
+
+    print(f"\n{'backend':>15} | {'modelo':>8} | {'WER':>6} | {'transcrição (s)':>15} | {'carga (s)':>9}")
+    for r in relatorio:
+        print(f"{r['backend']:>15} | {r['modelo']:>8} | {r['wer']:>6.1%} | {r['segundos']:>15.2f} | {r['carga_s']:>9.2f}")
+    print(f"\nsugerido para BACKEND_ASR/MODELO_ASR: {backend} / {modelo}")
+
+
+if __name__ == "__main__":
+    main()
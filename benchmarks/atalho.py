@@ -0,0 +1,67 @@
+"""
+Mede o atalho sem LLM (intencoes.py) sobre um conjunto de perguntas típicas: taxa de acerto
+e latência do reconhecimento, comparada com a latência de tradução pelo Ollama informada
+em --latencia-llm (veja o "Geração do LLM" nos logs do bot ou benchmarks.avaliacao_prompt).
+
+Uso (na raiz do repositório):
+    python -m benchmarks.atalho --banco brasileirao.db --latencia-llm 2.5
+"""
+import argparse
+import sqlite3
+
+from intencoes import IndiceTimes, InterpretadorIntencoes
+
+PERGUNTAS = [
+    "Mostre todos os times",
+    "Classificação",
+    "Qual a tabela atual?",
+    "Mostre a classificação com vitórias e derrotas",
+    "Mostre o nome e pontos do {time}",
+    "Quantos pontos tem o {time}?",
+    "Pontos do {time}",
+    "Dados do {time}",
+    "Quais times têm mais de 50 pontos?",
+    "Times com mais de 30 pontos",
+    "Crie um novo time chamado Botafogo",
+    "Adicione o time Palmeiras do estado São Paulo com 60 pontos",
+    # Perguntas que devem cair no LLM
+    "Adicione o Cruzeiro de Minas Gerais com 45 pontos, 15 vitórias, 0 empates, 5 derrotas e saldo de gols 10",
+    "Qual time tem o melhor saldo de gols?",
+    "Quantos times são de São Paulo?",
+    "Quem tem mais vitórias que derrotas?",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--banco", type=str, default="brasileirao.db")
+    parser.add_argument("--latencia-llm", type=float, default=2.5, help="segundos por tradução no Ollama")
+    parser.add_argument("--repeticoes", type=int, default=1000)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.banco)
+    nomes = [nome for (nome,) in conn.execute("SELECT nome FROM times")]
+    conn.close()
+
+    interpretador = InterpretadorIntencoes(IndiceTimes(nomes))
+    exemplo = nomes[0] if nomes else "Flamengo"
+    perguntas = [p.format(time=exemplo) for p in PERGUNTAS]
+
+    for pergunta in perguntas:
+        consulta = interpretador.interpretar(pergunta)
+        print(f"{'atalho' if consulta else 'LLM':>6} | {pergunta[:60]:<60} | {consulta.sql_literal() if consulta else ''}")
+
+    for _ in range(args.repeticoes):
+        for pergunta in perguntas:
+            interpretador.interpretar(pergunta)
+
+    estatisticas = interpretador.estatisticas(args.latencia_llm)
+    latencia_ms = estatisticas["latencia"]["media_ms"]
+    print(f"\n{len(nomes)} times indexados, taxa de acerto {estatisticas['taxa_acerto']:.0%}")
+    print(f"reconhecimento: média {latencia_ms * 1000:.0f} µs, p95 {estatisticas['latencia']['p95_ms'] * 1000:.0f} µs")
+    print(f"latência média por pergunta: {args.latencia_llm * 1000:.0f} ms só com LLM -> "
+          f"{(1 - estatisticas['taxa_acerto']) * args.latencia_llm * 1000 + latencia_ms:.0f} ms com o atalho")
+
+
+if __name__ == "__main__":
+    main()
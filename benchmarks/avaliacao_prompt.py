@@ -0,0 +1,82 @@
+"""
+Mede o tempo de avaliação do prompt de tradução no Ollama (prompt_eval_duration) com e sem
+reaproveitamento do preâmbulo fixo (PROMPT_TRADUCAO).
+
+- "sem reuso": keep_alive=0, o modelo é descarregado depois de cada pergunta, então cada uma
+  paga a carga do modelo e a avaliação do prompt inteiro (o que acontecia sempre que o bot
+  ficava ocioso mais que o keep_alive padrão de 5 minutos);
+- "com reuso": uma requisição de aquecimento e depois as perguntas com o KEEP_ALIVE de
+  configuracao_llm.py; só os tokens da pergunta nova são avaliados.
+
+Precisa de um Ollama rodando com o modelo configurado.
+
+Uso (na raiz do repositório):
+    python -m benchmarks.avaliacao_prompt --repeticoes 3
+"""
+import argparse
+import asyncio
+import statistics
+
+import ollama
+
+from configuracao_llm import KEEP_ALIVE, MODELO_LLM, NUM_CTX, montar_prompt, opcoes_ollama
+
+PERGUNTAS = [
+    "Quais times têm mais de 40 pontos?",
+    "Mostre o saldo de gols do Palmeiras",
+    "Quantas vitórias tem o Grêmio?",
+    "Liste os times de Minas Gerais",
+    "Mostre os 5 primeiros colocados",
+]
+
+
+async def perguntar(cliente: ollama.AsyncClient, pergunta: str, keep_alive) -> dict:
+    resposta = await cliente.chat(
+        model=MODELO_LLM,
+        messages=[{"role": "user", "content": montar_prompt(pergunta)}],
+        # Como na tradução em streaming, só interessa a query; limita a geração
+        options={"num_ctx": NUM_CTX, "num_predict": 64, **opcoes_ollama()},
+        keep_alive=keep_alive,
+    )
+    return {
+        "carga_ms": (resposta.load_duration or 0) / 1e6,
+        "tokens_avaliados": resposta.prompt_eval_count or 0,
+        "avaliacao_ms": (resposta.prompt_eval_duration or 0) / 1e6,
+        "total_ms": (resposta.total_duration or 0) / 1e6,
+    }
+
+
+async def medir(cliente: ollama.AsyncClient, keep_alive, aquecer: bool, repeticoes: int) -> list[dict]:
+    if aquecer:
+        await perguntar(cliente, "Mostre todos os times", keep_alive)
+    amostras = []
+    for _ in range(repeticoes):
+        for pergunta in PERGUNTAS:
+            amostras.append(await perguntar(cliente, pergunta, keep_alive))
+    return amostras
+
+
+def resumir(amostras: list[dict]) -> dict:
+    return {chave: statistics.median(a[chave] for a in amostras) for chave in amostras[0]}
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    cliente = ollama.AsyncClient()
+    sem_reuso = resumir(await medir(cliente, 0, aquecer=False, repeticoes=args.repeticoes))
+    com_reuso = resumir(await medir(cliente, KEEP_ALIVE, aquecer=True, repeticoes=args.repeticoes))
+
+    print(f"modelo={MODELO_LLM} num_ctx={NUM_CTX} opções={opcoes_ollama()} (medianas por pergunta)")
+    print(f"{'modo':>10} | {'carga (ms)':>10} | {'tokens avaliados':>16} | {'avaliação (ms)':>14} | {'total (ms)':>10}")
+    for nome, r in (("sem reuso", sem_reuso), ("com reuso", com_reuso)):
+        print(f"{nome:>10} | {r['carga_ms']:>10.0f} | {r['tokens_avaliados']:>16.0f} | "
+              f"{r['avaliacao_ms']:>14.0f} | {r['total_ms']:>10.0f}")
+    if com_reuso["avaliacao_ms"]:
+        print(f"avaliação do prompt {sem_reuso['avaliacao_ms'] / com_reuso['avaliacao_ms']:.1f}x mais rápida com reuso")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+"""
+Teste de carga das ferramentas do servidor MCP: compara os backends 'sync' e 'async'
+medindo a vazão (consultas/s) conforme aumenta o número de clientes concorrentes.
+
+As ferramentas são chamadas como o servidor as registra: as do backend 'sync' rodam em
+threads do anyio (server.em_thread), cada uma com um leitor do pool, e as assíncronas são
+aguardadas no event loop. A consulta se repete, então quase todas as chamadas vêm do
+cache de resultados: o que se mede é o custo de cada backend por chamada. Com --sem-cache
+toda chamada vai ao SQLite, e a vazão mostra se os leitores do pool trabalham em paralelo.
+
+Uso (na raiz do repositório):
+    python -m benchmarks.carga_mcp --clientes 1 2 4 8 16 --consultas 50 --linhas 20000
+    python -m benchmarks.carga_mcp --clientes 1 4 --consultas 20 --sem-cache
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+
+import server
+from banco import PoolConexoes, inicializar_schema
+from banco_async import PoolAssincrono
+
+CONSULTA = "SELECT * FROM times WHERE nome LIKE '%9%' ORDER BY pontos DESC, saldo_gols DESC"
+
+
+def criar_banco_sintetico(caminho: str, linhas: int) -> None:
+    conn = sqlite3.connect(caminho)
+    inicializar_schema(conn)
+    conn.executemany(
+        "INSERT INTO times (nome, estado, pontos, vitorias, empates, derrotas, saldo_gols) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ((f"Time {i}", "SP", i % 100, i % 30, i % 10, i % 20, (i % 50) - 25) for i in range(linhas)),
+    )
+    conn.commit()
+    conn.close()
+
+
+async def rodar_clientes(ferramenta, clientes: int, consultas: int) -> float:
+    """Roda 'clientes' tarefas concorrentes, cada uma com 'consultas' chamadas. Retorna consultas/s."""
+    async def cliente():
+        for _ in range(consultas):
+            await ferramenta(query=CONSULTA)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente() for _ in range(clientes)))
+    return clientes * consultas / (time.perf_counter() - inicio)
+
+
+async def medir_backend(backend: str, caminho: str, niveis: list[int], consultas: int) -> dict:
+    if backend == "sync":
+        server.pool = PoolConexoes(caminho, max_leitores=max(niveis))
+        ferramenta = server.em_thread(server.ler_dados)
+    else:
+        server.pool_async = await PoolAssincrono(caminho, max_leitores=max(niveis)).abrir()
+        ferramenta = server.ler_dados_async
+
+    resultados = {}
+    for clientes in niveis:
+        resultados[clientes] = await rodar_clientes(ferramenta, clientes, consultas)
+
+    if backend == "sync":
+        server.pool.fechar()
+        server.pool = None
+    else:
+        await server.pool_async.fechar()
+        server.pool_async = None
+    return resultados
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clientes", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--consultas", type=int, default=50, help="consultas por cliente")
+    parser.add_argument("--linhas", type=int, default=20000, help="times no banco sintético")
+    parser.add_argument("--sem-cache", action="store_true", help="desativa o cache de resultados")
+    args = parser.parse_args()
+    if args.sem_cache:
+        server.cache_resultados.max_entradas = 0
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "carga.db")
+        criar_banco_sintetico(caminho, args.linhas)
+
+        vazoes = {}
+        for backend in ("sync", "async"):
+            vazoes[backend] = await medir_backend(backend, caminho, args.clientes, args.consultas)
+
+    print(f"{'clientes':>8} | {'sync (q/s)':>11} | {'async (q/s)':>11} | {'ganho':>6}")
+    for clientes in args.clientes:
+        sync_qps = vazoes["sync"][clientes]
+        async_qps = vazoes["async"][clientes]
+        print(f"{clientes:>8} | {sync_qps:>11.1f} | {async_qps:>11.1f} | {async_qps / sync_qps:>5.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
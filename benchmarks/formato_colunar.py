@@ -0,0 +1,71 @@
+"""
+Compara o formato atual do 'ler_dados' (lista de dicionários, um item de conteúdo por linha,
+indentado como o FastMCP faz) com o formato colunar compacto: tamanho do payload e tempo
+de codificação/decodificação até a lista de dicionários usada por renderizacao.renderizar_tabela.
+
+Uso (na raiz do repositório):
+    python -m benchmarks.formato_colunar --linhas 10000 20000 50000
+"""
+import argparse
+import json
+import time
+
+from formatos import codificar_colunar, linhas_como_dicts
+
+COLUNAS = ["id", "nome", "estado", "pontos", "vitorias", "empates", "derrotas", "saldo_gols"]
+
+
+def gerar_linhas(n: int) -> list[tuple]:
+    return [(i, f"Time {i}", "SP", i % 100, i % 30, i % 10, i % 20, (i % 50) - 25) for i in range(n)]
+
+
+# --- Formato atual: um TextContent por linha, JSON com indent=2 ---
+
+def codificar_atual(colunas, linhas) -> list[str]:
+    return [json.dumps(dict(zip(colunas, row)), ensure_ascii=False, indent=2) for row in linhas]
+
+
+def decodificar_atual(itens: list[str]) -> list[dict]:
+    return [json.loads(item) for item in itens]
+
+
+# --- Formato colunar: um único TextContent compacto ---
+
+def decodificar_colunar(texto: str) -> list[dict]:
+    return linhas_como_dicts(json.loads(texto))
+
+
+def cronometrar(funcao, *args, repeticoes: int = 5):
+    melhor, resultado = float("inf"), None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--linhas", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'linhas':>7} | {'formato':>8} | {'payload (KB)':>12} | {'codificar (ms)':>14} | {'decodificar (ms)':>16}")
+    for n in args.linhas:
+        linhas = gerar_linhas(n)
+
+        t_cod, itens = cronometrar(codificar_atual, COLUNAS, linhas, repeticoes=args.repeticoes)
+        t_dec, atual = cronometrar(decodificar_atual, itens, repeticoes=args.repeticoes)
+        tamanho = sum(len(item.encode("utf-8")) for item in itens)
+        print(f"{n:>7} | {'atual':>8} | {tamanho / 1024:>12.1f} | {t_cod * 1000:>14.1f} | {t_dec * 1000:>16.1f}")
+
+        t_cod, texto = cronometrar(codificar_colunar, COLUNAS, linhas, repeticoes=args.repeticoes)
+        t_dec, colunar = cronometrar(decodificar_colunar, texto, repeticoes=args.repeticoes)
+        tamanho = len(texto.encode("utf-8"))
+        print(f"{n:>7} | {'colunar':>8} | {tamanho / 1024:>12.1f} | {t_cod * 1000:>14.1f} | {t_dec * 1000:>16.1f}")
+
+        assert atual == colunar, "Os dois formatos devem produzir as mesmas linhas"
+
+
+if __name__ == "__main__":
+    main()
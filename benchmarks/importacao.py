@@ -0,0 +1,100 @@
+"""
+Compara a importação em lote (importar.py) com o laço linha a linha do populate_db.py
+(um cursor.execute por registro, pragmas padrão e um único commit no final).
+A carga em lote é medida com os triggers de classificação ativos (--incremental)
+e no modo padrão, que os suspende e aplica a diferença na classificação no final.
+
+Uso (na raiz do repositório):
+    python -m benchmarks.importacao --times 2000 --partidas 50000
+"""
+import argparse
+import csv
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from banco import conectar, inicializar_schema
+from importar import COLUNAS_PARTIDAS, COLUNAS_TIMES, importar, ler_registros
+
+
+def gerar_arquivos(pasta: str, n_times: int, n_partidas: int) -> tuple[str, str]:
+    aleatorio = random.Random(42)
+    caminho_times = os.path.join(pasta, "times.csv")
+    with open(caminho_times, "w", encoding="utf-8", newline="") as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(COLUNAS_TIMES)
+        for i in range(n_times):
+            escritor.writerow([f"Time {i}", "SP", 0, 0, 0, 0, 0])
+
+    caminho_partidas = os.path.join(pasta, "partidas.csv")
+    with open(caminho_partidas, "w", encoding="utf-8", newline="") as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(COLUNAS_PARTIDAS)
+        for i in range(n_partidas):
+            mandante, visitante = aleatorio.sample(range(n_times), 2)
+            data = f"{2000 + i // 5000}-{1 + (i // 400) % 12:02d}-{1 + (i // 13) % 28:02d}"
+            escritor.writerow([data, f"Time {mandante}", f"Time {visitante}",
+                               aleatorio.randint(0, 4), aleatorio.randint(0, 4)])
+    return caminho_times, caminho_partidas
+
+
+def carga_linha_a_linha(caminho_banco: str, caminho_times: str, caminho_partidas: str) -> float:
+    """Mesmo padrão do populate_db.py: um execute por registro e commit no final."""
+    conn = sqlite3.connect(caminho_banco)
+    inicializar_schema(conn)
+    cursor = conn.cursor()
+    inicio = time.perf_counter()
+    for r in ler_registros(caminho_times):
+        cursor.execute(
+            "INSERT INTO times (nome, estado, pontos, vitorias, empates, derrotas, saldo_gols) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (r["nome"], r["estado"], r["pontos"], r["vitorias"], r["empates"], r["derrotas"], r["saldo_gols"]),
+        )
+    for r in ler_registros(caminho_partidas):
+        cursor.execute("""
+            INSERT OR IGNORE INTO partidas (data, mandante_id, visitante_id, gols_mandante, gols_visitante)
+            VALUES (?, (SELECT id FROM times WHERE nome = ?), (SELECT id FROM times WHERE nome = ?), ?, ?)
+        """, (r["data"], r["mandante"], r["visitante"], r["gols_mandante"], r["gols_visitante"]))
+    conn.commit()
+    duracao = time.perf_counter() - inicio
+    conn.close()
+    return duracao
+
+
+def carga_em_lote(caminho_banco: str, caminho_times: str, caminho_partidas: str, lote: int,
+                  incremental: bool) -> float:
+    conn = conectar(caminho_banco)
+    inicializar_schema(conn)
+    inicio = time.perf_counter()
+    importar(conn, "times", [caminho_times], lote)
+    importar(conn, "partidas", [caminho_partidas], lote, incremental)
+    duracao = time.perf_counter() - inicio
+    conn.close()
+    return duracao
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--times", type=int, default=2000)
+    parser.add_argument("--partidas", type=int, default=50000)
+    parser.add_argument("--lote", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho_times, caminho_partidas = gerar_arquivos(pasta, args.times, args.partidas)
+        total = args.times + args.partidas
+
+        t_loop = carga_linha_a_linha(os.path.join(pasta, "loop.db"), caminho_times, caminho_partidas)
+        t_incremental = carga_em_lote(os.path.join(pasta, "incremental.db"), caminho_times, caminho_partidas,
+                                      args.lote, incremental=True)
+        t_lote = carga_em_lote(os.path.join(pasta, "lote.db"), caminho_times, caminho_partidas,
+                               args.lote, incremental=False)
+
+    print(f"{'método':>22} | {'tempo (s)':>9} | {'linhas/s':>9} | {'ganho':>6}")
+    for nome, duracao in (("linha a linha", t_loop), ("em lote (incremental)", t_incremental), ("em lote", t_lote)):
+        print(f"{nome:>22} | {duracao:>9.2f} | {total / duracao:>9.0f} | {t_loop / duracao:>5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Mede a inicialização em etapas do bot (ollama-client.py) em processos novos:
+
+- o server.py sobe uma vez, em uma porta livre, com uma cópia do banco do repositório;
+- cada rodada é um processo Python novo que importa o bot, roda inicializar() contra esse
+  servidor, responde uma pergunta do atalho com um bot mudo no lugar do Telegram e espera
+  as etapas de segundo plano (índice do atalho, LLM, ASR);
+- uma rodada extra com -X importtime lista os módulos mais caros da importação.
+
+Relata, para cada etapa, quando ela ficou pronta (mediana entre as rodadas, segundos desde o
+início da importação) e compara "importacao", "texto" e "primeira_resposta" com
+benchmarks/baseline_inicializacao.json (código 1 se piorarem além de --tolerancia; código 2
+se a baseline foi medida com outro --aquecer). O bot roda com a configuração de produção.
+O aquecimento do Ollama só entra com --aquecer; etapas que falham (ex.: ASR não instalado)
+aparecem com ⚠️.
+
+Uso (na raiz do repositório):
+    python -m benchmarks.inicializacao --rodadas 3
+    python -m benchmarks.inicializacao --salvar-baseline
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+PASTA = Path(__file__).parent
+RAIZ = PASTA.parent
+BASELINE = PASTA / "baseline_inicializacao.json"
+# Etapas que a inicialização em etapas deve manter rápidas
+ETAPAS_COMPARADAS = ("importacao", "texto", "primeira_resposta")
+
+CARREGAR_CLIENTE = (
+    "import importlib.util\n"
+    "spec = importlib.util.spec_from_file_location('ollama_client', 'ollama-client.py')\n"
+    "spec.loader.exec_module(importlib.util.module_from_spec(spec))\n"
+)
+
+
+# --- Processo filho: uma inicialização ---
+
+class BotMudo:
+    """Só o necessário do AsyncTeleBot para responder uma pergunta (nada sai do processo)."""
+
+    async def send_message(self, chat_id, texto, **kwargs):
+        return SimpleNamespace(message_id=1, chat=SimpleNamespace(id=chat_id), text=texto)
+
+    async def edit_message_text(self, texto, chat_id, message_id, **kwargs):
+        return True
+
+
+async def inicializar_filho(aquecer: bool) -> dict:
+    import importlib.util
+
+    spec = importlib.util.spec_from_file_location("ollama_client", RAIZ / "ollama-client.py")
+    cliente = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(cliente)
+
+    from rich.console import Console
+
+    from rastreamento import Rastreador
+
+    # Logs do bot vão para o stderr; o stdout leva só o JSON do resultado
+    cliente.console = Console(stderr=True)
+    cliente.bot = BotMudo()
+    cliente.rastreador = Rastreador("bench_inicializacao")
+    cliente.ARQUIVO_METRICAS = os.path.join(tempfile.gettempdir(), "bench_inicializacao.prom")
+    cliente.AQUECER_NA_INICIALIZACAO = aquecer
+
+    if not await cliente.inicializar():
+        return {"erro": "servidor MCP indisponível"}
+    async with cliente.inicializacao.etapa("primeira_resposta"):
+        await cliente.processar_pergunta_assincrona("Classificação", chat_id=1)
+    await cliente.tarefa_preparacao
+    return cliente.inicializacao.resumo()
+
+
+# --- Processo principal ---
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def esperar_porta(porta: int, timeout: float) -> None:
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        with socket.socket() as s:
+            if s.connect_ex(("127.0.0.1", porta)) == 0:
+                return
+        time.sleep(0.1)
+    raise TimeoutError(f"server.py não abriu a porta {porta} em {timeout}s")
+
+
+def rodar_filho(ambiente: dict, aquecer: bool) -> tuple[dict, float]:
+    """Uma inicialização em processo novo: (etapas, segundos até o processo terminar)."""
+    comando = [sys.executable, "-m", "benchmarks.inicializacao", "--filho"] + (["--aquecer"] if aquecer else [])
+    inicio = time.perf_counter()
+    resultado = subprocess.run(comando, cwd=RAIZ, env=ambiente, capture_output=True, text=True)
+    duracao = time.perf_counter() - inicio
+    if resultado.returncode != 0:
+        raise RuntimeError(f"processo de inicialização falhou:\n{resultado.stderr[-2000:]}")
+    return json.loads(resultado.stdout.strip().splitlines()[-1]), duracao
+
+
+def modulos_mais_caros(ambiente: dict, quantos: int) -> list[tuple[str, float]]:
+    """Módulos importados diretamente pela importação do bot, pelo tempo acumulado (-X importtime)."""
+    resultado = subprocess.run([sys.executable, "-X", "importtime", "-c", CARREGAR_CLIENTE],
+                               cwd=RAIZ, env=ambiente, capture_output=True, text=True)
+    modulos = {}
+    for linha in resultado.stderr.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, acumulado, nome = linha.removeprefix("import time:").split("|")
+        # Só os módulos de primeiro nível (sem indentação): os demais já estão somados neles
+        if not nome.startswith("   "):
+            modulos[nome.strip()] = int(acumulado) / 1e6
+    return sorted(modulos.items(), key=lambda item: item[1], reverse=True)[:quantos]
+
+
+def comparar(atual: dict, baseline: dict, tolerancia: float) -> list[str]:
+    regressoes = []
+    for etapa in ETAPAS_COMPARADAS:
+        medida, referencia = atual.get(etapa), baseline.get(etapa)
+        # 0,2 s de folga absoluta: a inicialização oscila com o cache de disco do sistema
+        if medida is not None and referencia is not None and medida > referencia * (1 + tolerancia) + 0.2:
+            regressoes.append(f"{etapa}: {medida:.2f}s > {referencia:.2f}s")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rodadas", type=int, default=3)
+    parser.add_argument("--aquecer", action="store_true", help="aquece o Ollama (precisa dele rodando)")
+    parser.add_argument("--tolerancia", type=float, default=0.25)
+    parser.add_argument("--salvar-baseline", action="store_true")
+    parser.add_argument("--filho", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        print(json.dumps(asyncio.run(inicializar_filho(args.aquecer))))
+        return
+
+    porta = porta_livre()
+    ambiente = {**os.environ, "TELEGRAM_TOKEN": os.environ.get("TELEGRAM_TOKEN", "0:benchmark"),
+                "URL_MCP": f"http://127.0.0.1:{porta}/sse"}
+    # O server.py abre o banco relativo à pasta atual: roda sobre uma cópia, sem tocar no original
+    pasta_servidor = tempfile.TemporaryDirectory()
+    shutil.copy(RAIZ / "brasileirao.db", pasta_servidor.name)
+    servidor = subprocess.Popen([sys.executable, str(RAIZ / "server.py"), "--spans", "", "--port", str(porta)],
+                                cwd=pasta_servidor.name, env=ambiente,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        esperar_porta(porta, timeout=60)
+        rodadas, processos = [], []
+        for _ in range(args.rodadas):
+            etapas, duracao = rodar_filho(ambiente, args.aquecer)
+            if "erro" in etapas:
+                raise RuntimeError(etapas["erro"])
+            rodadas.append(etapas)
+            processos.append(duracao)
+        caros = modulos_mais_caros(ambiente, 10)
+    finally:
+        servidor.terminate()
+        servidor.wait()
+        pasta_servidor.cleanup()
+
+    atual = {etapa: round(statistics.median(r[etapa]["pronta_em_s"] for r in rodadas), 3) for etapa in rodadas[0]}
+    print(f"{args.rodadas} inicializações (mediana, segundos desde o início da importação)\n")
+    print(f"{'etapa':>18} | {'pronta em':>9} | {'duração':>8}")
+    for etapa, pronta_em in sorted(atual.items(), key=lambda item: item[1]):
+        duracoes = [r[etapa]["duracao_s"] for r in rodadas if "duracao_s" in r[etapa]]
+        duracao = f"{statistics.median(duracoes):>7.2f}s" if duracoes else f"{'':>8}"
+        ok = "" if all(r[etapa]["ok"] for r in rodadas) else "  ⚠️ falhou"
+        print(f"{etapa:>18} | {pronta_em:>8.2f}s | {duracao}{ok}")
+    print(f"\nprocesso completo (interpretador + todas as etapas): {statistics.median(processos):.2f}s")
+    print(f"texto atendido {max(atual.values()) - atual['texto']:.2f}s antes do fim da inicialização")
+
+    print("\nmódulos mais caros na importação do bot:")
+    for nome, segundos in caros:
+        print(f"  {segundos * 1000:>8.1f} ms  {nome}")
+
+    parametros = {"aquecer": args.aquecer}
+    if args.salvar_baseline or not BASELINE.exists():
+        BASELINE.write_text(json.dumps({"parametros": parametros, "etapas": atual}, ensure_ascii=False, indent=2) + "\n",
+                            encoding="utf-8")
+        print(f"\nbaseline gravada em {BASELINE}")
+        return
+
+    baseline = json.loads(BASELINE.read_text(encoding="utf-8"))
+    if baseline.get("parametros") != parametros:
+        print(f"\n⚠️ A baseline foi medida com outros parâmetros: {baseline.get('parametros')}")
+        print("   Rode com os mesmos parâmetros ou grave uma nova baseline com --salvar-baseline.")
+        sys.exit(2)
+    regressoes = comparar(atual, baseline["etapas"], args.tolerancia)
+    if regressoes:
+        print("\n❌ Regressões em relação à baseline:")
+        for regressao in regressoes:
+            print(f"  - {regressao}")
+        sys.exit(1)
+    print("\n✅ Sem regressões em relação à baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Verificação da paginação do 'ler_dados' nos dois backends: lê todas as páginas de uma busca
+por nome (reescrita para o índice trigram) seguindo só os tokens de continuação, como o bot faz.
+
+Confere que:
+- as páginas juntas trazem exatamente as linhas da consulta sem paginação, na mesma ordem;
+- a query guardada nos tokens é a recebida, e não cresce de uma página para a outra;
+- as páginas pedidas só com o token mantêm o tamanho da primeira;
+- a partir da terceira página, a leitura continua do cursor aberto pela anterior.
+
+Termina com código 1 se alguma verificação falhar.
+
+Uso (na raiz do repositório):
+    python -m benchmarks.paginacao --linhas 2000 --tamanho 5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import server
+from banco import PoolConexoes
+from banco_async import PoolAssincrono
+from benchmarks.carga_mcp import criar_banco_sintetico
+from paginacao import CursoresPaginacao, ler_token
+
+CONSULTA = "SELECT id, nome FROM times WHERE nome LIKE '%Time 1%' ORDER BY id"
+
+
+async def chamar(ferramenta, **argumentos):
+    resultado = ferramenta(**argumentos)
+    return await resultado if asyncio.iscoroutine(resultado) else resultado
+
+
+async def ler_paginas(ferramenta, tamanho: int) -> tuple[list, list[str], list[int], float]:
+    """(linhas de todas as páginas, queries dos tokens, linhas por página, segundos)"""
+    inicio = time.perf_counter()
+    pagina = await chamar(ferramenta, query=CONSULTA, tamanho_pagina=tamanho)
+    linhas, queries, tamanhos = [], [], []
+    while True:
+        if not isinstance(pagina, dict):
+            raise RuntimeError(f"resposta inesperada: {pagina}")
+        linhas += pagina["linhas"]
+        tamanhos.append(len(pagina["linhas"]))
+        if pagina["proximo"] is None:
+            return linhas, queries, tamanhos, time.perf_counter() - inicio
+        queries.append(ler_token(pagina["proximo"])[0])
+        pagina = await chamar(ferramenta, token=pagina["proximo"])
+
+
+async def verificar_backend(backend: str, caminho: str, tamanho: int) -> list[str]:
+    server.cursores_paginacao = CursoresPaginacao()
+    if backend == "sync":
+        server.pool = PoolConexoes(caminho)
+        ferramenta = server.ler_dados
+    else:
+        server.pool_async = await PoolAssincrono(caminho).abrir()
+        ferramenta = server.ler_dados_async
+
+    falhas = []
+    try:
+        esperado = await chamar(ferramenta, query=CONSULTA)
+        linhas, queries, tamanhos, duracao = await ler_paginas(ferramenta, tamanho)
+        cursores = server.cursores_paginacao.estatisticas()
+        print(f"{backend:>5}: {len(linhas)} linhas em {len(tamanhos)} páginas, {duracao * 1000:.1f} ms "
+              f"(cursores: {cursores['abertos']} abertos, {cursores['continuados']} continuados)")
+
+        if linhas != esperado:
+            falhas.append(f"{backend}: as páginas trazem {len(linhas)} linhas, a consulta sem paginação {len(esperado)}")
+        if len(queries) < 3:
+            falhas.append(f"{backend}: só {len(queries) + 1} páginas; use menos --tamanho ou mais --linhas")
+        alteradas = [q for q in queries if q != CONSULTA]
+        if alteradas:
+            falhas.append(f"{backend}: {len(alteradas)} tokens com a query alterada "
+                          f"(tamanhos {sorted({len(q) for q in alteradas})})")
+        if any(n != tamanho for n in tamanhos[:-1]):
+            falhas.append(f"{backend}: páginas com tamanhos {sorted(set(tamanhos[:-1]))}, pedido {tamanho}")
+        # A 1ª página vem da consulta com LIMIT, a 2ª abre o cursor e as demais continuam dele
+        if cursores["abertos"] != 1 or cursores["continuados"] != len(tamanhos) - 2:
+            falhas.append(f"{backend}: {cursores['abertos']} cursores abertos e {cursores['continuados']} "
+                          f"continuados em {len(tamanhos)} páginas (esperado 1 e {len(tamanhos) - 2})")
+    finally:
+        if backend == "sync":
+            server.fechar_cursores(server.cursores_paginacao.esvaziar())
+            server.pool.fechar()
+            server.pool = None
+        else:
+            await server.fechar_cursores_async(server.cursores_paginacao.esvaziar())
+            await server.pool_async.fechar()
+            server.pool_async = None
+    return falhas
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--linhas", type=int, default=2000, help="times no banco sintético")
+    parser.add_argument("--tamanho", type=int, default=5, help="linhas por página")
+    args = parser.parse_args()
+
+    falhas = []
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "paginacao.db")
+        criar_banco_sintetico(caminho, args.linhas)
+        for backend in ("sync", "async"):
+            falhas += await verificar_backend(backend, caminho, args.tamanho)
+
+    if falhas:
+        print("\n❌ Falhas na paginação:")
+        for falha in falhas:
+            print(f"   {falha}")
+        sys.exit(1)
+    print("\n✅ Paginação confere nos dois backends")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,281 @@
+"""
+Benchmark reprodutível do atendimento completo (processar_pergunta_assincrona), sem Telegram,
+sem Ollama e sem o server.py em :8000:
+
+- BotFalso no lugar do AsyncTeleBot (só conta as mensagens enviadas/editadas);
+- LLMFalso determinístico: devolve o SQL do corpus em streaming, com latência configurável;
+- servidor MCP do server.py rodando no próprio processo, ligado ao cliente por streams em
+  memória (o protocolo MCP é o mesmo; só não há SSE), sobre um banco sintético temporário.
+
+Mede a vazão (perguntas/s), p50/p95/p99 de cada etapa (spans do rastreamento do bot e do
+servidor) e o pico de memória alocada em cada fase (tradução, ferramentas MCP, atendimento).
+O bot roda com a configuração de produção (ex.: INTERVALO_MINIMO_EDICAO), só com o Telegram,
+o LLM e o transporte MCP trocados. Compara com benchmarks/baseline_pipeline.json e termina com
+código 1 se alguma métrica piorar mais que --tolerancia; a baseline guarda os parâmetros com que
+foi medida, e com parâmetros diferentes a comparação não é feita (código 2).
+
+Uso (na raiz do repositório):
+    python -m benchmarks.pipeline --latencia-llm 0.05 --concorrencia 4 --rodadas 5
+    python -m benchmarks.pipeline --salvar-baseline     # grava as medidas atuais como referência
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+from mcp.shared.memory import create_connected_server_and_client_session
+
+import server
+from banco import PoolConexoes
+from cache_traducao import CacheTraducao
+from cliente_mcp import FerramentaMCP
+from configuracao_llm import PROMPT_TRADUCAO
+from rastreamento import Rastreador
+
+PASTA = Path(__file__).parent
+CORPUS = PASTA / "corpus_perguntas.jsonl"
+BASELINE = PASTA / "baseline_pipeline.json"
+ESTADOS = ["SP", "RJ", "MG", "RS", "PR", "BA", "PE", "CE", "GO", "SC"]
+
+
+def carregar_corpus() -> list[dict]:
+    with open(CORPUS, encoding="utf-8") as arquivo:
+        return [json.loads(linha) for linha in arquivo if linha.strip()]
+
+
+def carregar_cliente():
+    """Importa o ollama-client.py (o nome com hífen impede o import direto)."""
+    # O AsyncTeleBot valida o formato do token na construção; o bot falso substitui ele depois
+    os.environ.setdefault("TELEGRAM_TOKEN", "0:benchmark")
+    spec = importlib.util.spec_from_file_location("ollama_client", Path(__file__).parent.parent / "ollama-client.py")
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+# --- Substitutos locais ---
+
+class BotFalso:
+    """Mesma interface usada do AsyncTeleBot: send_message e edit_message_text."""
+
+    def __init__(self, latencia: float = 0.0):
+        self.latencia = latencia
+        self.enviadas = 0
+        self.editadas = 0
+
+    async def send_message(self, chat_id, texto, **kwargs):
+        await asyncio.sleep(self.latencia)
+        self.enviadas += 1
+        return SimpleNamespace(message_id=self.enviadas, chat=SimpleNamespace(id=chat_id), text=texto)
+
+    async def edit_message_text(self, texto, chat_id, message_id, **kwargs):
+        await asyncio.sleep(self.latencia)
+        self.editadas += 1
+        return True
+
+
+class LLMFalso:
+    """
+    LLM determinístico: procura a pergunta do prompt no corpus e devolve o SQL esperado,
+    em pedaços, depois de 'latencia' segundos (ou uma consulta padrão se não conhecer a pergunta).
+    """
+
+    def __init__(self, corpus: list[dict], latencia: float, pedacos: int = 8):
+        self.respostas = {item["pergunta"]: item["sql"] for item in corpus}
+        self.latencia = latencia
+        self.pedacos = pedacos
+
+    def _responder(self, prompt: str) -> str:
+        pergunta = prompt.removeprefix(PROMPT_TRADUCAO).removesuffix("\nOutput: ")
+        return self.respostas.get(pergunta, "SELECT * FROM times ORDER BY pontos DESC;")
+
+    async def astream_complete(self, prompt: str):
+        resposta = self._responder(prompt)
+        tamanho = max(1, len(resposta) // self.pedacos)
+
+        async def gerar():
+            await asyncio.sleep(self.latencia)
+            for i in range(0, len(resposta), tamanho):
+                yield SimpleNamespace(delta=resposta[i:i + tamanho])
+            # Como o modelo real, continua "explicando" depois da query
+            yield SimpleNamespace(delta="\nEssa consulta retorna os times pedidos.")
+
+        return gerar()
+
+    async def acomplete(self, prompt: str):
+        await asyncio.sleep(self.latencia)
+        return SimpleNamespace(text=self._responder(prompt))
+
+
+# --- Preparação ---
+
+def preparar_servidor(caminho: str, times: int) -> None:
+    server.pool = PoolConexoes(caminho)
+    aleatorio = random.Random(42)
+    with server.pool.escrita() as conn:
+        conn.executemany(
+            "INSERT INTO times (nome, estado, pontos, vitorias, empates, derrotas, saldo_gols) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((f"Time {i}", aleatorio.choice(ESTADOS), aleatorio.randint(0, 90), aleatorio.randint(0, 28),
+              aleatorio.randint(0, 12), aleatorio.randint(0, 28), aleatorio.randint(-30, 30)) for i in range(times)),
+        )
+    server.cache_resultados.invalidar()
+    server.registrar_ferramentas("sync")
+
+
+def configurar_cliente(cliente, sessao, corpus: list[dict], args) -> BotFalso:
+    bot = BotFalso(args.latencia_telegram)
+    cliente.rastreador = Rastreador("bench_bot")
+    cliente.rastreador.instrumentar(bot, "send_message", "telegram.send_message")
+    cliente.rastreador.instrumentar(bot, "edit_message_text", "telegram.edit_message_text")
+    cliente.bot = bot
+    cliente.llm = LLMFalso(corpus, args.latencia_llm)
+    cliente.cache_traducao = CacheTraducao(caminho=None)
+    cliente.USAR_ATALHO = not args.sem_atalho
+    cliente.ler_dados_tool = FerramentaMCP(sessao, "ler_dados")
+    cliente.adicionar_dados_tool = FerramentaMCP(sessao, "adicionar_dados")
+    cliente.executar_lote_tool = FerramentaMCP(sessao, "executar_lote")
+    server.rastreador = Rastreador("bench_servidor")
+    return bot
+
+
+# --- Fases medidas ---
+
+async def medir_fase(nome: str, corrotina, memoria: dict):
+    """Executa a fase registrando o pico de memória alocada (KB) durante ela."""
+    tracemalloc.reset_peak()
+    antes = tracemalloc.get_traced_memory()[0]
+    resultado = await corrotina
+    memoria[nome] = round((tracemalloc.get_traced_memory()[1] - antes) / 1024, 1)
+    return resultado
+
+
+async def fase_traducao(cliente, corpus):
+    for item in corpus:
+        with cliente.rastreador.span("traducao"):
+            await cliente.traduzir_para_sql(item["pergunta"])
+
+
+async def fase_ferramentas(cliente, corpus):
+    for item in corpus:
+        async for _ in cliente.consumir_paginas(item["sql"]):
+            pass
+
+
+async def fase_atendimento(cliente, corpus, rodadas: int, concorrencia: int) -> float:
+    """Atendimentos completos, 'concorrencia' chats em paralelo. Retorna perguntas/s."""
+    perguntas = [item["pergunta"] for _ in range(rodadas) for item in corpus]
+    limite = asyncio.Semaphore(concorrencia)
+
+    async def atender(i: int, pergunta: str):
+        async with limite:
+            with cliente.rastreador.requisicao(), cliente.rastreador.span("requisicao"):
+                await cliente.processar_pergunta_assincrona(pergunta, chat_id=i % concorrencia)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(atender(i, p) for i, p in enumerate(perguntas)))
+    return len(perguntas) / (time.perf_counter() - inicio)
+
+
+# --- Relatório e baseline ---
+
+def parametros_medidos(args) -> dict:
+    """Parâmetros que mudam as medidas: a baseline só vale para os mesmos valores."""
+    return {"latencia_llm": args.latencia_llm, "latencia_telegram": args.latencia_telegram,
+            "concorrencia": args.concorrencia, "rodadas": args.rodadas, "times": args.times,
+            "sem_atalho": args.sem_atalho}
+
+
+def comparar(atual: dict, baseline: dict, tolerancia: float) -> list[str]:
+    """Lista as regressões: vazão menor ou p95 maior que a baseline além da tolerância."""
+    regressoes = []
+    if atual["vazao"] < baseline["vazao"] * (1 - tolerancia):
+        regressoes.append(f"vazão {atual['vazao']:.1f}/s < {baseline['vazao']:.1f}/s")
+    for etapa, referencia in baseline["etapas"].items():
+        medida = atual["etapas"].get(etapa)
+        # Etapas muito rápidas oscilam demais em termos relativos; 1 ms de folga absoluta
+        if medida and medida["p95_ms"] > referencia["p95_ms"] * (1 + tolerancia) + 1:
+            regressoes.append(f"{etapa}: p95 {medida['p95_ms']} ms > {referencia['p95_ms']} ms")
+    for fase, referencia in baseline["memoria_kb"].items():
+        medida = atual["memoria_kb"].get(fase)
+        if medida and medida > referencia * (1 + tolerancia) + 64:
+            regressoes.append(f"memória em {fase}: {medida} KB > {referencia} KB")
+    return regressoes
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latencia-llm", type=float, default=0.05, help="segundos por resposta do LLM falso")
+    parser.add_argument("--latencia-telegram", type=float, default=0.0)
+    parser.add_argument("--concorrencia", type=int, default=4)
+    parser.add_argument("--rodadas", type=int, default=5, help="passadas pelo corpus no atendimento completo")
+    parser.add_argument("--times", type=int, default=40)
+    parser.add_argument("--sem-atalho", action="store_true", help="manda todas as perguntas para o LLM falso")
+    parser.add_argument("--tolerancia", type=float, default=0.25)
+    parser.add_argument("--salvar-baseline", action="store_true")
+    args = parser.parse_args()
+
+    corpus = carregar_corpus()
+    cliente = carregar_cliente()
+    tracemalloc.start()
+    memoria = {}
+
+    with tempfile.TemporaryDirectory() as pasta:
+        preparar_servidor(os.path.join(pasta, "bench.db"), args.times)
+        async with create_connected_server_and_client_session(server.mcp._mcp_server) as sessao:
+            bot = configurar_cliente(cliente, sessao, corpus, args)
+            await cliente.carregar_indice_times()
+
+            await medir_fase("traducao", fase_traducao(cliente, corpus), memoria)
+            await medir_fase("ferramentas", fase_ferramentas(cliente, corpus), memoria)
+            vazao = await medir_fase(
+                "atendimento", fase_atendimento(cliente, corpus, args.rodadas, args.concorrencia), memoria
+            )
+        server.pool.fechar()
+    tracemalloc.stop()
+
+    atual = {
+        "parametros": parametros_medidos(args),
+        "vazao": round(vazao, 2),
+        "etapas": {**cliente.rastreador.resumo(), **server.rastreador.resumo()},
+        "memoria_kb": memoria,
+    }
+
+    print(f"{len(corpus)} perguntas x {args.rodadas} rodadas, concorrência {args.concorrencia}, "
+          f"LLM falso {args.latencia_llm * 1000:.0f} ms, atalho {'desligado' if args.sem_atalho else 'ligado'}")
+    print(f"vazão: {atual['vazao']:.1f} perguntas/s ({bot.enviadas} mensagens enviadas, {bot.editadas} edições)\n")
+    print(f"{'etapa':>32} | {'n':>5} | {'p50 (ms)':>9} | {'p95 (ms)':>9} | {'p99 (ms)':>9}")
+    for etapa, r in atual["etapas"].items():
+        print(f"{etapa:>32} | {r['n']:>5} | {r['p50_ms']:>9.2f} | {r['p95_ms']:>9.2f} | {r['p99_ms']:>9.2f}")
+    print(f"\n{'fase':>32} | pico de memória (KB)")
+    for fase, kb in memoria.items():
+        print(f"{fase:>32} | {kb:>10.1f}")
+
+    if args.salvar_baseline or not BASELINE.exists():
+        BASELINE.write_text(json.dumps(atual, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"\nbaseline gravada em {BASELINE}")
+        return
+
+    baseline = json.loads(BASELINE.read_text(encoding="utf-8"))
+    if baseline.get("parametros") != atual["parametros"]:
+        print(f"\n⚠️ A baseline foi medida com outros parâmetros: {baseline.get('parametros')}")
+        print("   Rode com os mesmos parâmetros ou grave uma nova baseline com --salvar-baseline.")
+        sys.exit(2)
+    regressoes = comparar(atual, baseline, args.tolerancia)
+    if regressoes:
+        print("\n❌ Regressões em relação à baseline:")
+        for regressao in regressoes:
+            print(f"  - {regressao}")
+        sys.exit(1)
+    print("\n✅ Sem regressões em relação à baseline")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,199 @@
+"""
+Telegram falso para testar o modo webhook sem a rede:
+
+- serve a Bot API (sendMessage, editMessageText, answerCallbackQuery, setWebhook...) em
+  http://127.0.0.1:--porta-api/bot<token>/<método>, registrando as respostas por chat;
+- posta updates de texto no webhook, com uma fração de reenvios (mesmo update_id, como o
+  Telegram faz quando o 200 demora), e mede a latência do 200, a vazão de recebimento e
+  o tempo até todas as perguntas terem resposta.
+
+Sem --webhook, roda um ServidorWebhook no próprio processo com um handler de eco atrás do
+AgendadorChats (mede só a entrada: HTTP, deduplicação, fila e workers). Com --webhook, posta
+no bot de verdade, iniciado com:
+
+    TELEGRAM_API_URL="http://127.0.0.1:8081/bot{0}/{1}" MODO_ENTRADA=webhook python ollama-client.py
+
+(o server.py precisa estar rodando; as perguntas usadas caem no atalho, sem Ollama).
+
+Uso (na raiz do repositório):
+    python -m benchmarks.telegram_falso --updates 2000 --chats 50 --reenvios 0.1
+    python -m benchmarks.telegram_falso --webhook http://127.0.0.1:8443/webhook --updates 100
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+
+import aiohttp
+from aiohttp import web
+
+from metricas import EstatisticaLatencia
+
+PERGUNTAS = ["Classificação", "Mostre todos os times", "Quais times têm mais de 50 pontos?", "Qual a tabela atual?"]
+
+
+class TelegramFalso:
+    """Bot API mínima: responde como o Telegram e conta as mensagens enviadas a cada chat."""
+
+    def __init__(self):
+        self.enviadas: Counter = Counter()
+        self.editadas = 0
+        self.chamadas: Counter = Counter()
+        self._proximo_id = 0
+        self.todas_respondidas = asyncio.Event()
+        self.esperadas: Counter = Counter()
+
+    def criar_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route("*", "/bot{token}/{metodo}", self._api)
+        return app
+
+    def _mensagem(self, chat_id: int, texto: str) -> dict:
+        self._proximo_id += 1
+        return {"message_id": self._proximo_id, "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"}, "text": texto}
+
+    async def _api(self, request: web.Request) -> web.Response:
+        metodo = request.match_info["metodo"]
+        parametros = {**request.query, **(await request.post())}
+        self.chamadas[metodo] += 1
+
+        if metodo == "sendMessage":
+            chat_id = int(parametros["chat_id"])
+            self.enviadas[chat_id] += 1
+            if all(self.enviadas[c] >= n for c, n in self.esperadas.items()):
+                self.todas_respondidas.set()
+            resultado = self._mensagem(chat_id, parametros.get("text", ""))
+        elif metodo == "editMessageText":
+            self.editadas += 1
+            resultado = self._mensagem(int(parametros.get("chat_id", 0)), parametros.get("text", ""))
+        elif metodo == "getMe":
+            resultado = {"id": 1, "is_bot": True, "first_name": "Falso", "username": "falso_bot"}
+        else:
+            resultado = True  # setWebhook, deleteWebhook, answerCallbackQuery...
+        return web.json_response({"ok": True, "result": resultado})
+
+
+def gerar_updates(quantidade: int, chats: int, reenvios: float, aleatorio: random.Random) -> tuple[list[dict], Counter]:
+    """Updates de texto (com reenvios duplicados embaralhados) e o número de perguntas distintas por chat."""
+    updates, por_chat = [], Counter()
+    for update_id in range(1, quantidade + 1):
+        chat_id = 1000 + aleatorio.randrange(chats)
+        por_chat[chat_id] += 1
+        updates.append({
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id, "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": {"id": chat_id, "is_bot": False, "first_name": "Teste"},
+                "text": aleatorio.choice(PERGUNTAS),
+            },
+        })
+    duplicados = [dict(u) for u in aleatorio.sample(updates, int(quantidade * reenvios))]
+    updates += duplicados
+    aleatorio.shuffle(updates)
+    return updates, por_chat
+
+
+async def postar(url: str, updates: list[dict], concorrencia: int, segredo: str | None) -> tuple[EstatisticaLatencia, Counter, float]:
+    """Posta os updates no webhook; retorna a latência do 200, os códigos HTTP e a duração total."""
+    latencia, codigos = EstatisticaLatencia(janela=len(updates)), Counter()
+    limite = asyncio.Semaphore(concorrencia)
+    cabecalhos = {"Content-Type": "application/json"}
+    if segredo:
+        cabecalhos["X-Telegram-Bot-Api-Secret-Token"] = segredo
+
+    async with aiohttp.ClientSession() as sessao:
+        async def enviar(update: dict):
+            async with limite:
+                inicio = time.perf_counter()
+                async with sessao.post(url, data=json.dumps(update), headers=cabecalhos) as resposta:
+                    codigos[resposta.status] += 1
+                latencia.registrar(time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(enviar(u) for u in updates))
+        return latencia, codigos, time.perf_counter() - inicio
+
+
+async def iniciar_bot_embutido(args):
+    """Bot de eco atrás do AgendadorChats, recebendo pelo ServidorWebhook (sem MCP nem Ollama)."""
+    from telebot import asyncio_helper
+    from telebot.async_telebot import AsyncTeleBot
+
+    from agendador import AgendadorChats
+    from webhook import ServidorWebhook
+
+    asyncio_helper.API_URL = f"http://127.0.0.1:{args.porta_api}/bot{{0}}/{{1}}"
+    bot = AsyncTeleBot("0:falso")
+    agendador = AgendadorChats(max_por_chat=args.updates, max_total=args.updates * 2)
+
+    async def responder(message):
+        await asyncio.sleep(args.latencia_handler)
+        await bot.send_message(message.chat.id, f"Resposta: {message.text}")
+
+    @bot.message_handler(func=lambda message: True)
+    async def handle_text(message):
+        agendador.enviar(message.chat.id, lambda: responder(message))
+
+    servidor = ServidorWebhook(bot, segredo=args.segredo, workers=args.workers)
+    await servidor.iniciar("127.0.0.1", args.porta_webhook)
+    return servidor, bot, f"http://127.0.0.1:{args.porta_webhook}/webhook"
+
+
+async def executar(args):
+    telegram = TelegramFalso()
+    runner = web.AppRunner(telegram.criar_app())
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", args.porta_api).start()
+
+    servidor, bot, url = None, None, args.webhook
+    if url is None:
+        servidor, bot, url = await iniciar_bot_embutido(args)
+
+    updates, por_chat = gerar_updates(args.updates, args.chats, args.reenvios, random.Random(42))
+    telegram.esperadas = por_chat
+    inicio = time.perf_counter()
+    latencia, codigos, duracao_envio = await postar(url, updates, args.concorrencia, args.segredo)
+    try:
+        await asyncio.wait_for(telegram.todas_respondidas.wait(), args.timeout)
+        respondido = f"{time.perf_counter() - inicio:.2f}s"
+    except asyncio.TimeoutError:
+        respondido = f"não em {args.timeout}s"
+    await asyncio.sleep(0.5)  # Respostas em excesso (reenvios respondidos) chegariam logo depois
+
+    resumo = latencia.resumo()
+    print(f"{len(updates)} posts ({len(updates) - args.updates} reenvios) em {duracao_envio:.2f}s: "
+          f"{len(updates) / duracao_envio:.0f} updates/s, códigos HTTP {dict(codigos)}")
+    print(f"latência do 200: p50 {resumo['p50_ms']} ms, p95 {resumo['p95_ms']} ms, p99 {resumo['p99_ms']} ms")
+    print(f"todas as {args.updates} perguntas respondidas: {respondido}")
+    excesso = sum(max(0, telegram.enviadas[c] - n) for c, n in por_chat.items())
+    print(f"sendMessage: {sum(telegram.enviadas.values())} ({excesso} além do esperado), editMessageText: {telegram.editadas}")
+    if servidor is not None:
+        print(f"webhook: {servidor.metricas()}")
+        await servidor.parar()
+        await bot.close_session()
+    await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--webhook", type=str, default=None, help="URL do webhook de um bot já rodando")
+    parser.add_argument("--updates", type=int, default=1000)
+    parser.add_argument("--chats", type=int, default=50)
+    parser.add_argument("--reenvios", type=float, default=0.1, help="fração de updates reenviados")
+    parser.add_argument("--concorrencia", type=int, default=40, help="POSTs simultâneos")
+    parser.add_argument("--segredo", type=str, default=None)
+    parser.add_argument("--porta-api", type=int, default=8081)
+    parser.add_argument("--porta-webhook", type=int, default=8443)
+    parser.add_argument("--workers", type=int, default=8, help="workers do webhook embutido")
+    parser.add_argument("--latencia-handler", type=float, default=0.01, help="segundos por resposta no bot embutido")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+    asyncio.run(executar(args))
+
+
+if __name__ == "__main__":
+    main()
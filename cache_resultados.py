@@ -0,0 +1,136 @@
+import re
+import sys
+import threading
+import uuid
+from collections import OrderedDict
+
+from indices import eh_consulta
+
+# Consultas cujo resultado muda sem escrita no banco não são guardadas
+_NAO_DETERMINISTICA = re.compile(
+    r"\b(random|randomblob|changes|total_changes|last_insert_rowid)\s*\(|'now'|\bcurrent_(date|time|timestamp)\b",
+    re.IGNORECASE,
+)
+
+
+def normalizar_sql(query: str) -> str:
+    """
+    Chave do cache: espaços colapsados, minúsculas e sem ';' final, exceto dentro de
+    literais entre aspas simples (que diferenciam maiúsculas).
+    """
+    partes = re.split(r"('(?:[^']|'')*')", query.strip().rstrip(";").strip())
+    return "".join(parte if parte.startswith("'") else " ".join(parte.lower().split()) for parte in partes)
+
+
+def _estimar_bytes(colunas: list[str], linhas: list) -> int:
+    """Estimativa do tamanho do resultado em memória (tuplas + valores)."""
+    total = sys.getsizeof(linhas) + sum(sys.getsizeof(c) for c in colunas)
+    for linha in linhas:
+        total += sys.getsizeof(linha) + sum(sys.getsizeof(valor) for valor in linha)
+    return total
+
+
+class CacheResultados:
+    """
+    Cache LRU dos resultados de consultas do 'ler_dados', indexado pelo SQL normalizado
+    e pelos parâmetros (ex.: limite e offset das páginas).
+
+    - Limites: 'max_entradas' resultados e 'max_bytes' de memória estimada.
+    - As ferramentas de escrita chamam 'invalidar' após o commit. Quem lê passa a 'geracao' vista
+      antes da consulta para 'guardar': se houve invalidação no meio, o resultado pode ser de
+      antes da escrita e não é guardado.
+    - 'validar_versao' compara o PRAGMA data_version de cada conexão de leitura com o último
+      valor visto nela: se mudou, alguém (inclusive outro processo) gravou no arquivo e o
+      cache inteiro é descartado.
+    - 'versao' identifica os dados servidos: um id desta instância mais a geração, para que
+      versões de antes de um reinício do servidor nunca se repitam.
+    """
+
+    def __init__(self, max_entradas: int = 256, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._entradas: OrderedDict[tuple, tuple[list[str], list, int]] = OrderedDict()
+        self._versoes: dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidacoes = 0
+        self.instancia = uuid.uuid4().hex[:12]
+
+    @staticmethod
+    def chave(query: str, parametros: tuple = ()) -> tuple | None:
+        """Chave da consulta, ou None se ela não deve ser guardada."""
+        if not eh_consulta(query) or _NAO_DETERMINISTICA.search(query):
+            return None
+        return normalizar_sql(query), tuple(parametros)
+
+    def obter(self, chave: tuple | None) -> tuple[list[str], list] | None:
+        if chave is None or self.max_entradas <= 0:
+            return None
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                self.misses += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.hits += 1
+            return entrada[0], entrada[1]
+
+    def guardar(self, chave: tuple | None, colunas: list[str], linhas: list, geracao: int | None = None) -> None:
+        if chave is None or self.max_entradas <= 0:
+            return
+        tamanho = _estimar_bytes(colunas, linhas)
+        if tamanho > self.max_bytes:
+            return  # Resultado grande demais: ocuparia o cache inteiro
+        with self._lock:
+            if geracao is not None and geracao != self.invalidacoes:
+                return  # Invalidado durante a consulta: o resultado pode ser anterior à escrita
+            anterior = self._entradas.pop(chave, None)
+            if anterior is not None:
+                self.bytes -= anterior[2]
+            self._entradas[chave] = (colunas, linhas, tamanho)
+            self.bytes += tamanho
+            while len(self._entradas) > self.max_entradas or self.bytes > self.max_bytes:
+                _, (_, _, despejado) = self._entradas.popitem(last=False)
+                self.bytes -= despejado
+
+    @property
+    def geracao(self) -> int:
+        """Versão dos dados: aumenta a cada invalidação (escrita das ferramentas ou mudança externa)."""
+        return self.invalidacoes
+
+    @property
+    def versao(self) -> str:
+        """Geração qualificada pela instância (o contador recomeça do zero a cada reinício)."""
+        return f"{self.instancia}.{self.geracao}"
+
+    def invalidar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+            self.bytes = 0
+            self.invalidacoes += 1
+
+    def validar_versao(self, conexao, versao: int) -> None:
+        """
+        Recebe o 'PRAGMA data_version' lido na conexão de leitura. O valor só é comparável
+        com leituras anteriores da mesma conexão; uma conexão nova também invalida, já que
+        não dá para saber o que mudou antes dela.
+        """
+        with self._lock:
+            anterior = self._versoes.get(id(conexao))
+            self._versoes[id(conexao)] = versao
+        if anterior != versao:
+            self.invalidar()
+
+    def estatisticas(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entradas": len(self._entradas),
+            "memoria_kb": round(self.bytes / 1024, 1),
+            "limite_kb": round(self.max_bytes / 1024, 1),
+            "hits": self.hits,
+            "misses": self.misses,
+            "taxa_acerto": round(self.hits / total, 3) if total else 0.0,
+            "invalidacoes": self.invalidacoes,
+        }
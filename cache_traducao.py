@@ -0,0 +1,215 @@
+import json
+import math
+import re
+import sqlite3
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+def normalizar_texto(texto: str) -> str:
+    """Normaliza a pergunta: minúsculas, sem acentos, sem pontuação e com espaços simples."""
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    texto = re.sub(r"[^\w\s]", " ", texto)
+    return " ".join(texto.split())
+
+
+def _similaridade_cosseno(a: list[float], b: list[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norma = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norma if norma else 0.0
+
+
+class _Entrada:
+    def __init__(self, resposta: str, criado_em: float, embedding: list[float] | None = None):
+        self.resposta = resposta
+        self.criado_em = criado_em
+        self.embedding = embedding
+
+
+class CacheTraducao:
+    """
+    Cache de traduções português -> SQL em duas camadas:
+    1. Exata, pela pergunta normalizada.
+    2. Semântica (opcional), por similaridade de embeddings acima de 'limiar_similaridade'.
+
+    As entradas expiram após 'ttl' segundos, são despejadas por LRU acima de 'max_entradas'
+    e persistidas em um arquivo SQLite local para sobreviver a reinícios. Os acessos (usado_em,
+    que define a ordem do LRU ao recarregar) são gravados em lote: a cada 'lote_usos' hits, a
+    cada 'intervalo_usos' segundos, a cada 'guardar' e no 'fechar'.
+    Guarda a resposta *bruta* do LLM: a limpeza do SQL continua sendo aplicada na leitura.
+    Quem usa a tradução chama 'invalidar' se o SQL dela for rejeitado ou falhar, para que a
+    próxima pergunta igual volte ao LLM em vez de repetir o erro até o TTL.
+    """
+
+    def __init__(self, caminho: str | None = "cache_traducao.db", max_entradas: int = 1000,
+                 ttl: float = 7 * 24 * 3600, embedder=None, limiar_similaridade: float = 0.95,
+                 lote_usos: int = 32, intervalo_usos: float = 30.0):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        # embedder: função assíncrona texto -> list[float]; None desativa a camada semântica
+        self.embedder = embedder
+        self.limiar_similaridade = limiar_similaridade
+        self._entradas: OrderedDict[str, _Entrada] = OrderedDict()
+        self.lote_usos = lote_usos
+        self.intervalo_usos = intervalo_usos
+        self._usos_pendentes: dict[str, float] = {}
+        self._ultima_gravacao_usos = time.monotonic()
+        # Pergunta normalizada -> entrada que a respondeu por similaridade (para 'invalidar')
+        self._semanticas: OrderedDict[str, str] = OrderedDict()
+
+        self.hits_exatos = 0
+        self.hits_semanticos = 0
+        self.misses = 0
+
+        self._conn = None
+        if caminho:
+            self._conn = sqlite3.connect(caminho)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS traducoes (
+                    chave TEXT PRIMARY KEY,
+                    resposta TEXT NOT NULL,
+                    embedding TEXT,
+                    criado_em REAL NOT NULL,
+                    usado_em REAL NOT NULL
+                )
+            """)
+            self._conn.commit()
+            self._carregar()
+
+    # --- Persistência ---
+
+    def _carregar(self) -> None:
+        limite = time.time() - self.ttl
+        self._conn.execute("DELETE FROM traducoes WHERE criado_em < ?", (limite,))
+        self._conn.commit()
+        linhas = self._conn.execute(
+            "SELECT chave, resposta, embedding, criado_em FROM traducoes ORDER BY usado_em DESC LIMIT ?",
+            (self.max_entradas,),
+        ).fetchall()
+        # Inserimos do menos para o mais recente, para manter a ordem do LRU
+        for chave, resposta, embedding, criado_em in reversed(linhas):
+            self._entradas[chave] = _Entrada(
+                resposta, criado_em, json.loads(embedding) if embedding else None
+            )
+
+    def _persistir(self, chave: str, entrada: _Entrada) -> None:
+        if self._conn is None:
+            return
+        embedding = json.dumps(entrada.embedding) if entrada.embedding else None
+        self._usos_pendentes.pop(chave, None)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO traducoes (chave, resposta, embedding, criado_em, usado_em) VALUES (?, ?, ?, ?, ?)",
+            (chave, entrada.resposta, embedding, entrada.criado_em, time.time()),
+        )
+        self._gravar_usos(commit=False)
+        self._conn.commit()
+
+    def _registrar_uso(self, chave: str) -> None:
+        """Marca o acesso à entrada; a gravação do usado_em fica para o próximo lote."""
+        if self._conn is None:
+            return
+        self._usos_pendentes[chave] = time.time()
+        if (len(self._usos_pendentes) >= self.lote_usos
+                or time.monotonic() - self._ultima_gravacao_usos >= self.intervalo_usos):
+            self._gravar_usos()
+
+    def _gravar_usos(self, commit: bool = True) -> None:
+        self._ultima_gravacao_usos = time.monotonic()
+        if not self._usos_pendentes:
+            return
+        self._conn.executemany(
+            "UPDATE traducoes SET usado_em = ? WHERE chave = ?",
+            [(usado_em, chave) for chave, usado_em in self._usos_pendentes.items()],
+        )
+        self._usos_pendentes.clear()
+        if commit:
+            self._conn.commit()
+
+    def _remover(self, chave: str) -> None:
+        self._entradas.pop(chave, None)
+        self._usos_pendentes.pop(chave, None)
+        self._semanticas.pop(chave, None)
+        if self._conn is not None:
+            self._conn.execute("DELETE FROM traducoes WHERE chave = ?", (chave,))
+            self._conn.commit()
+
+    # --- API ---
+
+    def _expirada(self, entrada: _Entrada) -> bool:
+        return time.time() - entrada.criado_em > self.ttl
+
+    async def obter(self, texto: str) -> str | None:
+        """Retorna a resposta bruta do LLM em cache para 'texto', ou None."""
+        chave = normalizar_texto(texto)
+        entrada = self._entradas.get(chave)
+        if entrada is not None:
+            if self._expirada(entrada):
+                self._remover(chave)
+            else:
+                self._entradas.move_to_end(chave)
+                self._registrar_uso(chave)
+                self.hits_exatos += 1
+                return entrada.resposta
+
+        if self.embedder is not None and self._entradas:
+            embedding = await self.embedder(chave)
+            melhor_chave, melhor_sim = None, 0.0
+            for outra_chave, outra in self._entradas.items():
+                if outra.embedding is None or self._expirada(outra):
+                    continue
+                sim = _similaridade_cosseno(embedding, outra.embedding)
+                if sim > melhor_sim:
+                    melhor_chave, melhor_sim = outra_chave, sim
+            if melhor_chave is not None and melhor_sim >= self.limiar_similaridade:
+                self._entradas.move_to_end(melhor_chave)
+                self._registrar_uso(melhor_chave)
+                self._semanticas[chave] = melhor_chave
+                self._semanticas.move_to_end(chave)
+                while len(self._semanticas) > self.max_entradas:
+                    self._semanticas.popitem(last=False)
+                self.hits_semanticos += 1
+                return self._entradas[melhor_chave].resposta
+
+        self.misses += 1
+        return None
+
+    async def guardar(self, texto: str, resposta: str) -> None:
+        """Guarda a resposta bruta do LLM para 'texto'."""
+        chave = normalizar_texto(texto)
+        embedding = await self.embedder(chave) if self.embedder is not None else None
+        entrada = _Entrada(resposta, time.time(), embedding)
+        self._entradas[chave] = entrada
+        self._entradas.move_to_end(chave)
+        self._persistir(chave, entrada)
+
+        while len(self._entradas) > self.max_entradas:
+            chave_antiga = next(iter(self._entradas))
+            self._remover(chave_antiga)
+
+    def invalidar(self, texto: str) -> None:
+        """Descarta a tradução usada para 'texto' (a da própria pergunta ou a semelhante que a respondeu)."""
+        chave = normalizar_texto(texto)
+        semelhante = self._semanticas.pop(chave, None)
+        if chave in self._entradas:
+            self._remover(chave)
+        elif semelhante is not None:
+            self._remover(semelhante)
+
+    def estatisticas(self) -> dict:
+        total = self.hits_exatos + self.hits_semanticos + self.misses
+        hits = self.hits_exatos + self.hits_semanticos
+        return {
+            "entradas": len(self._entradas),
+            "hits_exatos": self.hits_exatos,
+            "hits_semanticos": self.hits_semanticos,
+            "misses": self.misses,
+            "taxa_acerto": round(hits / total, 3) if total else 0.0,
+        }
+
+    def fechar(self) -> None:
+        if self._conn is not None:
+            self._gravar_usos()
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,178 @@
+import argparse
+import sqlite3
+
+from rich.console import Console
+from rich.panel import Panel
+from rich.table import Table
+from rich import box
+
+from banco import CAMINHO_BANCO, conectar, inicializar_schema
+
+console = Console()
+
+# Inserção de uma partida a partir dos nomes dos times. Os triggers de 'partidas'
+# (ver banco.SCHEMA) atualizam a classificação em 'times' na mesma transação.
+SQL_INSERIR_PARTIDA = """
+    INSERT INTO partidas (data, mandante_id, visitante_id, gols_mandante, gols_visitante)
+    SELECT ?, m.id, v.id, ?, ?
+    FROM times m, times v
+    WHERE m.nome = ? AND v.nome = ?
+"""
+
+# Classificação calculada do zero a partir de todas as partidas disputadas
+SQL_AGREGADO_PARTIDAS = """
+    WITH resultados AS (
+        SELECT mandante_id AS time_id, gols_mandante AS gp, gols_visitante AS gc
+        FROM partidas WHERE gols_mandante IS NOT NULL AND gols_visitante IS NOT NULL
+        UNION ALL
+        SELECT visitante_id, gols_visitante, gols_mandante
+        FROM partidas WHERE gols_mandante IS NOT NULL AND gols_visitante IS NOT NULL
+    )
+    SELECT time_id,
+           SUM(CASE WHEN gp > gc THEN 3 WHEN gp = gc THEN 1 ELSE 0 END) AS pontos,
+           SUM(gp > gc) AS vitorias,
+           SUM(gp = gc) AS empates,
+           SUM(gp < gc) AS derrotas,
+           SUM(gp - gc) AS saldo_gols
+    FROM resultados
+    GROUP BY time_id
+"""
+
+CONTADORES = ["pontos", "vitorias", "empates", "derrotas", "saldo_gols"]
+
+
+def parametros_partida(data: str, mandante: str, visitante: str,
+                       gols_mandante: int | None, gols_visitante: int | None) -> tuple:
+    """Parâmetros para SQL_INSERIR_PARTIDA, na ordem esperada."""
+    return (data, gols_mandante, gols_visitante, mandante, visitante)
+
+
+def registrar_partida(conn: sqlite3.Connection, data: str, mandante: str, visitante: str,
+                      gols_mandante: int | None = None, gols_visitante: int | None = None) -> bool:
+    """Insere uma partida (a classificação é atualizada pelos triggers). Retorna False se algum time não existir."""
+    cursor = conn.execute(
+        SQL_INSERIR_PARTIDA,
+        parametros_partida(data, mandante, visitante, gols_mandante, gols_visitante),
+    )
+    return cursor.rowcount == 1
+
+
+def reconstruir(conn: sqlite3.Connection) -> int:
+    """Recalcula toda a classificação de 'times' a partir de 'partidas'. Retorna o número de times atualizados."""
+    conn.execute("UPDATE times SET " + ", ".join(f"{c} = 0" for c in CONTADORES))
+    cursor = conn.execute(f"""
+        UPDATE times SET {", ".join(f"{c} = agregado.{c}" for c in CONTADORES)}
+        FROM ({SQL_AGREGADO_PARTIDAS}) AS agregado
+        WHERE times.id = agregado.time_id
+    """)
+    conn.commit()
+    return cursor.rowcount
+
+
+def verificar(conn: sqlite3.Connection) -> list[dict]:
+    """Compara a classificação incremental (em 'times') com a agregação do zero. Retorna as divergências."""
+    colunas = ", ".join(
+        f"t.{c} AS {c}_incremental, COALESCE(a.{c}, 0) AS {c}_agregado" for c in CONTADORES
+    )
+    cursor = conn.execute(f"""
+        SELECT t.nome, {colunas}
+        FROM times t LEFT JOIN ({SQL_AGREGADO_PARTIDAS}) AS a ON a.time_id = t.id
+        ORDER BY t.nome
+    """)
+    nomes = [desc[0] for desc in cursor.description]
+
+    divergencias = []
+    for row in cursor.fetchall():
+        linha = dict(zip(nomes, row))
+        diferencas = {
+            c: (linha[f"{c}_incremental"], linha[f"{c}_agregado"])
+            for c in CONTADORES
+            if linha[f"{c}_incremental"] != linha[f"{c}_agregado"]
+        }
+        if diferencas:
+            divergencias.append({"nome": linha["nome"], "diferencas": diferencas})
+    return divergencias
+
+
+def suspender_triggers(conn: sqlite3.Connection) -> None:
+    """
+    Remove os triggers de classificação (para cargas em lote) e guarda a agregação atual das
+    partidas. Depois da carga, chame restaurar_triggers, que recria os triggers e aplica à
+    classificação só o efeito das partidas carregadas.
+    """
+    nomes = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'partidas_classificacao_%'"
+    ).fetchall()
+    for (nome,) in nomes:
+        conn.execute(f"DROP TRIGGER IF EXISTS {nome}")
+    conn.execute("DROP TABLE IF EXISTS temp.agregado_antes")
+    conn.execute(f"CREATE TEMP TABLE agregado_antes AS {SQL_AGREGADO_PARTIDAS}")
+    conn.commit()
+
+
+def aplicar_diferenca(conn: sqlite3.Connection) -> int:
+    """
+    Soma aos contadores de 'times' a diferença entre a agregação atual das partidas e a guardada
+    por suspender_triggers: o mesmo resultado que os triggers teriam dado partida a partida.
+    Contadores digitados à mão (sem partidas por trás) são preservados, ao contrário de 'reconstruir'.
+    Retorna o número de times atualizados.
+    """
+    negativos = ", ".join(f"-{c}" for c in CONTADORES)
+    somas = ", ".join(f"SUM({c}) AS {c}" for c in CONTADORES)
+    cursor = conn.execute(f"""
+        UPDATE times SET {", ".join(f"{c} = times.{c} + diferenca.{c}" for c in CONTADORES)}
+        FROM (
+            SELECT time_id, {somas}
+            FROM (
+                SELECT * FROM ({SQL_AGREGADO_PARTIDAS})
+                UNION ALL
+                SELECT time_id, {negativos} FROM temp.agregado_antes
+            )
+            GROUP BY time_id
+            HAVING {" OR ".join(f"SUM({c}) != 0" for c in CONTADORES)}
+        ) AS diferenca
+        WHERE times.id = diferenca.time_id
+    """)
+    conn.execute("DROP TABLE temp.agregado_antes")
+    conn.commit()
+    return cursor.rowcount
+
+
+def restaurar_triggers(conn: sqlite3.Connection) -> int:
+    """Recria os triggers de classificação e aplica a diferença das partidas carregadas desde a suspensão."""
+    inicializar_schema(conn)
+    return aplicar_diferenca(conn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classificação derivada da tabela 'partidas'")
+    parser.add_argument("comando", choices=["verificar", "reconstruir"])
+    parser.add_argument("--banco", type=str, default=CAMINHO_BANCO)
+    args = parser.parse_args()
+
+    conn = conectar(args.banco)
+    inicializar_schema(conn)
+    try:
+        if args.comando == "reconstruir":
+            atualizados = reconstruir(conn)
+            console.print(Panel.fit(f"✅ Classificação reconstruída ({atualizados} times com partidas)", border_style="green", title="Classificação"))
+
+        divergencias = verificar(conn)
+        if not divergencias:
+            console.print(Panel.fit("✅ Classificação incremental confere com a agregação das partidas", border_style="green", title="Verificação"))
+            return
+
+        tabela = Table(title="Divergências (incremental → agregado)", box=box.SIMPLE)
+        tabela.add_column("Time")
+        tabela.add_column("Diferenças")
+        for item in divergencias:
+            detalhes = ", ".join(f"{c}: {inc} → {agr}" for c, (inc, agr) in item["diferencas"].items())
+            tabela.add_row(item["nome"], detalhes)
+        console.print(tabela)
+        console.print(Panel.fit(f"❌ {len(divergencias)} times divergentes. Use 'reconstruir' para corrigir.", border_style="red", title="Verificação"))
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
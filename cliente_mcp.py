@@ -0,0 +1,113 @@
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+
+import anyio
+import httpx
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
+
+# Erros que indicam a conexão SSE perdida (e não só a chamada que falhou)
+ERROS_CONEXAO = (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream,
+                 httpx.TransportError, ConnectionError)
+
+
+def erro_de_conexao(erro: Exception) -> bool:
+    """O erro veio do transporte (a sessão não serve mais) ou só desta chamada (timeout, erro da ferramenta)?"""
+    if isinstance(erro, McpError):
+        return erro.error.code == CONNECTION_CLOSED
+    return isinstance(erro, ERROS_CONEXAO)
+
+
+class FerramentaMCP:
+    """
+    Ferramenta MCP com a interface que o bot usa: metadata.name e acall(**argumentos), que
+    devolve um objeto com o CallToolResult em 'raw_output'. 'sessao' é qualquer objeto com
+    call_tool(nome, argumentos): o ClienteMCP ou uma ClientSession (ex.: em memória, nos benchmarks).
+    """
+
+    def __init__(self, sessao, nome: str):
+        self.sessao = sessao
+        self.metadata = SimpleNamespace(name=nome)
+
+    async def acall(self, **argumentos):
+        return SimpleNamespace(raw_output=await self.sessao.call_tool(self.metadata.name, argumentos))
+
+
+class ClienteMCP:
+    """
+    Uma sessão MCP (SSE) persistente com o server.py, direto pelo SDK 'mcp'.
+
+    - Sem o llama_index: a conexão não espera a importação dele, e a sessão é reaproveitada
+      entre chamadas (em vez de abrir uma conexão SSE e inicializar a sessão a cada chamada).
+    - A sessão vive em uma tarefa própria, que abre e fecha os contextos do SDK (o anyio exige
+      que sejam fechados na mesma tarefa em que foram abertos).
+    - A sessão é compartilhada pelas chamadas concorrentes. Um erro de uma chamada (timeout da
+      resposta, erro da ferramenta) falha só ela; se a conexão cair, a sessão é descartada e a
+      próxima chamada reconecta. A chamada que falhou não é repetida (pode ter sido uma escrita).
+    """
+
+    def __init__(self, url: str, timeout: float = 30.0):
+        self.url = url
+        self.timeout = timeout
+        self._sessao: ClientSession | None = None
+        self._encerrar: asyncio.Event | None = None
+        self._tarefa: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+        self.ferramentas: list[str] = []
+        self.conexoes = 0
+
+    async def _manter_sessao(self, pronta: asyncio.Future) -> None:
+        try:
+            async with sse_client(self.url, timeout=self.timeout) as (leitura, escrita):
+                async with ClientSession(leitura, escrita,
+                                         read_timeout_seconds=timedelta(seconds=self.timeout)) as sessao:
+                    await sessao.initialize()
+                    self.ferramentas = [ferramenta.name for ferramenta in (await sessao.list_tools()).tools]
+                    self._sessao = sessao
+                    self.conexoes += 1
+                    pronta.set_result(None)
+                    await self._encerrar.wait()
+        except BaseException as e:
+            if not pronta.done():
+                pronta.set_exception(e if isinstance(e, Exception) else ConnectionError(str(e)))
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            self._sessao = None
+
+    async def conectar(self) -> list[str]:
+        """Abre a sessão (se não houver uma) e retorna os nomes das ferramentas do servidor."""
+        async with self._lock:
+            if self._sessao is None:
+                if self._tarefa is not None:
+                    self._encerrar.set()
+                    await asyncio.gather(self._tarefa, return_exceptions=True)
+                pronta = asyncio.get_running_loop().create_future()
+                self._encerrar = asyncio.Event()
+                self._tarefa = asyncio.create_task(self._manter_sessao(pronta))
+                await pronta
+            return self.ferramentas
+
+    async def call_tool(self, nome: str, argumentos: dict):
+        sessao = self._sessao
+        if sessao is None:
+            await self.conectar()
+            sessao = self._sessao
+        try:
+            return await sessao.call_tool(nome, argumentos)
+        except Exception as e:
+            # Conexão quebrada: a próxima chamada abre uma sessão nova (se outra ainda não abriu)
+            if erro_de_conexao(e) and self._sessao is sessao:
+                self._sessao = None
+                if self._encerrar is not None:
+                    self._encerrar.set()
+            raise
+
+    async def fechar(self) -> None:
+        if self._tarefa is not None:
+            self._encerrar.set()
+            await asyncio.gather(self._tarefa, return_exceptions=True)
+            self._tarefa = None
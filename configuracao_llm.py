@@ -0,0 +1,91 @@
+from streaming_sql import completar_ate_sql
+
+# --- CONFIGURAÇÃO DO OLLAMA ---
+MODELO_LLM = "qwen2.5-coder:3b"
+# Janela de contexto (num_ctx). Mudar o valor entre requisições faz o Ollama recarregar o modelo.
+NUM_CTX = 4096
+# Threads de CPU usadas na inferência (num_thread); None deixa o Ollama escolher (núcleos físicos)
+NUM_THREAD = None
+# Tempo que o modelo fica carregado após a última requisição. Enquanto ele estiver carregado,
+# o Ollama reaproveita o KV cache do prefixo comum entre prompts (o PROMPT_TRADUCAO inteiro),
+# e só a pergunta nova precisa ser avaliada. Use -1 para nunca descarregar.
+KEEP_ALIVE = "30m"
+# Envia uma tradução de aquecimento na inicialização (carrega o modelo e avalia o preâmbulo)
+AQUECER_NA_INICIALIZACAO = True
+# --------------------------------
+
+# Prompt melhorado para traduzir português para SQL
+PROMPT_TRADUCAO = """\
+Você é um especialista em traduzir português para queries SQL. 
+Traduza a solicitação do usuário para uma query SQL válida.
+
+Regras IMPORTANTES:
+1. Use apenas a tabela 'times' com colunas: id, nome, estado, pontos, vitorias, empates, derrotas, saldo_gols
+2. Para SELECT: use WHERE nome LIKE '%Time%' para buscar times específicos
+3. Para ordenação: use ORDER BY pontos DESC
+4. Para INSERT: use INSERT INTO times (colunas) VALUES (valores)
+5. Retorne APENAS a query SQL, sem a palavra "sql", sem explicações, sem código markdown
+6. A query deve terminar com ponto e vírgula
+
+Exemplos de SELECT:
+Input: "Mostre todos os times"
+Output: SELECT * FROM times ORDER BY pontos DESC;
+
+Input: "Mostre o nome e pontos do Flamengo"
+Output: SELECT nome, pontos FROM times WHERE nome LIKE '%Flamengo%';
+
+Input: "Quais times têm mais de 50 pontos?"
+Output: SELECT nome, pontos FROM times WHERE pontos > 50 ORDER BY pontos DESC;
+
+Input: "Mostre a classificação com vitórias e derrotas"
+Output: SELECT nome, pontos, vitorias, empates, derrotas FROM times ORDER BY pontos DESC;
+
+Exemplos de INSERT:
+Input: "Adicione o time Palmeiras do estado São Paulo com 60 pontos"
+Output: INSERT INTO times (nome, estado, pontos) VALUES ('Palmeiras', 'São Paulo', 60);
+
+Input: "Adicione o Cruzeiro de Minas Gerais com 45 pontos, 15 vitórias, 0 empates, 5 derrotas e saldo de gols 10"
+Output: INSERT INTO times (nome, estado, pontos, vitorias, empates, derrotas, saldo_gols) VALUES ('Cruzeiro', 'Minas Gerais', 45, 15, 0, 5, 10);
+
+Input: "Crie um novo time chamado Botafogo"
+Output: INSERT INTO times (nome) VALUES ('Botafogo');
+
+Agora traduza: 
+"""
+
+
+def montar_prompt(texto_portugues: str) -> str:
+    """
+    Prompt de tradução. O preâmbulo fixo vem primeiro e a pergunta por último, para que o
+    prefixo seja idêntico em todas as requisições e aproveitado do cache do Ollama.
+    """
+    return PROMPT_TRADUCAO + texto_portugues + "\nOutput: "
+
+
+def opcoes_ollama() -> dict:
+    """Opções extras repassadas ao Ollama (além de num_ctx e temperature)."""
+    opcoes = {}
+    if NUM_THREAD is not None:
+        opcoes["num_thread"] = NUM_THREAD
+    return opcoes
+
+
+def criar_llm(request_timeout: float = 120.0):
+    """Cria o cliente Ollama do llama_index (importado só aqui: a importação leva segundos)."""
+    from llama_index.llms.ollama import Ollama
+
+    return Ollama(
+        model=MODELO_LLM,
+        request_timeout=request_timeout,
+        context_window=NUM_CTX,
+        keep_alive=KEEP_ALIVE,
+        additional_kwargs=opcoes_ollama(),
+    )
+
+
+async def aquecer(llm, texto: str = "Mostre todos os times") -> str:
+    """
+    Faz uma tradução descartável: carrega o modelo na memória e deixa o preâmbulo
+    no KV cache, tirando esse custo da primeira pergunta real.
+    """
+    return await completar_ate_sql(llm, montar_prompt(texto))
@@ -0,0 +1,29 @@
+import json
+
+# Formatos de resposta aceitos pelo 'ler_dados'
+FORMATOS = ("linhas", "colunar")
+
+
+def serializar_compacto(dados) -> str:
+    """JSON sem espaços nem indentação (o FastMCP indenta dicts e listas retornados pelas ferramentas)."""
+    return json.dumps(dados, ensure_ascii=False, separators=(",", ":"))
+
+
+def codificar_colunar(colunas: list[str], linhas: list) -> str:
+    """Resposta colunar: os nomes das colunas aparecem uma única vez, seguidos das linhas como listas."""
+    return serializar_compacto({
+        "formato": "colunar",
+        "colunas": colunas,
+        "linhas": [list(row) for row in linhas],
+    })
+
+
+def linhas_como_dicts(dados: dict) -> list[dict]:
+    """
+    Converte as linhas de uma resposta (colunar ou página) na lista de dicionários
+    usada pelas funções de formatação do bot.
+    """
+    colunas = dados.get("colunas")
+    if colunas is None:
+        return dados["linhas"]
+    return [dict(zip(colunas, row)) for row in dados["linhas"]]
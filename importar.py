@@ -0,0 +1,195 @@
+import argparse
+import csv
+import json
+import sqlite3
+import time
+from itertools import islice
+from pathlib import Path
+
+from rich.console import Console
+from rich.panel import Panel
+
+from banco import CAMINHO_BANCO, conectar, inicializar_schema
+from classificacao import restaurar_triggers, suspender_triggers
+
+console = Console()
+
+# Pragmas relaxados só durante a carga: perder a carga numa queda de energia é aceitável,
+# já que a importação é idempotente e pode ser repetida
+PRAGMAS_CARGA = [
+    "PRAGMA synchronous = OFF",
+    "PRAGMA cache_size = -131072",   # ~128 MB
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA foreign_keys = OFF",     # os ids das partidas já vêm de 'times'
+]
+
+COLUNAS_TIMES = ["nome", "estado", "pontos", "vitorias", "empates", "derrotas", "saldo_gols"]
+COLUNAS_PARTIDAS = ["data", "mandante", "visitante", "gols_mandante", "gols_visitante"]
+
+# Upsert pelo nome: reimportar o mesmo arquivo atualiza os times em vez de duplicá-los
+SQL_UPSERT_TIME = f"""
+    INSERT INTO times ({", ".join(COLUNAS_TIMES)})
+    VALUES ({", ".join("?" for _ in COLUNAS_TIMES)})
+    ON CONFLICT (nome) DO UPDATE SET
+        {", ".join(f"{c} = excluded.{c}" for c in COLUNAS_TIMES[1:])}
+"""
+
+# Upsert pela chave (data, mandante, visitante): reimportar corrige o placar em vez de duplicar
+# a partida. Os nomes dos times são resolvidos para ids em memória, antes do executemany.
+SQL_UPSERT_PARTIDA = """
+    INSERT INTO partidas (data, mandante_id, visitante_id, gols_mandante, gols_visitante)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (data, mandante_id, visitante_id) DO UPDATE SET
+        gols_mandante = excluded.gols_mandante,
+        gols_visitante = excluded.gols_visitante
+"""
+
+
+def _inteiro(valor):
+    """Converte campos numéricos vindos de CSV/JSON ('' e None viram None)."""
+    if valor is None or valor == "":
+        return None
+    return int(valor)
+
+
+def ler_registros(caminho: str):
+    """Lê um arquivo .csv, .jsonl ou .json registro a registro (como dicionários)."""
+    sufixo = Path(caminho).suffix.lower()
+    with open(caminho, encoding="utf-8", newline="") as arquivo:
+        if sufixo == ".csv":
+            yield from csv.DictReader(arquivo)
+        elif sufixo == ".jsonl":
+            for linha in arquivo:
+                if linha.strip():
+                    yield json.loads(linha)
+        elif sufixo == ".json":
+            # Um array JSON precisa ser carregado inteiro; prefira .jsonl para arquivos grandes
+            yield from json.load(arquivo)
+        else:
+            raise ValueError(f"Formato não suportado: {caminho} (use .csv, .jsonl ou .json)")
+
+
+def _parametros_time(registro: dict) -> tuple:
+    return (
+        registro["nome"],
+        registro.get("estado") or None,
+        *(_inteiro(registro.get(c)) or 0 for c in COLUNAS_TIMES[2:]),
+    )
+
+
+def _parametros_partidas(registros, ids_times: dict[str, int]):
+    """Converte os registros em parâmetros; partidas com times desconhecidos viram None (ignoradas)."""
+    for registro in registros:
+        mandante_id = ids_times.get(registro["mandante"])
+        visitante_id = ids_times.get(registro["visitante"])
+        if mandante_id is None or visitante_id is None:
+            yield None
+            continue
+        yield (
+            registro["data"],
+            mandante_id,
+            visitante_id,
+            _inteiro(registro.get("gols_mandante")),
+            _inteiro(registro.get("gols_visitante")),
+        )
+
+
+def garantir_nome_unico(conn: sqlite3.Connection) -> None:
+    """O upsert de times exige um índice único em 'nome' (ausente em bancos criados pelo brasileirao.py)."""
+    for _, nome_indice, unico, *_ in conn.execute("PRAGMA index_list(times)").fetchall():
+        colunas = [c[2] for c in conn.execute(f"PRAGMA index_info('{nome_indice}')").fetchall()]
+        if unico and colunas == ["nome"]:
+            return
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_times_nome ON times (nome)")
+    conn.commit()
+
+
+def _em_lotes(iteravel, tamanho: int):
+    iterador = iter(iteravel)
+    while lote := list(islice(iterador, tamanho)):
+        yield lote
+
+
+def importar(conn: sqlite3.Connection, tipo: str, arquivos: list[str], tamanho_lote: int = 5000,
+             incremental: bool = False) -> dict:
+    """
+    Importa 'times' ou 'partidas' dos arquivos, em lotes com executemany, uma transação por lote.
+
+    Para partidas, por padrão os triggers de classificação são suspensos durante a carga e a
+    diferença na agregação das partidas é somada aos times uma única vez no final (bem mais
+    rápido que atualizar os times a cada partida, com o mesmo resultado: contadores digitados à
+    mão continuam valendo). Com incremental=True os triggers ficam ativos durante a carga.
+    Retorna as estatísticas da carga (lidos, gravados, ignorados, linhas/s).
+    """
+    if tipo == "times":
+        garantir_nome_unico(conn)
+
+    for pragma in PRAGMAS_CARGA:
+        conn.execute(pragma)
+
+    suspender = tipo == "partidas" and not incremental
+    if suspender:
+        suspender_triggers(conn)
+
+    lidos = gravados = 0
+    inicio = time.perf_counter()
+    try:
+        if tipo == "partidas":
+            ids_times = dict(conn.execute("SELECT nome, id FROM times").fetchall())
+
+        for arquivo in arquivos:
+            if tipo == "times":
+                registros = (_parametros_time(r) for r in ler_registros(arquivo))
+            else:
+                registros = _parametros_partidas(ler_registros(arquivo), ids_times)
+
+            for lote in _em_lotes(registros, tamanho_lote):
+                lidos += len(lote)
+                lote = [parametros for parametros in lote if parametros is not None]
+                with conn:  # uma transação por lote
+                    cursor = conn.executemany(SQL_UPSERT_TIME if tipo == "times" else SQL_UPSERT_PARTIDA, lote)
+                gravados += cursor.rowcount
+    finally:
+        if suspender:
+            restaurar_triggers(conn)
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA foreign_keys = ON")
+    duracao = time.perf_counter() - inicio
+
+    return {
+        "lidos": lidos,
+        "gravados": gravados,
+        # Partidas cujo mandante ou visitante não existe em 'times'
+        "ignorados": lidos - gravados,
+        "segundos": round(duracao, 3),
+        "linhas_por_segundo": round(lidos / duracao) if duracao else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importação em lote de times e partidas (CSV, JSONL ou JSON)")
+    parser.add_argument("tipo", choices=["times", "partidas"])
+    parser.add_argument("arquivos", nargs="+")
+    parser.add_argument("--banco", type=str, default=CAMINHO_BANCO)
+    parser.add_argument("--lote", type=int, default=5000, help="registros por transação")
+    parser.add_argument("--incremental", action="store_true",
+                        help="partidas: mantém os triggers ativos em vez de aplicar a classificação no final")
+    args = parser.parse_args()
+
+    conn = conectar(args.banco)
+    inicializar_schema(conn)
+    try:
+        resultado = importar(conn, args.tipo, args.arquivos, args.lote, args.incremental)
+    finally:
+        conn.close()
+
+    console.print(Panel.fit(
+        f"✅ {resultado['lidos']} registros lidos, {resultado['gravados']} gravados, "
+        f"{resultado['ignorados']} ignorados\n"
+        f"⏱️ {resultado['segundos']}s ({resultado['linhas_por_segundo']} linhas/s)",
+        border_style="green", title=f"Importação de {args.tipo}",
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# Índices para os filtros/ordenações gerados pelo PROMPT_TRADUCAO e para as chaves de 'partidas'
+INDICES = [
+    "CREATE INDEX IF NOT EXISTS idx_times_pontos ON times (pontos DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_partidas_mandante ON partidas (mandante_id)",
+    "CREATE INDEX IF NOT EXISTS idx_partidas_visitante ON partidas (visitante_id)",
+    # Uma partida por (data, mandante, visitante): torna a importação de partidas idempotente
+    # e, por começar pela data, também atende filtros e ordenação por data
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_partidas_unica ON partidas (data, mandante_id, visitante_id)",
+]
+
+# Busca de times por nome via FTS5 com o tokenizador trigram: um LIKE '%...%' com 3 ou mais
+# caracteres encontra os candidatos pelo índice em vez de varrer a tabela inteira
+BUSCA_NOMES = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS times_trigramas USING fts5(
+        nome, content='times', content_rowid='id', tokenize='trigram case_sensitive 0'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS times_trigramas_insert AFTER INSERT ON times BEGIN
+        INSERT INTO times_trigramas (rowid, nome) VALUES (NEW.id, NEW.nome);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS times_trigramas_delete AFTER DELETE ON times BEGIN
+        INSERT INTO times_trigramas (times_trigramas, rowid, nome) VALUES ('delete', OLD.id, OLD.nome);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS times_trigramas_update AFTER UPDATE OF nome ON times BEGIN
+        INSERT INTO times_trigramas (times_trigramas, rowid, nome) VALUES ('delete', OLD.id, OLD.nome);
+        INSERT INTO times_trigramas (rowid, nome) VALUES (NEW.id, NEW.nome);
+    END
+    """,
+    # Sincroniza o índice com times inseridos antes dos triggers existirem (custo O(times))
+    "INSERT INTO times_trigramas (times_trigramas) VALUES ('rebuild')",
+]
+
+# O trigram só usa o índice com pelo menos 3 caracteres; termos menores ficam com o LIKE puro
+MIN_CARACTERES_TRIGRAMA = 3
+
+_RE_LIKE_NOME = re.compile(r"\b(\w+\.)?nome\s+LIKE\s+'%([^'%_]+)%'(?!\s*ESCAPE)", re.IGNORECASE)
+_RE_TRIGRAMAS = re.compile(r"\btimes_trigramas\b", re.IGNORECASE)
+_RE_JUNCAO = re.compile(r"\bJOIN\b|\bFROM\s+\w+(\s+\w+)?\s*,", re.IGNORECASE)
+
+
+def reescrever_busca_nome(query: str) -> str:
+    """
+    Acrescenta aos filtros "nome LIKE '%Time%'" uma pré-seleção pelo índice trigram de nomes.
+    O LIKE original continua na consulta: o índice só descarta quem não pode casar, então o
+    resultado é o mesmo de antes. Consultas que já usam o índice (inclusive as já reescritas)
+    voltam sem mudança, então reescrever de novo não altera nada.
+    """
+    if _RE_TRIGRAMAS.search(query):
+        return query
+
+    def substituir(m: re.Match) -> str:
+        prefixo, termo = m.group(1) or "", m.group(2)
+        if len(termo) < MIN_CARACTERES_TRIGRAMA or (not prefixo and _RE_JUNCAO.search(query)):
+            return m.group(0)  # Sem ganho do índice, ou "id" ficaria ambíguo em uma junção
+        return (f"({prefixo}id IN (SELECT rowid FROM times_trigramas WHERE nome LIKE '%{termo}%')"
+                f" AND {m.group(0)})")
+    return _RE_LIKE_NOME.sub(substituir, query)
+
+
+def eh_consulta(query: str) -> bool:
+    return query.lstrip().upper().startswith(("SELECT", "WITH"))
+
+
+def detectar_varreduras(plano: list[tuple]) -> list[str]:
+    """Recebe as linhas de EXPLAIN QUERY PLAN e retorna os passos que varrem uma tabela inteira."""
+    varreduras = []
+    for linha in plano:
+        detalhe = linha[3]
+        if not detalhe.startswith("SCAN "):
+            continue
+        if "VIRTUAL TABLE" in detalhe or "CONSTANT ROW" in detalhe or detalhe.startswith("SCAN ("):
+            continue
+        if " USING INDEX " in detalhe or " USING COVERING INDEX " in detalhe:
+            continue  # Percorre um índice (ex.: para o ORDER BY), não as linhas da tabela
+        varreduras.append(detalhe)
+    return varreduras
+
+
+class MonitorPlanos:
+    """
+    Roda EXPLAIN QUERY PLAN nas consultas recebidas (uma vez por query distinta)
+    e acumula as que caem em varredura completa de tabela.
+    """
+
+    def __init__(self, max_queries: int = 512):
+        self.max_queries = max_queries
+        self._verificadas: OrderedDict[str, list[str]] = OrderedDict()
+        # As ferramentas síncronas rodam em threads do servidor
+        self._lock = threading.Lock()
+        self.consultas_verificadas = 0
+        self.varreduras_completas = 0
+
+    def precisa_verificar(self, query: str) -> bool:
+        if not eh_consulta(query):
+            return False
+        with self._lock:
+            if query in self._verificadas:
+                self._verificadas.move_to_end(query)
+                return False
+        return True
+
+    def registrar(self, query: str, plano: list[tuple]) -> list[str]:
+        """Registra o plano da query e retorna os passos de varredura completa (lista vazia se nenhum)."""
+        varreduras = detectar_varreduras(plano)
+        with self._lock:
+            if query in self._verificadas:
+                # Verificada ao mesmo tempo por outra thread: já foi contada (e logada) por ela
+                return []
+            self._verificadas[query] = varreduras
+            while len(self._verificadas) > self.max_queries:
+                self._verificadas.popitem(last=False)
+            self.consultas_verificadas += 1
+            if varreduras:
+                self.varreduras_completas += 1
+        return varreduras
+
+    def verificar(self, conn: sqlite3.Connection, query: str) -> list[str]:
+        """Versão síncrona: executa o EXPLAIN QUERY PLAN na conexão e registra o resultado."""
+        if not self.precisa_verificar(query):
+            return []
+        plano = conn.execute("EXPLAIN QUERY PLAN " + query).fetchall()
+        return self.registrar(query, plano)
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            varreduras = [q for q, v in self._verificadas.items() if v][-10:]
+        return {
+            "consultas_verificadas": self.consultas_verificadas,
+            "varreduras_completas": self.varreduras_completas,
+            "queries_com_varredura": varreduras,
+        }
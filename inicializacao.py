@@ -0,0 +1,55 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+
+class Inicializacao:
+    """
+    Inicialização em etapas: registra quando cada etapa ficou pronta (segundos desde 'inicio')
+    e deixa quem depende dela esperar (ex.: a primeira pergunta que precisa do LLM espera a
+    etapa "llm", enquanto as que caem no atalho já são respondidas).
+
+    Uma etapa que falha também é marcada, com ok=False: quem espera segue e trata a ausência
+    do recurso como já fazia (ex.: ASR no backend padrão, Ollama sem aquecimento).
+    """
+
+    def __init__(self, inicio: float | None = None):
+        self.inicio = time.perf_counter() if inicio is None else inicio
+        self.etapas: dict[str, dict] = {}
+        self._eventos: dict[str, asyncio.Event] = {}
+
+    def _evento(self, etapa: str) -> asyncio.Event:
+        evento = self._eventos.get(etapa)
+        if evento is None:
+            evento = self._eventos[etapa] = asyncio.Event()
+        return evento
+
+    def marcar(self, etapa: str, duracao: float | None = None, ok: bool = True) -> None:
+        """Marca a etapa como pronta agora (com a duração dela, se medida)."""
+        registro = {"pronta_em_s": round(time.perf_counter() - self.inicio, 3), "ok": ok}
+        if duracao is not None:
+            registro["duracao_s"] = round(duracao, 3)
+        self.etapas[etapa] = registro
+        self._evento(etapa).set()
+
+    @asynccontextmanager
+    async def etapa(self, nome: str):
+        """Mede o bloco como a etapa 'nome'; ela é marcada ao final mesmo se o bloco falhar."""
+        inicio = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.marcar(nome, time.perf_counter() - inicio, ok)
+
+    def pronta(self, etapa: str) -> bool:
+        return etapa in self.etapas
+
+    async def esperar(self, etapa: str) -> bool:
+        """Espera a etapa terminar; retorna se ela deu certo."""
+        await self._evento(etapa).wait()
+        return self.etapas[etapa]["ok"]
+
+    def resumo(self) -> dict:
+        return dict(sorted(self.etapas.items(), key=lambda item: item[1]["pronta_em_s"]))
@@ -0,0 +1,203 @@
+import re
+import time
+
+from cache_traducao import normalizar_texto
+from metricas import EstatisticaLatencia
+
+# Marcador que substitui o nome do time na pergunta normalizada antes de casar os padrões
+MARCADOR_TIME = "_time_"
+
+ESTADOS = {
+    "acre", "alagoas", "amapa", "amazonas", "bahia", "ceara", "distrito federal", "espirito santo",
+    "goias", "maranhao", "mato grosso", "mato grosso do sul", "minas gerais", "para", "paraiba",
+    "parana", "pernambuco", "piaui", "rio de janeiro", "rio grande do norte", "rio grande do sul",
+    "rondonia", "roraima", "santa catarina", "sao paulo", "sergipe", "tocantins",
+}
+
+_VERBO_MOSTRAR = r"(?:(?:me )?(?:mostre|mostra|liste|lista|exiba|exibe|ver|veja|qual e|qual|quais sao|quais|como esta))"
+
+# (intenção, padrão sobre a pergunta normalizada, SQL com placeholders)
+# Os grupos nomeados do padrão viram os parâmetros, na ordem de 'parametros'.
+PADROES = [
+    (
+        "classificacao",
+        rf"^(?:{_VERBO_MOSTRAR} )?(?:todos os times|(?:a )?(?:classificacao|tabela)(?: (?:completa|geral|atual|do brasileirao))?)$",
+        "SELECT * FROM times ORDER BY pontos DESC",
+        (),
+    ),
+    (
+        "classificacao_resumida",
+        rf"^(?:{_VERBO_MOSTRAR} )?(?:a )?(?:classificacao|tabela) com (?:as )?vitorias(?: empates)? e derrotas$",
+        "SELECT nome, pontos, vitorias, empates, derrotas FROM times ORDER BY pontos DESC",
+        (),
+    ),
+    (
+        "pontos_do_time",
+        rf"^(?:(?:{_VERBO_MOSTRAR} )?(?:o nome e )?(?:os )?pontos (?:do|da|de) {MARCADOR_TIME}"
+        rf"|quantos pontos (?:tem|fez|possui) (?:o |a )?{MARCADOR_TIME})$",
+        "SELECT nome, pontos FROM times WHERE nome = ?",
+        ("time",),
+    ),
+    (
+        "dados_do_time",
+        rf"^(?:{_VERBO_MOSTRAR} )?(?:os )?(?:dados|informacoes|estatisticas|campanha) (?:do|da|de) {MARCADOR_TIME}$",
+        "SELECT * FROM times WHERE nome = ?",
+        ("time",),
+    ),
+    (
+        "times_acima_de",
+        rf"^(?:{_VERBO_MOSTRAR} )?(?:os )?times (?:que )?(?:tem|com|estao com) (?:mais de|acima de) (?P<pontos>\d+) pontos$",
+        "SELECT nome, pontos FROM times WHERE pontos > ? ORDER BY pontos DESC",
+        ("pontos",),
+    ),
+]
+
+# Inserções simples: casadas sobre o texto original (sem normalizar), para preservar
+# maiúsculas e acentos do nome do time novo
+PADRAO_INSERCAO = re.compile(
+    r"^(?:adicione|adiciona|crie|cria|cadastre|cadastra)\s+(?:um\s+novo\s+time\s+chamado|o\s+time|o)\s+"
+    r"(?P<nome>[^\W\d_][\w' .-]*?)"
+    r"(?:\s+(?:do\s+estado(?:\s+de)?|de|do|da)\s+(?P<estado>[^\W\d_][\w ]*?))?"
+    r"(?:\s+com\s+(?P<pontos>\d+)\s+pontos)?\s*[.!]?$",
+    re.IGNORECASE,
+)
+
+
+def _literal(valor) -> str:
+    """Literal SQL seguro para os parâmetros produzidos aqui (inteiros e textos)."""
+    if isinstance(valor, int):
+        return str(valor)
+    return "'" + str(valor).replace("'", "''") + "'"
+
+
+class ConsultaRapida:
+    """SQL parametrizado produzido pelo atalho, sem passar pelo LLM."""
+
+    def __init__(self, intencao: str, sql: str, parametros: tuple = ()):
+        self.intencao = intencao
+        self.sql = sql
+        self.parametros = parametros
+
+    def sql_literal(self) -> str:
+        """
+        As ferramentas MCP recebem só o texto da query, então os parâmetros são embutidos
+        como literais escapados (nunca concatenando o texto do usuário diretamente).
+        """
+        partes = self.sql.split("?")
+        texto = partes[0]
+        for parametro, resto in zip(self.parametros, partes[1:]):
+            texto += _literal(parametro) + resto
+        return texto + ";"
+
+
+class IndiceTimes:
+    """Nomes dos times (carregados de 'times') indexados pela forma normalizada."""
+
+    def __init__(self, nomes=()):
+        self._por_chave: dict[str, str] = {}
+        self._padrao: re.Pattern | None = None
+        self.carregar(nomes)
+
+    def carregar(self, nomes) -> None:
+        self._por_chave = {normalizar_texto(nome): nome for nome in nomes if nome}
+        self._padrao = None
+
+    def adicionar(self, nome: str) -> None:
+        self._por_chave[normalizar_texto(nome)] = nome
+        self._padrao = None
+
+    def __len__(self) -> int:
+        return len(self._por_chave)
+
+    def encontrar(self, texto_normalizado: str) -> tuple[str, int, int] | None:
+        """Primeiro time citado no texto: (nome canônico, início, fim). Nomes mais longos têm prioridade."""
+        if not self._por_chave:
+            return None
+        if self._padrao is None:
+            chaves = sorted(self._por_chave, key=len, reverse=True)
+            self._padrao = re.compile(r"\b(" + "|".join(map(re.escape, chaves)) + r")\b")
+        encontrado = self._padrao.search(texto_normalizado)
+        if encontrado is None:
+            return None
+        return self._por_chave[encontrado.group(1)], encontrado.start(), encontrado.end()
+
+
+class InterpretadorIntencoes:
+    """
+    Atalho determinístico na frente do LLM: reconhece as perguntas mais comuns (as mesmas
+    dos exemplos do PROMPT_TRADUCAO) e devolve o SQL direto. Retorna None quando nada casa,
+    e a pergunta segue para o Ollama.
+    """
+
+    def __init__(self, indice: IndiceTimes | None = None):
+        self.indice = indice or IndiceTimes()
+        self._padroes = [(nome, re.compile(padrao), sql, parametros) for nome, padrao, sql, parametros in PADROES]
+        self.acertos = 0
+        self.falhas = 0
+        self.por_intencao: dict[str, int] = {}
+        self.latencia = EstatisticaLatencia()
+
+    def interpretar(self, pergunta: str) -> ConsultaRapida | None:
+        inicio = time.perf_counter()
+        consulta = self._interpretar(pergunta)
+        self.latencia.registrar(time.perf_counter() - inicio)
+        if consulta is None:
+            self.falhas += 1
+        else:
+            self.acertos += 1
+            self.por_intencao[consulta.intencao] = self.por_intencao.get(consulta.intencao, 0) + 1
+        return consulta
+
+    def _interpretar(self, pergunta: str) -> ConsultaRapida | None:
+        insercao = self._interpretar_insercao(pergunta.strip())
+        if insercao is not None:
+            return insercao
+
+        texto = normalizar_texto(pergunta)
+        time_citado = None
+        encontrado = self.indice.encontrar(texto)
+        if encontrado is not None:
+            time_citado, inicio, fim = encontrado
+            texto = texto[:inicio] + MARCADOR_TIME + texto[fim:]
+
+        for nome, padrao, sql, parametros in self._padroes:
+            casamento = padrao.match(texto)
+            if casamento is None:
+                continue
+            valores = []
+            for parametro in parametros:
+                valores.append(time_citado if parametro == "time" else int(casamento.group(parametro)))
+            return ConsultaRapida(nome, sql, tuple(valores))
+        return None
+
+    def _interpretar_insercao(self, pergunta: str) -> ConsultaRapida | None:
+        casamento = PADRAO_INSERCAO.match(pergunta)
+        if casamento is None:
+            return None
+        nome, estado, pontos = casamento.group("nome", "estado", "pontos")
+        if estado is not None and normalizar_texto(estado) not in ESTADOS:
+            # "de X" que não é um estado: provavelmente parte do nome; o LLM decide
+            return None
+
+        colunas, valores = ["nome"], [nome.strip()]
+        if estado is not None:
+            colunas.append("estado")
+            valores.append(estado.strip())
+        if pontos is not None:
+            colunas.append("pontos")
+            valores.append(int(pontos))
+        sql = f"INSERT INTO times ({', '.join(colunas)}) VALUES ({', '.join('?' for _ in colunas)})"
+        return ConsultaRapida("insercao", sql, tuple(valores))
+
+    def estatisticas(self, latencia_llm_media: float = 0.0) -> dict:
+        """Taxa de acerto do atalho e tempo economizado (estimado pela latência média do LLM, em segundos)."""
+        total = self.acertos + self.falhas
+        return {
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "taxa_acerto": round(self.acertos / total, 3) if total else 0.0,
+            "por_intencao": dict(self.por_intencao),
+            "latencia": self.latencia.resumo(),
+            "economia_estimada_s": round(self.acertos * latencia_llm_media, 1),
+            "times_indexados": len(self.indice),
+        }
@@ -0,0 +1,51 @@
+from indices import eh_consulta
+
+# Limite de comandos por chamada do 'executar_lote'
+MAX_COMANDOS_LOTE = 50
+
+
+class LoteCancelado(Exception):
+    """Um comando do lote de escrita falhou: a transação inteira é desfeita."""
+
+
+def validar_lote(comandos: list[str]) -> list[str]:
+    """Confere o lote recebido pela ferramenta. Levanta ValueError se for inválido."""
+    if not isinstance(comandos, list) or not comandos:
+        raise ValueError("informe uma lista com pelo menos um comando SQL")
+    if len(comandos) > MAX_COMANDOS_LOTE:
+        raise ValueError(f"no máximo {MAX_COMANDOS_LOTE} comandos por lote")
+    if not all(isinstance(c, str) and c.strip() for c in comandos):
+        raise ValueError("todos os comandos devem ser textos SQL não vazios")
+    return comandos
+
+
+def tem_escrita(comandos: list[str]) -> bool:
+    """Um lote com qualquer comando que não seja SELECT/WITH roda inteiro na transação de escrita."""
+    return not all(eh_consulta(c) for c in comandos)
+
+
+def resultado_consulta(colunas: list[str], linhas: list, colunar: bool) -> dict:
+    if colunar:
+        return {"colunas": colunas, "linhas": [list(row) for row in linhas]}
+    return {"linhas": [dict(zip(colunas, row)) for row in linhas]}
+
+
+def resultado_escrita(alteradas: int) -> dict:
+    return {"alteradas": alteradas}
+
+
+def resultado_erro(mensagem: str) -> dict:
+    return {"erro": mensagem}
+
+
+def completar_cancelados(resultados: list[dict], total: int) -> list[dict]:
+    """Marca os comandos que não chegaram a rodar porque um anterior falhou."""
+    return resultados + [resultado_erro("Não executado: lote cancelado")] * (total - len(resultados))
+
+
+def montar_lote(transacao: str, resultados: list[dict], confirmado: bool) -> dict:
+    """
+    Resposta do 'executar_lote': um resultado por comando, na ordem recebida.
+    'confirmado' indica se as escritas foram gravadas (commit) ou desfeitas.
+    """
+    return {"formato": "lote", "transacao": transacao, "confirmado": confirmado, "resultados": resultados}
@@ -0,0 +1,54 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class EstatisticaLatencia:
+    """Acumula amostras de latência (em segundos) e calcula média, máximo e percentis."""
+
+    def __init__(self, janela: int = 1024):
+        # Guardamos apenas as últimas 'janela' amostras para os percentis
+        self._amostras = deque(maxlen=janela)
+        self._lock = threading.Lock()
+        self.total = 0
+        self.soma = 0.0
+        self.maximo = 0.0
+
+    def registrar(self, segundos: float) -> None:
+        with self._lock:
+            self._amostras.append(segundos)
+            self.total += 1
+            self.soma += segundos
+            if segundos > self.maximo:
+                self.maximo = segundos
+
+    def percentil(self, p: float) -> float:
+        """Retorna o percentil 'p' (0-100) das amostras recentes, em segundos."""
+        with self._lock:
+            amostras = sorted(self._amostras)
+        if not amostras:
+            return 0.0
+        indice = min(len(amostras) - 1, int(round(p / 100 * (len(amostras) - 1))))
+        return amostras[indice]
+
+    def resumo(self) -> dict:
+        """Resumo em milissegundos, pronto para log."""
+        media = self.soma / self.total if self.total else 0.0
+        return {
+            "n": self.total,
+            "media_ms": round(media * 1000, 2),
+            "p50_ms": round(self.percentil(50) * 1000, 2),
+            "p95_ms": round(self.percentil(95) * 1000, 2),
+            "p99_ms": round(self.percentil(99) * 1000, 2),
+            "max_ms": round(self.maximo * 1000, 2),
+        }
+
+    @contextmanager
+    def medir(self):
+        """Context manager que registra o tempo gasto no bloco."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(time.perf_counter() - inicio)
@@ -1,8 +1,9 @@
+import time
+# Início da importação: as etapas da inicialização são medidas a partir daqui
+INICIO = time.perf_counter()
 import nest_asyncio
 import asyncio
-from llama_index.llms.ollama import Ollama
-from llama_index.core import Settings
-from llama_index.tools.mcp import McpToolSpec, BasicMCPClient
+# O llama_index (Ollama) é importado só na etapa "llm"; as ferramentas MCP usam o SDK 'mcp' direto
 from mcp.types import CallToolResult
 import json
 import re
@@ -10,153 +11,397 @@ import re
 from rich.console import Console
 from rich.panel import Panel
 # --- NOVAS DEPENDÊNCIAS DO TELEGRAM E WHISPER ---
+from telebot import asyncio_helper
 from telebot.async_telebot import AsyncTeleBot
-import whisper
-import tempfile
+from telebot.types import InlineKeyboardButton, InlineKeyboardMarkup
+from transcricao import ServicoTranscricao
+from asr import criar_backend
+from cache_traducao import CacheTraducao
+from formatos import linhas_como_dicts
+from agendador import AgendadorChats
+from progresso import ReporterProgresso
+from streaming_sql import MetricasGeracao, completar_ate_sql
+from configuracao_llm import AQUECER_NA_INICIALIZACAO, aquecer, criar_llm, montar_prompt
+from intencoes import InterpretadorIntencoes
+from rastreamento import Rastreador, id_requisicao_atual
+from webhook import DeduplicadorUpdates, ServidorWebhook
+from cliente_mcp import ClienteMCP, FerramentaMCP
+from inicializacao import Inicializacao
+from renderizacao import (PREFIXO_NAVEGACAO, CacheRenderizacao, NavegacoesPaginas, dados_botao, ler_dados_botao,
+                          renderizar_tabela)
 import os
 # A importação 'subprocess' foi removida, pois não é mais necessária.
 # --------------------------------------------------
 
 nest_asyncio.apply()
 
-# Configura o Ollama (mantido)
-llm = Ollama(model="qwen2.5-coder:3b", request_timeout=120.0)
+# --- INICIALIZAÇÃO EM ETAPAS ---
+# "mcp" (ferramentas do server.py) -> "texto" (o bot já atende) e, em segundo plano, "indice_times",
+# "llm" (importação do llama_index/Ollama), "aquecimento" e "modelo_asr".
+# Perguntas que chegam antes só esperam a etapa de que precisam (o atalho não precisa do LLM).
+inicializacao = Inicializacao(INICIO)
+PRE_CARREGAR_ASR = True  # Carrega o modelo de ASR em segundo plano, antes da primeira nota de voz
+tarefa_preparacao: asyncio.Task | None = None
+# --------------------------------
+
+# Configura o Ollama (modelo, num_ctx, num_thread e keep_alive ficam em configuracao_llm.py).
+# Criado na etapa "llm", em segundo plano.
+llm = None
+# Tradução em streaming: interrompe a geração no primeiro ';' fora de aspas
+USAR_STREAMING = True
+metricas_geracao = MetricasGeracao()
 # Settings.llm será definido após o carregamento das ferramentas.
 
 # Console Rich (para logs e inicialização)
 console = Console()
 
 # --- CONFIGURAÇÕES DO TELEGRAM ---
-# ⚠️ TOKEN MANTIDO COMO FORNECIDO
-TELEGRAM_TOKEN = "<chavedobotdotelegram>"
+# ⚠️ TOKEN MANTIDO COMO FORNECIDO (a variável de ambiente TELEGRAM_TOKEN tem precedência)
+TELEGRAM_TOKEN = os.environ.get("TELEGRAM_TOKEN", "<chavedobotdotelegram>")
 bot = AsyncTeleBot(TELEGRAM_TOKEN, parse_mode='Markdown') # Usamos Markdown para formatação
+# API do Telegram alternativa (ex.: o Telegram falso de benchmarks/telegram_falso.py)
+if os.environ.get("TELEGRAM_API_URL"):
+    asyncio_helper.API_URL = os.environ["TELEGRAM_API_URL"]
 # --------------------------------
 
-# Prompt melhorado para traduzir português para SQL (Mantido inalterado)
-PROMPT_TRADUCAO = """\
-Você é um especialista em traduzir português para queries SQL. 
-Traduza a solicitação do usuário para uma query SQL válida.
-
-Regras IMPORTANTES:
-1. Use apenas a tabela 'times' com colunas: id, nome, estado, pontos, vitorias, empates, derrotas, saldo_gols
-2. Para SELECT: use WHERE nome LIKE '%Time%' para buscar times específicos
-3. Para ordenação: use ORDER BY pontos DESC
-4. Para INSERT: use INSERT INTO times (colunas) VALUES (valores)
-5. Retorne APENAS a query SQL, sem a palavra "sql", sem explicações, sem código markdown
-6. A query deve terminar com ponto e vírgula
-
-Exemplos de SELECT:
-Input: "Mostre todos os times"
-Output: SELECT * FROM times ORDER BY pontos DESC;
-
-Input: "Mostre o nome e pontos do Flamengo"
-Output: SELECT nome, pontos FROM times WHERE nome LIKE '%Flamengo%';
+# --- RECEBIMENTO DOS UPDATES ---
+# "polling" (long polling) ou "webhook": o Telegram envia cada update por HTTP para URL_WEBHOOK
+# (HTTPS público, normalmente um proxy reverso que repassa para HOST_WEBHOOK:PORTA_WEBHOOK).
+# Várias instâncias do bot podem ficar atrás do mesmo proxy, usando o mesmo servidor MCP;
+# com ARQUIVO_DEDUP elas compartilham a deduplicação dos update_id reenviados pelo Telegram.
+MODO_ENTRADA = os.environ.get("MODO_ENTRADA", "polling")
+URL_WEBHOOK = os.environ.get("URL_WEBHOOK")  # Sem URL, o setWebhook fica a cargo de quem faz o deploy
+HOST_WEBHOOK = "0.0.0.0"
+PORTA_WEBHOOK = int(os.environ.get("PORTA_WEBHOOK", "8443"))
+CAMINHO_WEBHOOK = "/webhook"
+SEGREDO_WEBHOOK = os.environ.get("SEGREDO_WEBHOOK")
+WORKERS_WEBHOOK = 8
+ARQUIVO_DEDUP = os.environ.get("ARQUIVO_DEDUP")  # ex.: "updates.db"; None = só em memória
+# --------------------------------
 
-Input: "Quais times têm mais de 50 pontos?"
-Output: SELECT nome, pontos FROM times WHERE pontos > 50 ORDER BY pontos DESC;
+# --- RASTREAMENTO ---
+# Um id por pergunta, enviado também ao servidor MCP; os histogramas por etapa são regravados em
+# ARQUIVO_METRICAS (texto Prometheus) a cada pergunta. Com ARQUIVO_SPANS, cada etapa vira também
+# uma linha JSONL (gravada em segundo plano, com rotação por tamanho).
+ARQUIVO_SPANS = os.environ.get("ARQUIVO_SPANS")  # ex.: "spans_bot.jsonl"; None = desativado
+ARQUIVO_METRICAS = "metricas_bot.prom"
+rastreador = Rastreador("brasileirao_bot", arquivo_jsonl=ARQUIVO_SPANS)
+rastreador.instrumentar(bot, "send_message", "telegram.send_message")
+rastreador.instrumentar(bot, "edit_message_text", "telegram.edit_message_text")
+rastreador.instrumentar(bot, "download_file", "telegram.download_file")
+# --------------------------------
 
-Input: "Mostre a classificação com vitórias e derrotas"
-Output: SELECT nome, pontos, vitorias, empates, derrotas FROM times ORDER BY pontos DESC;
+# Serviço de transcrição: mantém os modelos Whisper carregados e roda fora do event loop.
+# Notas de voz curtas que chegam juntas são transcritas em lote (até MAX_LOTE_ASR por passada).
+MAX_LOTE_ASR = 8
+# Motor de ASR: "whisper" (openai-whisper) ou "faster-whisper" (CTranslate2 int8). Para comparar
+# WER e tempo dos dois nas suas gravações, use benchmarks/asr.py (ver amostras_asr/).
+BACKEND_ASR = "whisper"
+MODELO_ASR = "small"
+servico_transcricao = ServicoTranscricao(max_modelos=2, limite_memoria_mb=4096, max_workers=1,
+                                         max_lote=MAX_LOTE_ASR, janela_lote=0.05,
+                                         backend=criar_backend(BACKEND_ASR))
+
+# --- CACHE DE TRADUÇÕES ---
+# Modelo de embeddings do Ollama para a camada semântica do cache (ex.: "nomic-embed-text").
+# Com None, apenas perguntas idênticas (após normalização) reaproveitam a tradução.
+MODELO_EMBEDDING_CACHE = None
+
+async def _embedding_ollama(texto: str) -> list[float]:
+    import ollama
+    resposta = await ollama.AsyncClient().embeddings(model=MODELO_EMBEDDING_CACHE, prompt=texto)
+    return resposta["embedding"]
+
+cache_traducao = CacheTraducao(
+    caminho="cache_traducao.db",
+    max_entradas=1000,
+    ttl=7 * 24 * 3600,
+    embedder=_embedding_ollama if MODELO_EMBEDDING_CACHE else None,
+)
+# --------------------------------
 
-Exemplos de INSERT:
-Input: "Adicione o time Palmeiras do estado São Paulo com 60 pontos"
-Output: INSERT INTO times (nome, estado, pontos) VALUES ('Palmeiras', 'São Paulo', 60);
+# Linhas por página nas consultas ao 'ler_dados' (cada página vira uma mensagem)
+TAMANHO_PAGINA = 50
+# Formato de resposta pedido ao 'ler_dados': "colunar" (compacto) ou "linhas" (lista de dicionários)
+FORMATO_RESPOSTA = "colunar"
+
+# --- TABELAS LONGAS ---
+# Cada página vira uma ou mais mensagens de até 4096 caracteres (limite do Telegram).
+# Respostas com várias mensagens: "mensagens" envia uma após a outra; "botoes" mostra uma
+# única mensagem com ◀️/▶️ (inline keyboard) para navegar entre elas.
+MODO_PAGINAS = "mensagens"
+# Tabelas já montadas, por consulta e versão dos dados (a classificação só é remontada após escritas)
+cache_renderizacao = CacheRenderizacao(max_entradas=64)
+navegacoes = NavegacoesPaginas(max_navegacoes=200)
+
+# --- ATALHO SEM LLM ---
+# Perguntas comuns (classificação, pontos de um time, times acima de N pontos, inserções simples)
+# são traduzidas por padrões fixos; o índice de nomes é carregado de 'times' na inicialização.
+USAR_ATALHO = True
+interpretador = InterpretadorIntencoes()
+# Recargas do índice em andamento (referência guardada até terminarem)
+recargas_indice: set[asyncio.Task] = set()
+# --------------------------------
 
-Input: "Adicione o Cruzeiro de Minas Gerais com 45 pontos, 15 vitórias, 0 empates, 5 derrotas e saldo de gols 10"
-Output: INSERT INTO times (nome, estado, pontos, vitorias, empates, derrotas, saldo_gols) VALUES ('Cruzeiro', 'Minas Gerais', 45, 15, 0, 5, 10);
+# --- AGENDADOR DE MENSAGENS ---
+# Fila FIFO por chat, no máximo 2 chamadas simultâneas ao Ollama e descarte de mensagens
+# (com aviso de "ocupado") quando as filas estouram. No ASR o limite é o tamanho do lote:
+# o serviço de transcrição já executa uma inferência por vez e agrupa as que chegam juntas.
+agendador = AgendadorChats(max_por_chat=5, max_total=100, limite_llm=2, limite_asr=MAX_LOTE_ASR)
+MENSAGEM_OCUPADO = "⏳ Estou com muitas perguntas na fila agora. Tente novamente em instantes."
+# --------------------------------
 
-Input: "Crie um novo time chamado Botafogo"
-Output: INSERT INTO times (nome) VALUES ('Botafogo');
+# --- MENSAGEM DE PROGRESSO ---
+# As etapas de cada pergunta são mostradas em uma única mensagem editada no lugar.
+# Com MOSTRAR_ETAPAS = False só a resposta final é enviada.
+MOSTRAR_ETAPAS = True
+INTERVALO_MINIMO_EDICAO = 1.0  # segundos entre edições da mesma mensagem
 
-Agora traduza: 
-"""
+def novo_progresso(chat_id: int) -> ReporterProgresso:
+    return ReporterProgresso(bot, chat_id, intervalo_minimo=INTERVALO_MINIMO_EDICAO, mostrar_etapas=MOSTRAR_ETAPAS)
+# --------------------------------
 
 # As ferramentas serão definidas globalmente após a inicialização no main.
+URL_MCP = os.environ.get("URL_MCP", "http://127.0.0.1:8000/sse")  # Endpoint SSE do server.py
+cliente_mcp = ClienteMCP(URL_MCP)  # Uma sessão persistente, aberta na etapa "mcp"
 ler_dados_tool = None
 adicionar_dados_tool = None
+executar_lote_tool = None  # Opcional: servidores antigos não têm o 'executar_lote'
 
 # --- FUNÇÕES DE UTILIDADE ---
 
+def limpar_sql(resposta: str) -> str:
+    """Aplica a limpeza na resposta bruta do LLM e devolve a query SQL final."""
+    sql = resposta.strip()
+    
+    # Limpa a resposta - remove a palavra "sql" e qualquer markdown
+    sql = re.sub(r'(?i)^sql\s*', '', sql) # Remove "sql" no início
+    sql = re.sub(r'["`]', '', sql) # Remove aspas
+    sql = re.sub(r'```.*?\n', '', sql) # Remove blocos de código markdown
+    sql = re.sub(r'```', '', sql) # Remove restante de markdown
+    
+    # Garante que termina com ponto e vírgula
+    if not sql.endswith(';'):
+        sql = sql + ';'
+    
+    # Remove espaços extras
+    return ' '.join(sql.split())
+
 async def traduzir_para_sql(texto_portugues: str) -> str:
-    """Usa o Ollama para traduzir português para SQL (Mantido)"""
+    """
+    Traduz português para SQL: tenta primeiro o atalho por padrões, depois o cache de traduções
+    e só então o Ollama.
+    """
     try:
-        prompt_completo = PROMPT_TRADUCAO + texto_portugues + "\nOutput: "
-        resposta = await llm.acomplete(prompt_completo)
-        sql = resposta.text.strip()
-        
-        # Limpa a resposta - remove a palavra "sql" e qualquer markdown
-        sql = re.sub(r'(?i)^sql\s*', '', sql) # Remove "sql" no início
-        sql = re.sub(r'["`]', '', sql) # Remove aspas
-        sql = re.sub(r'```.*?\n', '', sql) # Remove blocos de código markdown
-        sql = re.sub(r'```', '', sql) # Remove restante de markdown
-        
-        # Garante que termina com ponto e vírgula
-        if not sql.endswith(';'):
-            sql = sql + ';'
+        if USAR_ATALHO:
+            consulta = interpretador.interpretar(texto_portugues)
+            if consulta is not None:
+                sql = consulta.sql_literal()
+                console.log(f"[bold cyan]SQL gerado (atalho: {consulta.intencao})[/]: {sql}")
+                console.log(f"[bold cyan]Atalho[/]: {estatisticas_atalho()}")
+                return sql
+
+        resposta_bruta = await cache_traducao.obter(texto_portugues)
+        if resposta_bruta is None:
+            if llm is None and not await inicializacao.esperar("llm"):
+                raise RuntimeError("o LLM não pôde ser carregado")
+            prompt_completo = montar_prompt(texto_portugues)
+            async with agendador.limite_llm:
+                if USAR_STREAMING:
+                    # Para de gerar assim que a query termina em ';' (o modelo costuma continuar explicando)
+                    with rastreador.span("llm.geracao"):
+                        resposta_bruta = await completar_ate_sql(llm, prompt_completo, metricas_geracao)
+                else:
+                    with rastreador.span("llm.geracao"):
+                        resposta = await llm.acomplete(prompt_completo)
+                    resposta_bruta = resposta.text
+            console.log(f"[bold cyan]Geração do LLM[/]: {metricas_geracao.resumo()}")
+            if resposta_bruta.strip():
+                await cache_traducao.guardar(texto_portugues, resposta_bruta)
         
-        # Remove espaços extras
-        sql = ' '.join(sql.split())
+        sql = limpar_sql(resposta_bruta)
         
         console.log(f"[bold cyan]SQL gerado[/]: {sql}")
+        console.log(f"[bold cyan]Cache de traduções[/]: {cache_traducao.estatisticas()}")
         return sql
         
     except Exception as e:
         console.print(f"❌ Erro na tradução: {e}", style="bold red")
         return ""
 
+def estatisticas_atalho() -> dict:
+    return interpretador.estatisticas(latencia_llm_media=metricas_geracao.geracao_total.resumo()["media_ms"] / 1000)
+
+async def carregar_indice_times() -> None:
+    """(Re)carrega o índice de nomes usado pelo atalho a partir da tabela 'times'."""
+    nomes = []
+    async for linhas, _ in consumir_paginas("SELECT nome FROM times", tamanho_pagina=1000, formato=FORMATO_RESPOSTA):
+        nomes.extend(linha["nome"] for linha in linhas if isinstance(linha, dict) and "nome" in linha)
+    interpretador.indice.carregar(nomes)
+
+def _fim_recarga_indice(tarefa: asyncio.Task) -> None:
+    recargas_indice.discard(tarefa)
+    if not tarefa.cancelled() and tarefa.exception() is not None:
+        console.print(f"⚠️ Falha ao recarregar o índice do atalho: {tarefa.exception()}", style="bold yellow")
+
+def recarregar_indice_times() -> None:
+    """Recarrega o índice do atalho em segundo plano, sem atrasar a resposta da inserção."""
+    tarefa = asyncio.create_task(carregar_indice_times())
+    recargas_indice.add(tarefa)
+    tarefa.add_done_callback(_fim_recarga_indice)
+
+async def chamar_ferramenta(ferramenta, **argumentos):
+    """Chama a ferramenta MCP medindo o tempo e enviando o id da requisição atual ao servidor"""
+    with rastreador.span(f"mcp.{ferramenta.metadata.name}"):
+        return await ferramenta.acall(**argumentos, id_requisicao=id_requisicao_atual.get())
+
+def _decodificar_conteudo(resultado) -> list:
+    """Decodifica (JSON) cada item de texto do resultado da ferramenta"""
+    itens = []
+    if (hasattr(resultado, 'raw_output') and 
+        isinstance(resultado.raw_output, CallToolResult)):
+        
+        call_result = resultado.raw_output
+        if call_result.content:
+            for item in call_result.content:
+                if hasattr(item, 'text'):
+                    try:
+                        itens.append(json.loads(item.text))
+                    except json.JSONDecodeError:
+                        pass
+    return itens
+
+class ErroConsulta(RuntimeError):
+    """O servidor rejeitou ou não conseguiu executar o SQL (erro do próprio SQL, não da conexão)."""
+
+def _erro_da_ferramenta(resultado) -> str | None:
+    """Mensagem de erro devolvida pela ferramenta ("Erro...", texto fora do JSON), ou None"""
+    if (hasattr(resultado, 'raw_output') and
+        isinstance(resultado.raw_output, CallToolResult)):
+        for item in resultado.raw_output.content or []:
+            texto = getattr(item, 'text', '')
+            if texto.startswith("Erro"):
+                return texto
+    return None
+
+def _eh_pagina(dados) -> bool:
+    return isinstance(dados, dict) and dados.get("formato") == "pagina"
+
+def _eh_colunar(dados) -> bool:
+    return isinstance(dados, dict) and dados.get("formato") == "colunar"
+
 def processar_resultado(resultado: CallToolResult) -> list:
-    """Processa o resultado retornado pela ferramenta (Mantido)"""
+    """Processa o resultado retornado pela ferramenta (lista de linhas ou página)"""
     try:
-        if (hasattr(resultado, 'raw_output') and 
-            isinstance(resultado.raw_output, CallToolResult)):
-            
-            call_result = resultado.raw_output
-            times = []
-            
-            if call_result.content:
-                for item in call_result.content:
-                    if hasattr(item, 'text'):
-                        try:
-                            # A ferramenta retorna uma lista JSON, então carregamos a lista
-                            dados = json.loads(item.text)
-                            # Se for uma lista, estendemos
-                            if isinstance(dados, list):
-                                times.extend(dados)
-                            # Se for um único dicionário (ou falha na lista), adicionamos.
-                            else:
-                                times.append(dados)
-
-                        except json.JSONDecodeError:
-                            pass
-            
-            return times
-            
-        return []
+        times = []
+        for dados in _decodificar_conteudo(resultado):
+            # A ferramenta retorna uma lista JSON, então estendemos
+            if isinstance(dados, list):
+                times.extend(dados)
+            # Resposta paginada ou colunar: convertemos direto para lista de dicionários
+            elif _eh_pagina(dados) or _eh_colunar(dados):
+                times.extend(linhas_como_dicts(dados))
+            # Se for um único dicionário (ou falha na lista), adicionamos.
+            else:
+                times.append(dados)
+        return times
         
     except Exception as e:
         console.print(f"❌ Erro ao processar resultado: {e}", style="bold red")
         return []
 
+def extrair_pagina(resultado: CallToolResult) -> dict:
+    """Extrai a página de uma resposta paginada de 'ler_dados'"""
+    for dados in _decodificar_conteudo(resultado):
+        if _eh_pagina(dados):
+            return {**dados, "linhas": linhas_como_dicts(dados)}
+    erro = _erro_da_ferramenta(resultado)
+    if erro is not None:
+        raise ErroConsulta(erro)
+    # Resposta não paginada: tratamos como página única
+    return {"formato": "pagina", "linhas": processar_resultado(resultado), "proximo": None}
+
+async def consumir_paginas(query: str, tamanho_pagina: int = TAMANHO_PAGINA, formato: str = FORMATO_RESPOSTA,
+                           metadados: dict | None = None):
+    """
+    Consumidor incremental de 'ler_dados': produz (linhas, ultima_pagina) página a página.
+    A próxima página já é buscada enquanto quem consome processa a atual (e é cancelada
+    se quem consome parar antes). Em 'metadados' fica a "versao" dos dados da última página.
+    """
+    proxima = asyncio.ensure_future(
+        chamar_ferramenta(ler_dados_tool, query=query, tamanho_pagina=tamanho_pagina, formato=formato)
+    )
+    try:
+        while proxima is not None:
+            pagina = extrair_pagina(await proxima)
+            token = pagina.get("proximo")
+            proxima = asyncio.ensure_future(chamar_ferramenta(ler_dados_tool, token=token, formato=formato)) if token else None
+            if metadados is not None:
+                metadados["versao"] = pagina.get("versao")
+            yield pagina["linhas"], proxima is None
+    finally:
+        if proxima is not None:
+            proxima.cancel()
+
+async def executar_lote(comandos: list[str], formato: str = FORMATO_RESPOSTA) -> dict:
+    """
+    Executa vários comandos em uma única chamada MCP ('executar_lote').
+    Retorna o lote com as linhas de cada consulta já como lista de dicionários.
+    """
+    resultado = await chamar_ferramenta(executar_lote_tool, comandos=comandos, formato=formato)
+    for dados in _decodificar_conteudo(resultado):
+        if isinstance(dados, dict) and dados.get("formato") == "lote":
+            for item in dados["resultados"]:
+                if "linhas" in item:
+                    item["linhas"] = linhas_como_dicts(item)
+                    item.pop("colunas", None)
+            return dados
+        if isinstance(dados, dict) and "erro" in dados:
+            raise RuntimeError(dados["erro"])
+    raise RuntimeError("Resposta inesperada do 'executar_lote'")
+
+async def consultar_varias(*queries: str) -> list[list[dict]]:
+    """
+    Várias consultas em uma ida ao servidor, no mesmo snapshot do banco (ex.: a linha do time,
+    as partidas dele e a classificação). Sem o 'executar_lote', cai em uma chamada por consulta.
+    """
+    if executar_lote_tool is None:
+        resultados = []
+        for query in queries:
+            linhas = []
+            async for pagina, _ in consumir_paginas(query):
+                linhas.extend(pagina)
+            resultados.append(linhas)
+        return resultados
+
+    lote = await executar_lote(list(queries))
+    for query, item in zip(queries, lote["resultados"]):
+        if "erro" in item:
+            raise RuntimeError(f"{item['erro']} ({query})")
+    return [item["linhas"] for item in lote["resultados"]]
+
 def _render_tabela_times(times: list[dict], titulo: str | None = None) -> None:
     # Esta função é apenas para o console, mantida mas não usada pelo bot
     pass
     
 # --- FUNÇÃO DE TRANSCRIÇÃO WHISPER ---
 
-def whisper_transcribe(filepath: str, model_name="small") -> str:
+async def whisper_transcribe(audio: bytes | str, model_name: str | None = None) -> str:
     """
-    Função para realizar ASR em um arquivo de áudio. (Mantido)
+    Função para realizar ASR nos bytes do áudio (ou em um arquivo), usando o serviço de
+    transcrição (modelo residente + pool de workers, com lote para áudios curtos).
     """
     try:
-        # Nota: O Whisper lida com arquivos OGG nativamente se o FFmpeg/dependências
-        # estiverem corretamente instalados no ambiente.
-        model = whisper.load_model(model_name)
-        result = model.transcribe(filepath, language="pt") # Assume português
-        return result["text"]
+        # Nota: a decodificação em memória usa PyAV; sem ele, o ffmpeg é chamado via pipe.
+        async with agendador.limite_asr:
+            with rastreador.span("asr", backend=servico_transcricao.backend.nome):
+                texto = await servico_transcricao.transcrever(audio, modelo=model_name or MODELO_ASR)
+        console.log(f"[bold cyan]Transcrição[/]: {servico_transcricao.metricas()}")
+        return texto
     except Exception as e:
         console.print(f"❌ Erro na transcrição Whisper: {e}", style="bold red")
-        # Se você tiver problemas aqui, o erro pode ser a falta de dependências do Whisper 
-        # para decodificar OGG (como FFmpeg/opus-tools/etc).
+        # Se você tiver problemas aqui, o erro pode ser a falta de um decodificador de
+        # OGG/Opus (instale o PyAV com 'pip install av' ou o FFmpeg).
         return f"❌ Erro ao transcrever: {e}"
 
 # --- NOVO: FUNÇÃO DE FORMATAÇÃO PARA TEXTO SIMPLES (Mantido) ---
@@ -180,203 +425,366 @@ def formatar_texto_simples_para_telegram(data: list, pergunta: str) -> str:
     return output
 
 
-# --- FUNÇÃO DE FORMATAÇÃO PARA TABELA (para resultados complexos) (Mantido) ---
+# --- MENSAGENS DA RESPOSTA (tabelas em pedaços, com cache por versão dos dados) ---
 
-def formatar_tabela_para_telegram(data: list) -> str:
-    """Converte lista de dicionários em uma string formatada em Markdown V2 (bloco de código). (Mantido)"""
-    if not data or not isinstance(data[0], dict):
-        return "Nenhum dado para exibir."
-    
-    # Define os cabeçalhos das colunas
-    headers = ["Nome", "UF", "Pts", "V", "E", "D", "SG"]
-    
-    data_lines = []
-    for row in data:
-        # Pega as colunas relevantes e formata para alinhamento em monospaço
-        nome = str(row.get("nome", ""))[:10].ljust(10)
-        estado = str(row.get("estado", "")).ljust(2)
-        pontos = str(row.get("pontos", 0)).rjust(3)
-        vitorias = str(row.get("vitorias", 0)).rjust(1)
-        empates = str(row.get("empates", 0)).rjust(1)
-        derrotas = str(row.get("derrotas", 0)).rjust(1)
-        saldo_gols = str(row.get("saldo_gols", 0)).rjust(2)
-        
-        line = f"{nome} | {estado} | {pontos} | {vitorias} | {empates} | {derrotas} | {saldo_gols}"
-        data_lines.append(line)
-
-    # Cria a tabela em formato de bloco de código Markdown (Markdown V2)
-    table_str = "```\n"
-    table_str += " | ".join(headers) + "\n"
-    table_str += "-|-".join(["-" * len(h) for h in headers]) + "\n"
-    table_str += "\n".join(data_lines)
-    table_str += "\n```"
-    return table_str
+async def mensagens_da_consulta(query_sql: str, pergunta: str):
+    """
+    Produz as mensagens da resposta de uma consulta, página a página do 'ler_dados'.
+    Uma resposta pontual (uma página, 1 linha e até 3 colunas) vira texto simples; o resto,
+    tabelas em blocos de até 4096 caracteres. As tabelas ficam em cache_renderizacao pela
+    versão dos dados: se a primeira página vier de uma versão já montada, as demais nem são buscadas.
+    """
+    metadados = {}
+    paginas = consumir_paginas(query_sql, metadados=metadados)
+    primeira, chave, versao, montadas = True, None, None, []
+    try:
+        async for linhas, ultima_pagina in paginas:
+            if primeira:
+                primeira = False
+                # Resposta pontual: texto simples (depende da pergunta, não vai para o cache)
+                if ultima_pagina and len(linhas) == 1 and isinstance(linhas[0], dict) and len(linhas[0]) <= 3:
+                    yield formatar_texto_simples_para_telegram(linhas, pergunta)
+                    return
+                versao = metadados.get("versao")
+                chave = cache_renderizacao.chave(query_sql, versao)
+                em_cache = cache_renderizacao.obter(chave)
+                if em_cache is not None:
+                    for mensagem in em_cache:
+                        yield mensagem
+                    return
+            for mensagem in renderizar_tabela(linhas):
+                montadas.append(mensagem)
+                yield mensagem
+        # Se houve escrita entre as páginas, a tabela mistura versões: não é guardada
+        if metadados.get("versao") == versao:
+            cache_renderizacao.guardar(chave, montadas)
+    finally:
+        await paginas.aclose()
+
+def teclado_paginas(id_navegacao: str, indice: int, total: int) -> InlineKeyboardMarkup:
+    """Botões ◀️ i/total ▶️ de uma resposta com várias mensagens"""
+    botoes = []
+    if indice > 0:
+        botoes.append(InlineKeyboardButton("◀️", callback_data=dados_botao(id_navegacao, indice - 1)))
+    botoes.append(InlineKeyboardButton(f"{indice + 1}/{total}", callback_data=dados_botao(id_navegacao, None)))
+    if indice < total - 1:
+        botoes.append(InlineKeyboardButton("▶️", callback_data=dados_botao(id_navegacao, indice + 1)))
+    teclado = InlineKeyboardMarkup()
+    teclado.row(*botoes)
+    return teclado
+
+async def enviar_resposta(chat_id: int, progresso: ReporterProgresso, mensagens) -> bool:
+    """
+    Envia as mensagens da resposta: a primeira substitui a mensagem de progresso; as demais
+    vão como mensagens novas (MODO_PAGINAS = "mensagens") ou por botões na mesma mensagem ("botoes").
+    Retorna False se não houve nenhuma.
+    """
+    if MODO_PAGINAS == "botoes":
+        todas = [mensagem async for mensagem in mensagens]
+        if len(todas) > 1:
+            id_navegacao = navegacoes.registrar(todas)
+            await progresso.concluir(todas[0], reply_markup=teclado_paginas(id_navegacao, 0, len(todas)))
+        elif todas:
+            await progresso.concluir(todas[0])
+        return bool(todas)
+
+    enviou = False
+    async for mensagem in mensagens:
+        if not enviou:
+            await progresso.concluir(mensagem)
+        else:
+            await bot.send_message(chat_id, mensagem)
+        enviou = True
+    return enviou
 
 # --- LÓGICA PRINCIPAL ASSÍNCRONA DO BOT (COM VISUALIZAÇÃO DINÂMICA) (Mantido) ---
 
-async def processar_pergunta_assincrona(pergunta: str, chat_id: int):
+async def processar_pergunta_assincrona(pergunta: str, chat_id: int, progresso: ReporterProgresso | None = None):
     """
-    Encapsula toda a lógica de LLM/SQL e envia os resultados de volta para o Telegram. (Mantido)
+    Encapsula toda a lógica de LLM/SQL e envia os resultados de volta para o Telegram.
+    As etapas aparecem em uma única mensagem de progresso, que vira a resposta final.
     """
     global ler_dados_tool, adicionar_dados_tool
 
+    if progresso is None:
+        progresso = novo_progresso(chat_id)
+
     if ler_dados_tool is None or adicionar_dados_tool is None:
-        await bot.send_message(chat_id, "❌ Erro de inicialização: As ferramentas do MCP não foram carregadas.")
+        await progresso.concluir("❌ Erro de inicialização: As ferramentas do MCP não foram carregadas.")
         return
     
-    await bot.send_message(chat_id, f"Pergunta recebida: *{pergunta}*")
-    await bot.send_message(chat_id, "🔄 Traduzindo para SQL...", disable_notification=True)
+    if not progresso.titulo:
+        progresso.definir_titulo(f"Pergunta recebida: *{pergunta}*")
+    await progresso.etapa("🔄 Traduzindo para SQL...")
 
     try:
         # 1. Tradução para SQL
-        query_sql = await traduzir_para_sql(pergunta)
+        with rastreador.span("traducao"):
+            query_sql = await traduzir_para_sql(pergunta)
         
         if not query_sql:
-            await bot.send_message(chat_id, "❌ Não foi possível traduzir a pergunta para uma query SQL válida. Tente ser mais específico.")
+            await progresso.concluir("❌ Não foi possível traduzir a pergunta para uma query SQL válida. Tente ser mais específico.")
             return
 
-        await bot.send_message(chat_id, f"📝 Query SQL gerada:\n`{query_sql}`", disable_notification=True)
         query_sql = query_sql.strip()
+        await progresso.etapa(f"📝 Query SQL gerada:\n`{query_sql}`")
 
         # 2. Execução da Query
         if query_sql.upper().startswith('INSERT'):
             # Executa a query INSERT (Lógica mantida)
-            await bot.send_message(chat_id, "⚡ Executando inserção...", disable_notification=True)
-            resultado: CallToolResult = await adicionar_dados_tool.acall(query=query_sql)
+            await progresso.etapa(f"📝 `{query_sql}`\n⚡ Executando inserção...")
+            resultado: CallToolResult = await chamar_ferramenta(adicionar_dados_tool, query=query_sql)
             
             response_text = "Operação concluída. Detalhes: "
             if (hasattr(resultado, 'raw_output') and 
                 isinstance(resultado.raw_output, CallToolResult) and 
                 resultado.raw_output.content and 
                 hasattr(resultado.raw_output.content[0], 'text')):
-                response_text += resultado.raw_output.content[0].text
+                detalhes = resultado.raw_output.content[0].text
+                response_text += detalhes
+                if "sucesso" not in detalhes:
+                    # SQL rejeitado: a próxima pergunta igual pede uma tradução nova ao LLM
+                    cache_traducao.invalidar(pergunta)
+                elif USAR_ATALHO:
+                    # Um time novo precisa entrar no índice do atalho
+                    recarregar_indice_times()
             else:
                 response_text += "Resposta da ferramenta não formatada."
             
-            await bot.send_message(chat_id, f"✅ {response_text}")
+            await progresso.concluir(f"✅ {response_text}")
             
         else:
             # Executa a query SELECT
-            await bot.send_message(chat_id, "⚡ Executando consulta...", disable_notification=True)
-            resultado: CallToolResult = await ler_dados_tool.acall(query=query_sql)
-            times = processar_resultado(resultado)
+            await progresso.etapa(f"📝 `{query_sql}`\n⚡ Executando consulta...")
+
+            # 3. Exibe os resultados à medida que as páginas chegam (texto simples ou tabela)
+            with rastreador.span("resposta"):
+                encontrou_resultado = await enviar_resposta(chat_id, progresso, mensagens_da_consulta(query_sql, pergunta))
             
-            # 3. Exibe os resultados com Lógica Dinâmica
-            if times:
-                primeiro_item = times[0]
-                num_linhas = len(times)
-                # Garante que é um dicionário antes de contar colunas
-                num_colunas = len(primeiro_item) if primeiro_item and isinstance(primeiro_item, dict) else 0
-
-                # **LÓGICA DINÂMICA:**
-                # Critério: 1 linha E 3 ou menos colunas (Resposta pontual)
-                if num_linhas == 1 and num_colunas <= 3:
-                    # Formato de Texto Simples
-                    output_markdown = formatar_texto_simples_para_telegram(times, pergunta)
-                else:
-                    # Formato de Tabela (Para classificações ou resultados complexos)
-                    output_markdown = formatar_tabela_para_telegram(times)
-                    
-                await bot.send_message(chat_id, output_markdown)
-            else:
-                await bot.send_message(chat_id, "📭 Nenhum resultado encontrado. Verifique a query ou se o time existe no banco.")
+            if not encontrou_resultado:
+                await progresso.concluir("📭 Nenhum resultado encontrado. Verifique a query ou se o time existe no banco.")
         
+    except ErroConsulta as e:
+        # O SQL falhou no servidor: a próxima pergunta igual pede uma tradução nova ao LLM
+        cache_traducao.invalidar(pergunta)
+        await progresso.concluir(f"❌ Erro na consulta gerada:\n`{e}`")
     except Exception as e:
-        await bot.send_message(chat_id, f"❌ Erro durante o processamento:\n`{e}`")
+        await progresso.concluir(f"❌ Erro durante o processamento:\n`{e}`")
+    finally:
+        console.log(f"[bold cyan]Chamadas à API do Telegram (progresso)[/]: {progresso.chamadas_api}")
 
 
 # --- HANDLERS DO TELEGRAM ---
 
-# Handler para mensagens de texto (Mantido)
+async def agendar(chat_id: int, trabalho) -> None:
+    """Coloca o trabalho na fila do chat ou avisa que o bot está ocupado"""
+    async def executar_e_registrar():
+        with rastreador.requisicao() as id_requisicao:
+            try:
+                with rastreador.span("requisicao"):
+                    await trabalho()
+            finally:
+                rastreador.salvar_prometheus(ARQUIVO_METRICAS)
+                console.log(f"[bold cyan]Requisição {id_requisicao}[/]: {rastreador.resumo()}")
+        console.log(f"[bold cyan]Agendador[/]: {agendador.metricas()}")
+    
+    if not agendador.enviar(chat_id, executar_e_registrar):
+        console.log(f"[bold yellow]Mensagem descartada (fila cheia)[/]: chat {chat_id}")
+        await bot.send_message(chat_id, MENSAGEM_OCUPADO)
+
+# Handler para mensagens de texto
 @bot.message_handler(func=lambda message: True)
 async def handle_text(message):
     if message.text:
-        await processar_pergunta_assincrona(message.text, message.chat.id)
+        await agendar(message.chat.id, lambda: processar_pergunta_assincrona(message.text, message.chat.id))
 
-# Handler para mensagens de voz (SIMPLIFICADO)
+# Handler para mensagens de voz: o processamento entra na mesma fila do chat
 @bot.message_handler(content_types=['voice'])
 async def handle_voice(message):
-    await bot.send_message(message.chat.id, "🎤 Mensagem de voz recebida. Transcrevendo...")
-    
-    # Agora só precisamos do caminho do arquivo OGG
-    temp_file_path = None 
-    
+    await agendar(message.chat.id, lambda: processar_voz(message))
+
+# Handler dos botões ◀️/▶️: troca o texto da mesma mensagem pela parte escolhida da resposta
+@bot.callback_query_handler(func=lambda chamada: (chamada.data or "").startswith(PREFIXO_NAVEGACAO))
+async def handle_navegacao(chamada):
+    try:
+        id_navegacao, indice = ler_dados_botao(chamada.data)
+    except ValueError:
+        await bot.answer_callback_query(chamada.id)
+        return
+    mensagens = navegacoes.obter(id_navegacao)
+    if mensagens is None:
+        await bot.answer_callback_query(chamada.id, "Esta resposta expirou. Faça a pergunta de novo.")
+        return
+    if indice is not None and 0 <= indice < len(mensagens):
+        await bot.edit_message_text(mensagens[indice], chamada.message.chat.id, chamada.message.message_id,
+                                    reply_markup=teclado_paginas(id_navegacao, indice, len(mensagens)))
+    await bot.answer_callback_query(chamada.id)
+
+async def processar_voz(message):
+    """Baixa, transcreve e processa uma mensagem de voz"""
+    progresso = novo_progresso(message.chat.id)
+    await progresso.etapa("🎤 Mensagem de voz recebida. Transcrevendo...")
+
     try:
         # 1. Obtém o caminho do arquivo no servidor Telegram
         file_info = await bot.get_file(message.voice.file_id)
-        
-        # 2. Cria e baixa o arquivo de áudio OGG temporariamente (como antes)
-        # O Telegram envia voz como OGG Opus, que o Whisper aceita.
-        with tempfile.NamedTemporaryFile(suffix=".ogg", delete=False) as temp_audio_file:
-            temp_file_path = temp_audio_file.name
-            
+
+        # 2. Baixa o áudio OGG/Opus para a memória; ele é decodificado direto para o Whisper,
+        # sem arquivo temporário nem ffmpeg por mensagem
         downloaded_file = await bot.download_file(file_info.file_path)
-        
-        with open(temp_file_path, 'wb') as f:
-            f.write(downloaded_file)
-        
-        # Log para confirmar que o arquivo OGG foi salvo localmente
-        await bot.send_message(message.chat.id, f"💾 Áudio salvo localmente como OGG: `{temp_file_path}`", disable_notification=True)
+        console.log(f"[bold green]Áudio recebido[/]: {len(downloaded_file)} bytes")
 
-        # 3. Transcreve o áudio (diretamente do OGG)
-        transcribed_text = whisper_transcribe(temp_file_path)
+        # 3. Transcreve o áudio
+        transcribed_text = await whisper_transcribe(downloaded_file)
 
-        await bot.send_message(message.chat.id, f"✅ *Transcrição concluída:*\n_{transcribed_text}_")
-        
-        # 4. Processa a pergunta transcrita
-        await processar_pergunta_assincrona(transcribed_text, message.chat.id)
+        # 4. Processa a pergunta transcrita (na mesma mensagem de progresso)
+        progresso.definir_titulo(f"✅ *Transcrição:* _{transcribed_text}_")
+        await processar_pergunta_assincrona(transcribed_text, message.chat.id, progresso)
 
     except Exception as e:
-        await bot.send_message(message.chat.id, f"❌ Erro no processamento de voz:\n`{e}`")
+        await progresso.concluir(f"❌ Erro no processamento de voz:\n`{e}`")
+
+async def receber_por_webhook():
+    """Recebe os updates pelo servidor HTTP do webhook até o processo ser interrompido."""
+    servidor = ServidorWebhook(bot, caminho=CAMINHO_WEBHOOK, segredo=SEGREDO_WEBHOOK, workers=WORKERS_WEBHOOK,
+                               deduplicador=DeduplicadorUpdates(caminho=ARQUIVO_DEDUP))
+    try:
+        await servidor.iniciar(HOST_WEBHOOK, PORTA_WEBHOOK)
+        if URL_WEBHOOK:
+            await bot.set_webhook(url=URL_WEBHOOK, secret_token=SEGREDO_WEBHOOK, max_connections=WORKERS_WEBHOOK * 5)
+        console.print(Panel.fit(f"🚀 Bot recebendo updates por webhook em {HOST_WEBHOOK}:{PORTA_WEBHOOK}{CAMINHO_WEBHOOK}",
+                                border_style="green", title="Pronto"))
+        while True:
+            await asyncio.sleep(60)
+            console.log(f"[bold cyan]Webhook[/]: {servidor.metricas()}")
+    except Exception as e:
+        console.print(f"❌ Erro no webhook do bot: {e}", style="bold red")
     finally:
-        # 5. Limpa o arquivo temporário
-        if temp_file_path and os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
-            console.log(f"[bold green]Limpo:[/]: {temp_file_path}")
+        await servidor.parar()
+
+async def carregar_ferramentas_mcp():
+    """Conecta ao servidor MCP (URL_MCP) e carrega as ferramentas nas variáveis globais."""
+    global ler_dados_tool, adicionar_dados_tool, executar_lote_tool
+    nomes = await cliente_mcp.conectar()
+    ferramentas = {nome: FerramentaMCP(cliente_mcp, nome) for nome in nomes}
+    ler_dados_tool = ferramentas.get("ler_dados")
+    adicionar_dados_tool = ferramentas.get("adicionar_dados")
+    executar_lote_tool = ferramentas.get("executar_lote")
+    
+    if not ler_dados_tool or not adicionar_dados_tool:
+        raise Exception("Ferramentas 'ler_dados' ou 'adicionar_dados' não encontradas!")
 
-# --- FUNÇÃO PRINCIPAL (Mantida) ---
+async def preparar_indice_times():
+    if not USAR_ATALHO:
+        return
+    try:
+        async with inicializacao.etapa("indice_times"):
+            await carregar_indice_times()
+        console.print(Panel.fit(f"⚡ Atalho sem LLM ativo ({len(interpretador.indice)} times indexados)",
+                                border_style="green", title="Atalho"))
+    except Exception as e:
+        console.print(f"⚠️ Falha ao carregar os nomes dos times: {e}", style="bold yellow")
 
-async def main():
+async def preparar_llm():
+    """Cria o LLM (a importação roda em uma thread, sem travar o event loop) e aquece o modelo."""
+    global llm
+    try:
+        async with inicializacao.etapa("llm"):
+            if llm is None:
+                llm = await asyncio.to_thread(criar_llm, 120.0)
+    except Exception as e:
+        console.print(f"❌ Falha ao criar o LLM: {e}", style="bold red")
+        return
+
+    if AQUECER_NA_INICIALIZACAO:
+        try:
+            async with inicializacao.etapa("aquecimento"):
+                await aquecer(llm)
+            duracao = inicializacao.etapas["aquecimento"]["duracao_s"]
+            console.print(Panel.fit(f"🔥 Modelo carregado e prompt aquecido em {duracao:.1f}s",
+                                    border_style="green", title="Ollama"))
+        except Exception as e:
+            # Sem aquecimento a primeira pergunta só fica mais lenta
+            console.print(f"⚠️ Falha no aquecimento do Ollama: {e}", style="bold yellow")
+
+async def preparar_asr():
+    """Carrega o modelo de ASR antes da primeira nota de voz."""
+    if PRE_CARREGAR_ASR:
+        try:
+            async with inicializacao.etapa("modelo_asr"):
+                await asyncio.to_thread(servico_transcricao.pre_carregar, MODELO_ASR)
+        except Exception as e:
+            # O modelo será carregado na primeira transcrição (ou o erro aparecerá nela)
+            console.print(f"⚠️ Falha ao pré-carregar o modelo de ASR: {e}", style="bold yellow")
+
+def relatorio_inicializacao():
+    """Mostra quando cada etapa ficou pronta e registra as durações no rastreador (spans/Prometheus)."""
+    linhas = []
+    for etapa, registro in inicializacao.resumo().items():
+        rastreador.registrar(f"inicializacao.{etapa}", registro.get("duracao_s", registro["pronta_em_s"]),
+                             registro["ok"])
+        duracao = f" (etapa: {registro['duracao_s']:.2f}s)" if "duracao_s" in registro else ""
+        linhas.append(f"{'✅' if registro['ok'] else '⚠️'} {etapa}: {registro['pronta_em_s']:.2f}s{duracao}")
+    rastreador.salvar_prometheus(ARQUIVO_METRICAS)
+    console.print(Panel.fit("\n".join(linhas), border_style="cyan", title="Inicialização"))
+
+async def preparar_em_segundo_plano():
+    """Etapas que não impedem o atendimento de texto; rodam enquanto o bot já recebe mensagens."""
+    await preparar_indice_times()
+    await asyncio.gather(preparar_llm(), preparar_asr())
+    relatorio_inicializacao()
+
+async def inicializar() -> bool:
     """
-    Função principal que carrega as ferramentas e inicia o polling do bot. (Mantido)
+    Carrega as ferramentas MCP (o mínimo para atender texto) e deixa o resto em segundo plano.
+    Retorna False se o servidor MCP não estiver disponível.
     """
-    global ler_dados_tool, adicionar_dados_tool
-    
-    console.rule("⚽ [bold green]Assistente do Brasileirão Telegram Bot[/]", style="green")
-    
+    global tarefa_preparacao
     try:
-        # ⚠️ CORREÇÃO CRÍTICA APLICADA: Corrigido o endpoint para o nome do MCP
-        # Isso resolve o erro '404 Not Found' que você teve anteriormente.
-        mcp_client = BasicMCPClient("http://127.0.0.1:8000/sse")
-        mcp_spec = McpToolSpec(client=mcp_client)
-        
-        # Carregar as ferramentas de forma assíncrona
-        ferramentas = await mcp_spec.to_tool_list_async()
-        
-        # Atribuir às variáveis globais
-        for tool in ferramentas:
-            if tool.metadata.name == "ler_dados":
-                ler_dados_tool = tool
-            elif tool.metadata.name == "adicionar_dados":
-                adicionar_dados_tool = tool
-        
-        if not ler_dados_tool or not adicionar_dados_tool:
-            raise Exception("Ferramentas 'ler_dados' ou 'adicionar_dados' não encontradas!")
-
-        Settings.tools = ferramentas # Define as ferramentas no contexto do LlamaIndex
-        
+        async with inicializacao.etapa("mcp"):
+            await carregar_ferramentas_mcp()
         console.print(Panel.fit("✅ Ferramentas MCP carregadas com sucesso.", border_style="green", title="MCP"))
 
     except Exception as e:
         console.print(Panel.fit(f"❌ Erro ao carregar ferramentas MCP: {e}\nCertifique-se de que o 'server.py' está rodando.", border_style="red", title="Erro Crítico"))
+        return False
+
+    tarefa_preparacao = asyncio.create_task(preparar_em_segundo_plano())
+    inicializacao.marcar("texto")
+    console.print(Panel.fit(f"💬 Atendendo texto {inicializacao.etapas['texto']['pronta_em_s']:.1f}s após o início "
+                            "(atalho, LLM e ASR terminam em segundo plano)", border_style="green", title="Inicialização"))
+    return True
+
+# --- FUNÇÃO PRINCIPAL (Mantida) ---
+
+async def main():
+    """
+    Função principal: inicialização em etapas e recebimento dos updates (polling ou webhook).
+    """
+    console.rule("⚽ [bold green]Assistente do Brasileirão Telegram Bot[/]", style="green")
+    
+    if not await inicializar():
         return
 
-    # Inicia o bot em modo de 'polling'
     try:
-        console.print(Panel.fit(f"🚀 Bot inicializado! Procure por @seu_bot_name no Telegram.", border_style="green", title="Pronto"))
-        await bot.polling(none_stop=True)
-    except Exception as e:
-        console.print(f"❌ Erro no polling do bot: {e}", style="bold red")
+        if MODO_ENTRADA == "webhook":
+            await receber_por_webhook()
+            return
+
+        # Inicia o bot em modo de 'polling'
+        try:
+            console.print(Panel.fit(f"🚀 Bot inicializado! Procure por @seu_bot_name no Telegram.", border_style="green", title="Pronto"))
+            await bot.polling(none_stop=True)
+        except Exception as e:
+            console.print(f"❌ Erro no polling do bot: {e}", style="bold red")
+    finally:
+        # Grava os acessos pendentes do cache de traduções (ordem do LRU no próximo início)
+        cache_traducao.fechar()
+        await cliente_mcp.fechar()
+        rastreador.fechar()
+
+# Fim da importação do módulo (antes de qualquer conexão)
+inicializacao.marcar("importacao")
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
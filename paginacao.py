@@ -0,0 +1,148 @@
+import base64
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# Limite de segurança para o tamanho de página pedido pelo cliente
+TAMANHO_PAGINA_MAXIMO = 1000
+
+# Tamanho usado quando nem o cliente nem o token definem um
+TAMANHO_PAGINA_PADRAO = 50
+
+
+def criar_token(query: str, offset: int, tamanho: int) -> str:
+    """Gera o token de continuação (opaco para o cliente) com a query, a posição e o tamanho da próxima página."""
+    dados = json.dumps({"q": query, "o": offset, "t": tamanho}, ensure_ascii=False)
+    return base64.urlsafe_b64encode(dados.encode("utf-8")).decode("ascii")
+
+
+def ler_token(token: str) -> tuple[str, int, int | None]:
+    """
+    Decodifica o token de continuação em (query, offset, tamanho). O tamanho é None em tokens
+    sem ele. Levanta ValueError se o token for inválido.
+    """
+    try:
+        dados = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+        tamanho = dados.get("t")
+        return dados["q"], int(dados["o"]), int(tamanho) if tamanho is not None else None
+    except Exception as e:
+        raise ValueError(f"Token de continuação inválido: {e}") from e
+
+
+def sql_pagina(query: str) -> str:
+    """Envolve a query em uma subconsulta paginada (parâmetros: limite, offset)."""
+    return f"SELECT * FROM ({query.strip().rstrip(';')}) LIMIT ? OFFSET ?"
+
+
+def sql_continuacao(query: str) -> str:
+    """Consulta de onde um cursor de continuação lê até o fim, a partir do offset (parâmetro)."""
+    return f"SELECT * FROM ({query.strip().rstrip(';')}) LIMIT -1 OFFSET ?"
+
+
+class CursorAberto:
+    """Cursor de uma consulta paginada, parado no início da próxima página."""
+
+    def __init__(self, conexao, cursor, colunas: list[str], versao: str | None):
+        self.conexao = conexao
+        self.cursor = cursor
+        self.colunas = colunas
+        self.versao = versao
+        self.pendente: list = []  # Linha extra lida para saber se havia próxima página
+        self.usado_em = time.monotonic()
+
+
+class CursoresPaginacao:
+    """
+    Cursores abertos das consultas paginadas: a página seguinte continua de onde a anterior
+    parou (fetchmany), em vez de refazer a consulta e descartar 'offset' linhas a cada página
+    (custo O(n²) ao ler tudo).
+
+    - Indexados por (query, offset da próxima página); o token de continuação não muda e,
+      sem cursor guardado (expirado, despejado ou outro processo), a página é lida com OFFSET.
+    - Cada cursor tem a própria conexão de leitura, presa ao snapshot em que a consulta começou:
+      todas as páginas vêm dos mesmos dados, e a 'versao' devolvida é a da abertura.
+    - No máximo 'max_cursores' abertos; os parados há mais de 'ttl' segundos são descartados.
+      Quem retira um cursor descartado é quem fecha a conexão dele (síncrona ou aiosqlite).
+    """
+
+    def __init__(self, max_cursores: int = 8, ttl: float = 30.0):
+        self.max_cursores = max_cursores
+        self.ttl = ttl
+        self._cursores: OrderedDict[tuple[str, int], CursorAberto] = OrderedDict()
+        self._lock = threading.Lock()
+        self.continuados = 0
+        self.abertos = 0
+
+    def retirar(self, query: str, offset: int) -> tuple[CursorAberto | None, list[CursorAberto]]:
+        """(cursor parado em 'offset' ou None, cursores descartados a fechar)."""
+        with self._lock:
+            descartados = self._expirados()
+            cursor = self._cursores.pop((query, offset), None)
+            if cursor is not None:
+                self.continuados += 1
+            return cursor, descartados
+
+    def guardar(self, query: str, offset: int, cursor: CursorAberto) -> list[CursorAberto]:
+        """Guarda o cursor parado em 'offset'; retorna os cursores descartados a fechar."""
+        with self._lock:
+            cursor.usado_em = time.monotonic()
+            anterior = self._cursores.pop((query, offset), None)
+            self._cursores[(query, offset)] = cursor
+            descartados = self._expirados() + ([anterior] if anterior is not None else [])
+            while len(self._cursores) > self.max_cursores:
+                descartados.append(self._cursores.popitem(last=False)[1])
+            return descartados
+
+    def esvaziar(self) -> list[CursorAberto]:
+        """Retira todos os cursores (encerramento do servidor)."""
+        with self._lock:
+            cursores = list(self._cursores.values())
+            self._cursores.clear()
+            return cursores
+
+    def _expirados(self) -> list[CursorAberto]:
+        limite = time.monotonic() - self.ttl
+        expirados = [chave for chave, cursor in self._cursores.items() if cursor.usado_em < limite]
+        return [self._cursores.pop(chave) for chave in expirados]
+
+    def estatisticas(self) -> dict:
+        return {"abertos_agora": len(self._cursores), "abertos": self.abertos, "continuados": self.continuados}
+
+
+def parametros_pagina(query: str, tamanho_pagina: int, token: str | None) -> tuple[str, int, int]:
+    """
+    Resolve (query, offset, tamanho) a partir dos argumentos da ferramenta.
+    Com token, a query original vem dele e o argumento 'query' é ignorado; o tamanho da página
+    também, a menos que o cliente passe outro (tamanho_pagina > 0).
+    """
+    offset, tamanho_token = 0, None
+    if token:
+        query, offset, tamanho_token = ler_token(token)
+    if tamanho_pagina <= 0:
+        tamanho_pagina = tamanho_token or TAMANHO_PAGINA_PADRAO
+    tamanho = max(1, min(tamanho_pagina, TAMANHO_PAGINA_MAXIMO))
+    return query, offset, tamanho
+
+
+def montar_pagina(colunas: list[str], linhas: list, query: str, offset: int, tamanho: int,
+                  colunar: bool = False, versao: str | None = None) -> dict:
+    """
+    Monta a resposta paginada. 'linhas' deve ter até tamanho + 1 registros:
+    o registro extra só indica que existe uma próxima página.
+    Com colunar=True as linhas vão como listas, acompanhadas da lista de colunas.
+    'versao' (opcional) identifica a versão dos dados lida, para caches no cliente.
+    """
+    tem_mais = len(linhas) > tamanho
+    linhas = linhas[:tamanho]
+    pagina = {"formato": "pagina"}
+    if colunar:
+        pagina["colunas"] = colunas
+        pagina["linhas"] = [list(row) for row in linhas]
+    else:
+        pagina["linhas"] = [dict(zip(colunas, row)) for row in linhas]
+    pagina["offset"] = offset
+    pagina["proximo"] = criar_token(query, offset + tamanho, tamanho) if tem_mais else None
+    if versao is not None:
+        pagina["versao"] = versao
+    return pagina
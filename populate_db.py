@@ -1,8 +1,8 @@
 import sqlite3
+from importar import COLUNAS_TIMES, SQL_UPSERT_TIME, garantir_nome_unico
 
 # Conectando ao banco
 conn = sqlite3.connect('brasileirao.db')
-cursor = conn.cursor()
 
 times_2025 = [
     {"nome": "Flamengo", "estado": "RJ", "pontos": 46, "vitorias": 14, "empates": 4, "derrotas": 2, "saldo_gols": 35},
@@ -35,14 +35,10 @@ times_2025 = [
 
 
 
-# Inserindo os times
-for time in times_2025:
-    cursor.execute('''
-        INSERT INTO times (nome, estado, pontos, vitorias, empates, derrotas, saldo_gols)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    ''', (time["nome"], time["estado"], time["pontos"], time["vitorias"], 
-          time["empates"], time["derrotas"], time["saldo_gols"]))
+# Inserindo os times (em lote; rodar de novo atualiza os times em vez de duplicá-los)
+garantir_nome_unico(conn)
+with conn:
+    conn.executemany(SQL_UPSERT_TIME, [tuple(time[c] for c in COLUNAS_TIMES) for time in times_2025])
 
-# Salvando e fechando a conexão
-conn.commit()
+# Fechando a conexão
 conn.close()
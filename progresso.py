@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+
+class ReporterProgresso:
+    """
+    Mostra o andamento de uma pergunta em uma única mensagem do Telegram, editada no lugar
+    (edit_message_text) em vez de uma mensagem nova por etapa.
+
+    - As etapas são agrupadas (debounce): no máximo uma edição a cada 'intervalo_minimo' segundos,
+      sempre com o texto mais recente.
+    - Com mostrar_etapas=False nada é enviado até o resultado final.
+    - 'concluir' transforma a mensagem de progresso na resposta final, sem esperar o intervalo
+      (a edição agendada, se houver, é cancelada).
+    """
+
+    def __init__(self, bot, chat_id: int, titulo: str = "", intervalo_minimo: float = 1.0,
+                 mostrar_etapas: bool = True):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.titulo = titulo
+        self.intervalo_minimo = intervalo_minimo
+        self.mostrar_etapas = mostrar_etapas
+
+        self._message_id = None
+        self._texto_atual = None
+        self._texto_pendente = None
+        self._ultimo_envio = 0.0
+        self._tarefa_pendente: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+        self.chamadas_api = 0
+
+    def definir_titulo(self, titulo: str) -> None:
+        """Texto fixo mostrado acima da etapa atual."""
+        self.titulo = titulo
+
+    def _compor(self, etapa: str) -> str:
+        return f"{self.titulo}\n{etapa}" if self.titulo else etapa
+
+    async def _publicar(self, texto: str, reply_markup=None) -> None:
+        """Envia a mensagem (primeira vez) ou a edita no lugar."""
+        if texto == self._texto_atual and reply_markup is None:
+            return  # O Telegram rejeita edições sem mudança
+        if self._message_id is None:
+            mensagem = await self.bot.send_message(self.chat_id, texto, reply_markup=reply_markup)
+            self._message_id = mensagem.message_id
+        else:
+            await self.bot.edit_message_text(texto, self.chat_id, self._message_id, reply_markup=reply_markup)
+        self.chamadas_api += 1
+        self._texto_atual = texto
+        self._ultimo_envio = time.monotonic()
+
+    async def _publicar_pendente_depois(self, atraso: float) -> None:
+        await asyncio.sleep(atraso)
+        async with self._lock:
+            texto, self._texto_pendente = self._texto_pendente, None
+            self._tarefa_pendente = None
+            if texto is not None:
+                try:
+                    await self._publicar(texto)
+                except Exception:
+                    pass  # Uma etapa perdida não deve interromper a pergunta
+
+    async def etapa(self, texto: str) -> None:
+        """Atualiza a etapa atual (respeitando o intervalo mínimo entre edições)."""
+        if not self.mostrar_etapas:
+            return
+        async with self._lock:
+            texto = self._compor(texto)
+            restante = self.intervalo_minimo - (time.monotonic() - self._ultimo_envio)
+            if self._message_id is None or restante <= 0:
+                try:
+                    await self._publicar(texto)
+                except Exception:
+                    pass
+                return
+            # Dentro do intervalo: guarda só o texto mais recente e agenda a edição
+            self._texto_pendente = texto
+            if self._tarefa_pendente is None:
+                self._tarefa_pendente = asyncio.create_task(self._publicar_pendente_depois(restante))
+
+    async def concluir(self, texto: str, reply_markup=None) -> None:
+        """
+        Publica o resultado final, reaproveitando a mensagem de progresso quando houver.
+        'reply_markup' (ex.: botões de navegação) acompanha a mensagem final.
+        """
+        async with self._lock:
+            if self._tarefa_pendente is not None:
+                self._tarefa_pendente.cancel()
+                self._tarefa_pendente = None
+            self._texto_pendente = None
+
+            # O resultado sai na hora: o intervalo mínimo vale só para as etapas intermediárias
+            if self._message_id is not None:
+                try:
+                    await self._publicar(texto, reply_markup)
+                    return
+                except Exception:
+                    pass  # Se a edição falhar, envia como mensagem nova
+            await self.bot.send_message(self.chat_id, texto, reply_markup=reply_markup)
+            self.chamadas_api += 1
+            self._texto_atual = texto
@@ -0,0 +1,232 @@
+import contextvars
+import functools
+import inspect
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from metricas import EstatisticaLatencia
+
+# Limites (em segundos) dos buckets dos histogramas exportados no formato Prometheus
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Id da requisição atual (pergunta do usuário); atravessa tarefas asyncio e a fronteira do MCP
+id_requisicao_atual: contextvars.ContextVar[str | None] = contextvars.ContextVar("id_requisicao", default=None)
+
+
+def novo_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+class _Histograma:
+    def __init__(self):
+        self.contagens = [0] * len(BUCKETS)
+        self.total = 0
+        self.soma = 0.0
+        self.latencia = EstatisticaLatencia()
+
+    def registrar(self, segundos: float) -> None:
+        for i, limite in enumerate(BUCKETS):
+            if segundos <= limite:
+                self.contagens[i] += 1
+        self.total += 1
+        self.soma += segundos
+        self.latencia.registrar(segundos)
+
+
+class EscritorJsonl:
+    """
+    Grava linhas JSONL em uma thread própria, para que quem registra nunca espere pelo disco.
+
+    - As linhas passam por uma fila de até 'max_pendentes'; com a fila cheia (disco lento),
+      as novas são descartadas e contadas em 'descartadas' em vez de acumular memória.
+    - A thread grava tudo o que estiver na fila de uma vez (uma escrita por lote).
+    - Rotação por tamanho: ao passar de 'max_bytes', o arquivo vira 'arquivo.1' (o '.1' vira
+      '.2' e assim por diante), mantendo no máximo 'copias' arquivos antigos.
+    """
+
+    def __init__(self, caminho: str, max_bytes: int = 20 * 1024 * 1024, copias: int = 3,
+                 max_pendentes: int = 10000):
+        self.caminho = caminho
+        self.max_bytes = max_bytes
+        self.copias = copias
+        self.descartadas = 0
+        self._fila: queue.Queue[str | None] = queue.Queue(maxsize=max_pendentes)
+        self._thread = threading.Thread(target=self._gravar, name="escritor-jsonl", daemon=True)
+        self._thread.start()
+
+    def escrever(self, linha: str) -> None:
+        try:
+            self._fila.put_nowait(linha)
+        except queue.Full:
+            self.descartadas += 1
+
+    def _rotacionar(self) -> None:
+        for i in range(self.copias - 1, 0, -1):
+            if os.path.exists(f"{self.caminho}.{i}"):
+                os.replace(f"{self.caminho}.{i}", f"{self.caminho}.{i + 1}")
+        if self.copias > 0:
+            os.replace(self.caminho, f"{self.caminho}.1")
+        else:
+            os.remove(self.caminho)
+
+    def _gravar(self) -> None:
+        encerrar = False
+        while not encerrar:
+            linhas = [self._fila.get()]
+            while True:
+                try:
+                    linhas.append(self._fila.get_nowait())
+                except queue.Empty:
+                    break
+            if None in linhas:
+                encerrar = True
+                linhas = [linha for linha in linhas if linha is not None]
+            if not linhas:
+                continue
+            try:
+                with open(self.caminho, "a", encoding="utf-8") as arquivo:
+                    arquivo.writelines(linhas)
+                    tamanho = arquivo.tell()
+                if tamanho > self.max_bytes:
+                    self._rotacionar()
+            except OSError:
+                self.descartadas += len(linhas)  # Rastreamento nunca derruba o processo
+
+    def fechar(self, timeout: float = 5.0) -> None:
+        """Grava o que ainda estiver na fila e encerra a thread."""
+        if self._thread.is_alive():
+            self._fila.put(None)
+            self._thread.join(timeout)
+
+
+class Rastreador:
+    """
+    Spans por etapa (ASR, tradução, chamada MCP, SQLite, envio ao Telegram...), sem serviço externo:
+    - as durações alimentam um histograma por etapa, exportado em texto no formato Prometheus;
+    - opcionalmente (arquivo_jsonl), cada span vai também para um arquivo JSONL com o id da
+      requisição, gravado fora da thread de quem registra e com rotação por tamanho (EscritorJsonl).
+    """
+
+    def __init__(self, servico: str, arquivo_jsonl: str | None = None, max_bytes_jsonl: int = 20 * 1024 * 1024):
+        self.servico = servico
+        self._escritor = EscritorJsonl(arquivo_jsonl, max_bytes_jsonl) if arquivo_jsonl else None
+        self._histogramas: dict[str, _Histograma] = {}
+        self._lock = threading.Lock()
+
+    def exportar_jsonl(self, caminho: str | None, max_bytes: int = 20 * 1024 * 1024) -> None:
+        """Passa a gravar os spans em 'caminho' (None desativa)."""
+        if self._escritor is not None:
+            self._escritor.fechar()
+        self._escritor = EscritorJsonl(caminho, max_bytes) if caminho else None
+
+    def fechar(self) -> None:
+        """Grava os spans pendentes (chamar no encerramento do processo)."""
+        if self._escritor is not None:
+            self._escritor.fechar()
+
+    @contextmanager
+    def requisicao(self, id_requisicao: str | None = None):
+        """Define o id da requisição no contexto atual (um novo, se não for informado)."""
+        token = id_requisicao_atual.set(id_requisicao or novo_id())
+        try:
+            yield id_requisicao_atual.get()
+        finally:
+            id_requisicao_atual.reset(token)
+
+    @contextmanager
+    def span(self, etapa: str, **atributos):
+        """Mede o bloco como uma etapa. 'atributos' pode ser completado dentro do bloco."""
+        inicio = time.perf_counter()
+        ok = True
+        try:
+            yield atributos
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            self.registrar(etapa, time.perf_counter() - inicio, ok, atributos)
+
+    def registrar(self, etapa: str, segundos: float, ok: bool = True, atributos: dict | None = None) -> None:
+        with self._lock:
+            histograma = self._histogramas.get(etapa)
+            if histograma is None:
+                histograma = self._histogramas[etapa] = _Histograma()
+            histograma.registrar(segundos)
+        if self._escritor is not None:
+            registro = {
+                "ts": round(time.time(), 3),
+                "servico": self.servico,
+                "id_requisicao": id_requisicao_atual.get(),
+                "etapa": etapa,
+                "duracao_ms": round(segundos * 1000, 2),
+                "ok": ok,
+                **(atributos or {}),
+            }
+            self._escritor.escrever(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+
+    def instrumentar(self, objeto, metodo: str, etapa: str) -> None:
+        """Substitui objeto.metodo (assíncrono) por uma versão medida como 'etapa'."""
+        original = getattr(objeto, metodo)
+
+        @functools.wraps(original)
+        async def medido(*args, **kwargs):
+            with self.span(etapa):
+                return await original(*args, **kwargs)
+
+        setattr(objeto, metodo, medido)
+
+    def rastrear_ferramenta(self, funcao, nome: str):
+        """
+        Envolve uma ferramenta MCP em um span e acrescenta o parâmetro opcional 'id_requisicao',
+        pelo qual o cliente propaga o id da requisição para o servidor.
+        """
+        if inspect.iscoroutinefunction(funcao):
+            @functools.wraps(funcao)
+            async def envoltorio(*args, id_requisicao: str | None = None, **kwargs):
+                with self.requisicao(id_requisicao), self.span(f"ferramenta.{nome}"):
+                    return await funcao(*args, **kwargs)
+        else:
+            @functools.wraps(funcao)
+            def envoltorio(*args, id_requisicao: str | None = None, **kwargs):
+                with self.requisicao(id_requisicao), self.span(f"ferramenta.{nome}"):
+                    return funcao(*args, **kwargs)
+
+        assinatura = inspect.signature(funcao)
+        parametro = inspect.Parameter("id_requisicao", inspect.Parameter.KEYWORD_ONLY, default=None,
+                                      annotation=str | None)
+        envoltorio.__signature__ = assinatura.replace(parameters=[*assinatura.parameters.values(), parametro])
+        return envoltorio
+
+    def resumo(self) -> dict:
+        """p50/p95/máximo por etapa, em milissegundos."""
+        with self._lock:
+            return {etapa: h.latencia.resumo() for etapa, h in sorted(self._histogramas.items())}
+
+    def texto_prometheus(self) -> str:
+        """Histogramas por etapa no formato de texto do Prometheus."""
+        nome = f"{self.servico}_etapa_segundos"
+        linhas = [
+            f"# HELP {nome} Duração das etapas de atendimento ({self.servico})",
+            f"# TYPE {nome} histogram",
+        ]
+        with self._lock:
+            for etapa, h in sorted(self._histogramas.items()):
+                for limite, contagem in zip(BUCKETS, h.contagens):
+                    linhas.append(f'{nome}_bucket{{etapa="{etapa}",le="{limite}"}} {contagem}')
+                linhas.append(f'{nome}_bucket{{etapa="{etapa}",le="+Inf"}} {h.total}')
+                linhas.append(f'{nome}_sum{{etapa="{etapa}"}} {h.soma:.6f}')
+                linhas.append(f'{nome}_count{{etapa="{etapa}"}} {h.total}')
+        return "\n".join(linhas) + "\n"
+
+    def salvar_prometheus(self, caminho: str) -> None:
+        """Grava o texto Prometheus em arquivo (para o textfile collector do node_exporter, por exemplo)."""
+        temporario = caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            arquivo.write(self.texto_prometheus())
+        # Troca atômica: quem lê nunca vê o arquivo pela metade
+        os.replace(temporario, caminho)
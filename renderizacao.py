@@ -0,0 +1,186 @@
+import threading
+import uuid
+from collections import OrderedDict
+
+from cache_resultados import normalizar_sql
+
+# Limite do Telegram por mensagem (em unidades UTF-16 do texto)
+LIMITE_MENSAGEM = 4096
+
+# Colunas da tabela 'times' e seus cabeçalhos curtos, na ordem de exibição. Resultados com
+# alguma delas mostram só essas; os demais (ex.: partidas) mostram todas as colunas.
+CABECALHOS = {
+    "nome": "Nome",
+    "estado": "UF",
+    "pontos": "Pts",
+    "vitorias": "V",
+    "empates": "E",
+    "derrotas": "D",
+    "saldo_gols": "SG",
+}
+# Textos mais longos que isso são cortados (mantém as linhas estreitas no celular)
+LARGURA_MAXIMA = 12
+
+ABERTURA = "```\n"
+FECHAMENTO = "\n```"
+
+
+def tamanho_telegram(texto: str) -> int:
+    """Tamanho como o Telegram conta: unidades UTF-16 (emojis contam 2)."""
+    return len(texto.encode("utf-16-le")) // 2
+
+
+def colunas_exibidas(linha: dict) -> list[str]:
+    return [c for c in CABECALHOS if c in linha] or list(linha)
+
+
+def preparar_celulas(linhas: list[dict], colunas: list[str]) -> tuple[list[list[str]], list[int], list[bool]]:
+    """
+    Uma única passada pelas linhas: converte as células em texto e calcula, ao mesmo tempo,
+    a largura de cada coluna e se ela é numérica (alinhada à direita).
+    Retorna (células, larguras, numéricas).
+    """
+    cabecalhos = [CABECALHOS.get(c, c) for c in colunas]
+    larguras = [len(c) for c in cabecalhos]
+    numericas = [True] * len(colunas)
+    celulas = []
+    for linha in linhas:
+        textos = []
+        for i, coluna in enumerate(colunas):
+            valor = linha.get(coluna)
+            if valor is None:
+                texto = ""
+            elif isinstance(valor, (int, float)):
+                texto = str(valor)
+            else:
+                texto = str(valor)[:LARGURA_MAXIMA]
+                numericas[i] = False
+            if len(texto) > larguras[i]:
+                larguras[i] = len(texto)
+            textos.append(texto)
+        celulas.append(textos)
+    return celulas, larguras, numericas
+
+
+def renderizar_tabela(linhas: list[dict], limite: int = LIMITE_MENSAGEM):
+    """
+    Produz a tabela (bloco de código Markdown) em mensagens de até 'limite' caracteres,
+    cada uma com o cabeçalho repetido. As linhas vão sendo acumuladas e a mensagem é
+    fechada assim que a próxima linha não couber.
+    """
+    if not linhas or not isinstance(linhas[0], dict):
+        return
+    colunas = colunas_exibidas(linhas[0])
+    celulas, larguras, numericas = preparar_celulas(linhas, colunas)
+
+    # Um único format por linha, com larguras e alinhamentos já resolvidos
+    modelo = " | ".join(f"{{:{'>' if numerica else '<'}{largura}}}" for largura, numerica in zip(larguras, numericas))
+    cabecalho = " | ".join(CABECALHOS.get(c, c).ljust(largura) for c, largura in zip(colunas, larguras))
+    separador = "-|-".join("-" * largura for largura in larguras)
+    topo = f"{ABERTURA}{cabecalho}\n{separador}"
+    capacidade = limite - tamanho_telegram(topo) - tamanho_telegram(FECHAMENTO)
+
+    pedaco, ocupado = [], 0
+    for textos in celulas:
+        texto = "\n" + modelo.format(*textos)
+        tamanho = tamanho_telegram(texto)
+        if tamanho > capacidade:
+            texto = texto[:capacidade]  # Linha sozinha maior que a mensagem: cortada
+            tamanho = tamanho_telegram(texto)
+        if pedaco and ocupado + tamanho > capacidade:
+            yield topo + "".join(pedaco) + FECHAMENTO
+            pedaco, ocupado = [], 0
+        pedaco.append(texto)
+        ocupado += tamanho
+    if pedaco:
+        yield topo + "".join(pedaco) + FECHAMENTO
+
+
+class CacheRenderizacao:
+    """
+    Mensagens já renderizadas de cada consulta, indexadas pelo SQL normalizado e pela
+    versão dos dados informada pelo 'ler_dados' (que muda a cada escrita no banco):
+    enquanto a classificação não muda, a tabela não é montada de novo.
+    """
+
+    def __init__(self, max_entradas: int = 64):
+        self.max_entradas = max_entradas
+        self._entradas: OrderedDict[tuple, list[str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def chave(query: str, versao) -> tuple | None:
+        """Sem versão (servidor antigo) não há como saber se o resultado mudou: não guarda."""
+        return None if versao is None else (normalizar_sql(query), versao)
+
+    def obter(self, chave: tuple | None) -> list[str] | None:
+        if chave is None:
+            return None
+        with self._lock:
+            mensagens = self._entradas.get(chave)
+            if mensagens is None:
+                self.misses += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.hits += 1
+            return mensagens
+
+    def guardar(self, chave: tuple | None, mensagens: list[str]) -> None:
+        if chave is None or self.max_entradas <= 0:
+            return
+        with self._lock:
+            self._entradas[chave] = mensagens
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def estatisticas(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entradas": len(self._entradas),
+            "hits": self.hits,
+            "misses": self.misses,
+            "taxa_acerto": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+# --- Navegação por botões (inline keyboard) ---
+
+# callback_data dos botões: "pag:<id>:<índice>" ("-" no índice = botão só informativo)
+PREFIXO_NAVEGACAO = "pag:"
+
+
+def dados_botao(id_navegacao: str, indice: int | None) -> str:
+    return f"{PREFIXO_NAVEGACAO}{id_navegacao}:{'-' if indice is None else indice}"
+
+
+def ler_dados_botao(dados: str) -> tuple[str, int | None]:
+    """Decodifica o callback_data em (id da navegação, índice). Levanta ValueError se for inválido."""
+    if not dados.startswith(PREFIXO_NAVEGACAO):
+        raise ValueError(f"callback_data inesperado: {dados}")
+    id_navegacao, _, indice = dados[len(PREFIXO_NAVEGACAO):].partition(":")
+    return id_navegacao, None if indice == "-" else int(indice)
+
+
+class NavegacoesPaginas:
+    """
+    Guarda as mensagens das respostas exibidas com botões ◀️/▶️ (uma única mensagem do chat,
+    editada a cada clique). As mais antigas são descartadas; um clique nelas avisa que expirou.
+    """
+
+    def __init__(self, max_navegacoes: int = 200):
+        self.max_navegacoes = max_navegacoes
+        self._paginas: OrderedDict[str, list[str]] = OrderedDict()
+
+    def registrar(self, mensagens: list[str]) -> str:
+        # O callback_data do Telegram tem no máximo 64 bytes: o id é curto
+        id_navegacao = uuid.uuid4().hex[:10]
+        self._paginas[id_navegacao] = mensagens
+        while len(self._paginas) > self.max_navegacoes:
+            self._paginas.popitem(last=False)
+        return id_navegacao
+
+    def obter(self, id_navegacao: str) -> list[str] | None:
+        return self._paginas.get(id_navegacao)
@@ -1,128 +1,559 @@
 import sqlite3
 import argparse
+import asyncio
+import functools
+import anyio
 from mcp.server.fastmcp import FastMCP
+from starlette.responses import PlainTextResponse
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 from rich import box
+from banco import CAMINHO_BANCO, PoolConexoes, conectar
+from banco_async import PoolAssincrono, conectar_async
+from cache_resultados import CacheResultados
+from classificacao import SQL_INSERIR_PARTIDA, parametros_partida
+from indices import MonitorPlanos, reescrever_busca_nome
+from formatos import FORMATOS, codificar_colunar, serializar_compacto
+from paginacao import (CursorAberto, CursoresPaginacao, montar_pagina, parametros_pagina, sql_continuacao,
+                       sql_pagina)
+from rastreamento import Rastreador
+from lote import (LoteCancelado, completar_cancelados, montar_lote, resultado_consulta, resultado_erro,
+                  resultado_escrita, tem_escrita, validar_lote)
 
 
 mcp = FastMCP('brasileirao-db')
 console = Console()
 
-def init_db():
-    """Inicializa o banco de dados e retorna (conn, cursor)"""
+# Spans por ferramenta e por consulta ao SQLite, com o id da requisição enviado pelo bot.
+# Os histogramas ficam em GET /metrics (modo sse); o arquivo JSONL dos spans só com --spans.
+rastreador = Rastreador("brasileirao_servidor")
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metricas_prometheus(request) -> PlainTextResponse:
+    """Histogramas de duração por etapa no formato de texto do Prometheus"""
+    return PlainTextResponse(rastreador.texto_prometheus(), media_type="text/plain; version=0.0.4")
+
+# Pool de conexões criado uma única vez (o schema é inicializado junto)
+pool: PoolConexoes | None = None
+
+def obter_pool() -> PoolConexoes:
+    """Retorna o pool de conexões, criando-o (e o schema) na primeira chamada"""
+    global pool
+    if pool is None:
+        pool = PoolConexoes(CAMINHO_BANCO)
+    return pool
+
+# Verificação dos planos de execução das consultas recebidas
+monitor_planos = MonitorPlanos()
+
+def otimizar_consulta(query: str) -> str:
+    """Pré-seleciona pelo índice trigram os filtros por nome de time (mesmo resultado, sem varredura)"""
+    return reescrever_busca_nome(query)
+
+def registrar_varreduras(query: str, varreduras: list[str]) -> None:
+    """Loga as consultas cujo plano cai em varredura completa de tabela"""
+    if varreduras:
+        console.log(f"[bold yellow]⚠️ Varredura completa[/]: {query} -> {'; '.join(varreduras)}")
+
+# Cache dos resultados das consultas: esvaziado a cada escrita das ferramentas e quando
+# o PRAGMA data_version indica que o arquivo foi alterado por fora do servidor
+cache_resultados = CacheResultados()
+
+def versao_dados(conn) -> str:
+    """Versão atual dos dados, conferida antes com o PRAGMA data_version da conexão"""
+    cache_resultados.validar_versao(conn, conn.execute("PRAGMA data_version").fetchone()[0])
+    return cache_resultados.versao
+
+async def versao_dados_async(conn) -> str:
+    """Versão aiosqlite de 'versao_dados'"""
+    async with conn.execute("PRAGMA data_version") as cursor:
+        cache_resultados.validar_versao(conn, (await cursor.fetchone())[0])
+    return cache_resultados.versao
+
+def consultar(conn, sql: str, parametros: tuple = (), usar_cache: bool = True) -> tuple[list[str], list]:
+    """Executa a consulta (colunas, linhas) passando pelo cache de resultados.
+    usar_cache=False lê direto da conexão (ex.: dentro de uma transação, que tem o próprio snapshot)"""
+    with rastreador.span("sqlite.consulta") as atributos:
+        cache_resultados.validar_versao(conn, conn.execute("PRAGMA data_version").fetchone()[0])
+        chave = cache_resultados.chave(sql, parametros) if usar_cache else None
+        resultado = cache_resultados.obter(chave)
+        atributos["cache"] = resultado is not None
+        if resultado is None:
+            # Geração vista antes da consulta: se uma escrita invalidar o cache no meio, não guarda
+            geracao = cache_resultados.geracao
+            cursor = conn.execute(sql, parametros)
+            linhas = cursor.fetchall()
+            resultado = [desc[0] for desc in cursor.description], linhas
+            cache_resultados.guardar(chave, *resultado, geracao=geracao)
+        return resultado
+
+async def consultar_async(conn, sql: str, parametros: tuple = (), usar_cache: bool = True) -> tuple[list[str], list]:
+    """Versão aiosqlite de 'consultar'"""
+    with rastreador.span("sqlite.consulta") as atributos:
+        async with conn.execute("PRAGMA data_version") as cursor:
+            cache_resultados.validar_versao(conn, (await cursor.fetchone())[0])
+        chave = cache_resultados.chave(sql, parametros) if usar_cache else None
+        resultado = cache_resultados.obter(chave)
+        atributos["cache"] = resultado is not None
+        if resultado is None:
+            geracao = cache_resultados.geracao
+            async with conn.execute(sql, parametros) as cursor:
+                linhas = await cursor.fetchall()
+                resultado = [desc[0] for desc in cursor.description], linhas
+            cache_resultados.guardar(chave, *resultado, geracao=geracao)
+        return resultado
+
+# Cursores das consultas paginadas: a página seguinte continua a leitura da anterior (fetchmany)
+# em vez de refazer a consulta com OFFSET
+cursores_paginacao = CursoresPaginacao()
+
+def fechar_cursores(cursores: list[CursorAberto]) -> None:
+    for aberto in cursores:
+        aberto.conexao.close()
+
+def ler_continuacao(conn, query: str, offset: int, tamanho: int) -> tuple[list[str], list, str]:
+    """Até tamanho + 1 linhas a partir de 'offset', pelo cursor da página anterior (ou um novo)"""
+    with rastreador.span("sqlite.cursor") as atributos:
+        aberto, descartados = cursores_paginacao.retirar(query, offset)
+        fechar_cursores(descartados)
+        atributos["continuado"] = aberto is not None
+        if aberto is None:
+            # Versão lida antes de abrir o cursor: uma escrita concorrente só pode torná-la mais antiga
+            versao = versao_dados(conn)
+            conexao = conectar(obter_pool().caminho, somente_leitura=True)
+            try:
+                cursor = conexao.execute(sql_continuacao(query), (offset,))
+            except Exception:
+                conexao.close()
+                raise
+            aberto = CursorAberto(conexao, cursor, [desc[0] for desc in cursor.description], versao)
+            cursores_paginacao.abertos += 1
+        linhas = aberto.pendente + aberto.cursor.fetchmany(tamanho + 1 - len(aberto.pendente))
+        if len(linhas) > tamanho:
+            aberto.pendente = linhas[tamanho:]
+            fechar_cursores(cursores_paginacao.guardar(query, offset + tamanho, aberto))
+        else:
+            aberto.conexao.close()
+        return aberto.colunas, linhas, aberto.versao
+
+def ler_dados(query: str = "SELECT * FROM times", tamanho_pagina: int = 0, token: str = None, formato: str = "linhas") -> list | dict | str:
+    """Lê dados da tabela 'times' usando uma query SELECT.
+    Com tamanho_pagina > 0 (ou um token de continuação) retorna uma página:
+    {"formato": "pagina", "linhas": [...], "proximo": token ou null, "versao": versão dos dados}.
+    Com formato="colunar" retorna {"colunas": [...], "linhas": [[...], ...]} em JSON compacto."""
     try:
-        conn = sqlite3.connect('brasileirao.db')
-        cursor = conn.cursor()
-        
-        # Cria a tabela se não existir
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS times (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nome TEXT NOT NULL UNIQUE,
-                estado TEXT,
-                pontos INTEGER DEFAULT 0,
-                vitorias INTEGER DEFAULT 0,
-                empates INTEGER DEFAULT 0,
-                derrotas INTEGER DEFAULT 0,
-                saldo_gols INTEGER DEFAULT 0
-            )
-        """)
-        conn.commit()
-        return conn, cursor
+        if formato not in FORMATOS:
+            return [f"Erro: formato '{formato}' inválido (use {', '.join(FORMATOS)})"]
+        colunar = formato == "colunar"
         
+        paginado = tamanho_pagina > 0 or bool(token)
+        if paginado:
+            query, offset, tamanho = parametros_pagina(query, tamanho_pagina, token)
+        # O token guarda a query recebida; a reescrita vale só para a execução
+        consulta = otimizar_consulta(query)
+        
+        with obter_pool().leitura() as conn:
+            registrar_varreduras(consulta, monitor_planos.verificar(conn, consulta))
+            
+            if paginado:
+                if offset:
+                    colunas, linhas, versao = ler_continuacao(conn, consulta, offset, tamanho)
+                else:
+                    # Versão lida antes da consulta: uma escrita concorrente só pode torná-la mais antiga
+                    versao = versao_dados(conn)
+                    colunas, linhas = consultar(conn, sql_pagina(consulta), (tamanho + 1, offset))
+                pagina = montar_pagina(colunas, linhas, query, offset, tamanho, colunar, versao)
+                return serializar_compacto(pagina) if colunar else pagina
+            
+            colunas, resultados = consultar(conn, consulta)
+            
+            if colunar:
+                return codificar_colunar(colunas, resultados)
+            # Converter para lista de dicionários
+            return [dict(zip(colunas, row)) for row in resultados]
+        
+    except ValueError as e:
+        return [f"Erro: {e}"]
+    except sqlite3.Error as e:
+        return [f"Erro SQL: {e}"]
     except Exception as e:
-        print(f"Erro ao inicializar banco: {e}")
-        # Retorna None para ambos em caso de erro
-        return None, None
-
-@mcp.tool()
-def ler_dados(query: str = "SELECT * FROM times") -> list:
-    """Lê dados da tabela 'times' usando uma query SELECT."""
-    conn, cursor = init_db()
-    
-    # Verifica se a conexão foi estabelecida corretamente
-    if conn is None or cursor is None:
-        return ["Erro: Não foi possível conectar ao banco de dados"]
-    
+        return [f"Erro: Não foi possível conectar ao banco de dados ({e})"]
+
+def adicionar_time(nome: str, estado: str = None, pontos: int = 0, vitorias: int = 0, empates: int = 0, derrotas: int = 0, saldo_gols: int = 0) -> str:
+    """Adiciona um novo time à tabela 'times' com os parâmetros fornecidos."""
+    try:
+        with obter_pool().escrita() as conn:
+            # Verifica se o time já existe
+            if conn.execute("SELECT id FROM times WHERE nome = ?", (nome,)).fetchone():
+                return f"Erro: Time '{nome}' já existe no banco de dados"
+            
+            # Insere o novo time
+            conn.execute("""
+                INSERT INTO times (nome, estado, pontos, vitorias, empates, derrotas, saldo_gols)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (nome, estado, pontos, vitorias, empates, derrotas, saldo_gols))
+        cache_resultados.invalidar()
+        
+        return f"Time '{nome}' adicionado com sucesso ao banco de dados"
+        
+    except sqlite3.Error as e:
+        return f"Erro ao adicionar time: {e}"
+    except Exception as e:
+        return f"Erro: Não foi possível conectar ao banco de dados ({e})"
+
+def adicionar_dados(query: str) -> str:
+    """Adiciona um novo registro à tabela 'times' usando uma query INSERT."""
+    try:
+        with obter_pool().escrita() as conn:
+            conn.execute(query)
+        cache_resultados.invalidar()
+        return "Dados adicionados com sucesso"
+    except sqlite3.Error as e:
+        return f"Erro ao adicionar dados: {e}"
+    except Exception as e:
+        return f"Erro: Não foi possível conectar ao banco de dados ({e})"
+
+def adicionar_partida(data: str, mandante: str, visitante: str, gols_mandante: int = None, gols_visitante: int = None) -> str:
+    """Registra uma partida entre dois times já cadastrados. A classificação em 'times' é atualizada automaticamente."""
+    try:
+        with obter_pool().escrita() as conn:
+            cursor = conn.execute(SQL_INSERIR_PARTIDA, parametros_partida(data, mandante, visitante, gols_mandante, gols_visitante))
+            if cursor.rowcount != 1:
+                return f"Erro: Time '{mandante}' ou '{visitante}' não encontrado no banco de dados"
+        cache_resultados.invalidar()
+        return f"Partida {mandante} x {visitante} registrada com sucesso"
+    except sqlite3.Error as e:
+        return f"Erro ao registrar partida: {e}"
+    except Exception as e:
+        return f"Erro: Não foi possível conectar ao banco de dados ({e})"
+
+def executar_lote(comandos: list[str], formato: str = "linhas") -> str:
+    """Executa vários comandos SQL em uma única chamada, retornando um resultado por comando.
+    Lote só de SELECTs: roda em uma única transação de leitura (todos veem o mesmo estado do banco).
+    Lote com escritas: roda inteiro em uma única transação de escrita; se um comando falhar, nada é gravado.
+    Retorna {"formato": "lote", "transacao", "confirmado", "resultados": [{"linhas"} | {"alteradas"} | {"erro"}]}."""
+    try:
+        if formato not in FORMATOS:
+            return serializar_compacto(resultado_erro(f"Erro: formato '{formato}' inválido (use {', '.join(FORMATOS)})"))
+        colunar = formato == "colunar"
+        validar_lote(comandos)
+        
+        if not tem_escrita(comandos):
+            resultados = []
+            with obter_pool().leitura() as conn:
+                conn.execute("BEGIN")  # Mesmo snapshot para todas as consultas
+                for comando in comandos:
+                    try:
+                        # Sem cache: um resultado guardado depois de uma escrita não é deste snapshot
+                        colunas, linhas = consultar(conn, otimizar_consulta(comando), usar_cache=False)
+                        resultados.append(resultado_consulta(colunas, linhas, colunar))
+                    except sqlite3.Error as e:
+                        resultados.append(resultado_erro(f"Erro SQL: {e}"))
+            return serializar_compacto(montar_lote("leitura", resultados, True))
+        
+        resultados = []
+        try:
+            with obter_pool().escrita() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                for comando in comandos:
+                    try:
+                        # Sem cache aqui: as consultas enxergam escritas ainda não confirmadas
+                        cursor = conn.execute(comando)
+                        if cursor.description is not None:
+                            colunas = [desc[0] for desc in cursor.description]
+                            resultados.append(resultado_consulta(colunas, cursor.fetchall(), colunar))
+                        else:
+                            resultados.append(resultado_escrita(cursor.rowcount))
+                    except sqlite3.Error as e:
+                        resultados.append(resultado_erro(f"Erro SQL: {e}"))
+                        raise LoteCancelado() from e
+        except LoteCancelado:
+            return serializar_compacto(montar_lote("escrita", completar_cancelados(resultados, len(comandos)), False))
+        cache_resultados.invalidar()
+        return serializar_compacto(montar_lote("escrita", resultados, True))
+        
+    except ValueError as e:
+        return serializar_compacto(resultado_erro(f"Erro: {e}"))
+    except Exception as e:
+        return serializar_compacto(resultado_erro(f"Erro: Não foi possível conectar ao banco de dados ({e})"))
+
+def estatisticas_banco() -> dict:
+    """Retorna as estatísticas do pool de conexões (tempos de espera por leitura e escrita), dos planos de consulta e do cache de resultados."""
+    return {**obter_pool().estatisticas(), "planos": monitor_planos.estatisticas(), "cache": cache_resultados.estatisticas(),
+            "cursores_paginacao": cursores_paginacao.estatisticas()}
+
+# --- BACKEND ASSÍNCRONO (aiosqlite) ---
+
+pool_async: PoolAssincrono | None = None
+_lock_pool_async: asyncio.Lock | None = None
+
+async def obter_pool_async() -> PoolAssincrono:
+    """Retorna o pool assíncrono, abrindo-o (e criando o schema) na primeira chamada"""
+    global pool_async, _lock_pool_async
+    if pool_async is None:
+        if _lock_pool_async is None:
+            _lock_pool_async = asyncio.Lock()
+        async with _lock_pool_async:
+            if pool_async is None:
+                pool_async = await PoolAssincrono(CAMINHO_BANCO).abrir()
+    return pool_async
+
+async def fechar_cursores_async(cursores: list[CursorAberto]) -> None:
+    for aberto in cursores:
+        await aberto.conexao.close()
+
+async def ler_continuacao_async(conn, query: str, offset: int, tamanho: int) -> tuple[list[str], list, str]:
+    """Versão aiosqlite de 'ler_continuacao'"""
+    with rastreador.span("sqlite.cursor") as atributos:
+        aberto, descartados = cursores_paginacao.retirar(query, offset)
+        await fechar_cursores_async(descartados)
+        atributos["continuado"] = aberto is not None
+        if aberto is None:
+            versao = await versao_dados_async(conn)
+            conexao = await conectar_async((await obter_pool_async()).caminho, somente_leitura=True)
+            try:
+                cursor = await conexao.execute(sql_continuacao(query), (offset,))
+            except Exception:
+                await conexao.close()
+                raise
+            aberto = CursorAberto(conexao, cursor, [desc[0] for desc in cursor.description], versao)
+            cursores_paginacao.abertos += 1
+        linhas = aberto.pendente + list(await aberto.cursor.fetchmany(tamanho + 1 - len(aberto.pendente)))
+        if len(linhas) > tamanho:
+            aberto.pendente = linhas[tamanho:]
+            await fechar_cursores_async(cursores_paginacao.guardar(query, offset + tamanho, aberto))
+        else:
+            await aberto.conexao.close()
+        return aberto.colunas, linhas, aberto.versao
+
+async def ler_dados_async(query: str = "SELECT * FROM times", tamanho_pagina: int = 0, token: str = None, formato: str = "linhas") -> list | dict | str:
+    """Lê dados da tabela 'times' usando uma query SELECT.
+    Com tamanho_pagina > 0 (ou um token de continuação) retorna uma página:
+    {"formato": "pagina", "linhas": [...], "proximo": token ou null, "versao": versão dos dados}.
+    Com formato="colunar" retorna {"colunas": [...], "linhas": [[...], ...]} em JSON compacto."""
     try:
-        cursor.execute(query)
-        resultados = cursor.fetchall()
+        if formato not in FORMATOS:
+            return [f"Erro: formato '{formato}' inválido (use {', '.join(FORMATOS)})"]
+        colunar = formato == "colunar"
+        
+        paginado = tamanho_pagina > 0 or bool(token)
+        if paginado:
+            query, offset, tamanho = parametros_pagina(query, tamanho_pagina, token)
+        # O token guarda a query recebida; a reescrita vale só para a execução
+        consulta = otimizar_consulta(query)
+        
+        pool_leitura = await obter_pool_async()
+        async with pool_leitura.leitura() as conn:
+            if monitor_planos.precisa_verificar(consulta):
+                async with conn.execute("EXPLAIN QUERY PLAN " + consulta) as cursor:
+                    plano = await cursor.fetchall()
+                registrar_varreduras(consulta, monitor_planos.registrar(consulta, plano))
+            
+            if paginado:
+                if offset:
+                    colunas, linhas, versao = await ler_continuacao_async(conn, consulta, offset, tamanho)
+                else:
+                    versao = await versao_dados_async(conn)
+                    colunas, linhas = await consultar_async(conn, sql_pagina(consulta), (tamanho + 1, offset))
+                pagina = montar_pagina(colunas, linhas, query, offset, tamanho, colunar, versao)
+                return serializar_compacto(pagina) if colunar else pagina
+            
+            colunas, resultados = await consultar_async(conn, consulta)
         
-        # Converter para lista de dicionários
-        colunas = [desc[0] for desc in cursor.description]
+        if colunar:
+            return codificar_colunar(colunas, resultados)
         return [dict(zip(colunas, row)) for row in resultados]
         
+    except ValueError as e:
+        return [f"Erro: {e}"]
     except sqlite3.Error as e:
         return [f"Erro SQL: {e}"]
-    finally:
-        if conn:
-            conn.close()
+    except Exception as e:
+        return [f"Erro: Não foi possível conectar ao banco de dados ({e})"]
 
-@mcp.tool()
-def adicionar_time(nome: str, estado: str = None, pontos: int = 0, vitorias: int = 0, empates: int = 0, derrotas: int = 0, saldo_gols: int = 0) -> str:
+async def adicionar_time_async(nome: str, estado: str = None, pontos: int = 0, vitorias: int = 0, empates: int = 0, derrotas: int = 0, saldo_gols: int = 0) -> str:
     """Adiciona um novo time à tabela 'times' com os parâmetros fornecidos."""
-    conn, cursor = init_db()
-    
-    # Verifica se a conexão foi estabelecida corretamente
-    if conn is None or cursor is None:
-        return "Erro: Não foi possível conectar ao banco de dados"
-    
     try:
-        # Verifica se o time já existe
-        cursor.execute("SELECT id FROM times WHERE nome = ?", (nome,))
-        if cursor.fetchone():
-            return f"Erro: Time '{nome}' já existe no banco de dados"
-        
-        # Insere o novo time
-        cursor.execute("""
-            INSERT INTO times (nome, estado, pontos, vitorias, empates, derrotas, saldo_gols)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (nome, estado, pontos, vitorias, empates, derrotas, saldo_gols))
-        
-        conn.commit()
+        pool_escrita = await obter_pool_async()
+        async with pool_escrita.escrita() as conn:
+            async with conn.execute("SELECT id FROM times WHERE nome = ?", (nome,)) as cursor:
+                if await cursor.fetchone():
+                    return f"Erro: Time '{nome}' já existe no banco de dados"
+            
+            await conn.execute("""
+                INSERT INTO times (nome, estado, pontos, vitorias, empates, derrotas, saldo_gols)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (nome, estado, pontos, vitorias, empates, derrotas, saldo_gols))
+        cache_resultados.invalidar()
+        
         return f"Time '{nome}' adicionado com sucesso ao banco de dados"
         
     except sqlite3.Error as e:
         return f"Erro ao adicionar time: {e}"
-    finally:
-        if conn:
-            conn.close()
+    except Exception as e:
+        return f"Erro: Não foi possível conectar ao banco de dados ({e})"
 
-@mcp.tool()
-def adicionar_dados(query: str) -> str:
+async def adicionar_dados_async(query: str) -> str:
     """Adiciona um novo registro à tabela 'times' usando uma query INSERT."""
-    conn, cursor = init_db()
-    
-    # Verifica se a conexão foi estabelecida corretamente
-    if conn is None or cursor is None:
-        return "Erro: Não foi possível conectar ao banco de dados"
-    
     try:
-        cursor.execute(query)
-        conn.commit()
+        pool_escrita = await obter_pool_async()
+        async with pool_escrita.escrita() as conn:
+            await conn.execute(query)
+        cache_resultados.invalidar()
         return "Dados adicionados com sucesso"
     except sqlite3.Error as e:
         return f"Erro ao adicionar dados: {e}"
+    except Exception as e:
+        return f"Erro: Não foi possível conectar ao banco de dados ({e})"
+
+async def adicionar_partida_async(data: str, mandante: str, visitante: str, gols_mandante: int = None, gols_visitante: int = None) -> str:
+    """Registra uma partida entre dois times já cadastrados. A classificação em 'times' é atualizada automaticamente."""
+    try:
+        pool_escrita = await obter_pool_async()
+        async with pool_escrita.escrita() as conn:
+            cursor = await conn.execute(SQL_INSERIR_PARTIDA, parametros_partida(data, mandante, visitante, gols_mandante, gols_visitante))
+            if cursor.rowcount != 1:
+                return f"Erro: Time '{mandante}' ou '{visitante}' não encontrado no banco de dados"
+        cache_resultados.invalidar()
+        return f"Partida {mandante} x {visitante} registrada com sucesso"
+    except sqlite3.Error as e:
+        return f"Erro ao registrar partida: {e}"
+    except Exception as e:
+        return f"Erro: Não foi possível conectar ao banco de dados ({e})"
+
+async def executar_lote_async(comandos: list[str], formato: str = "linhas") -> str:
+    """Executa vários comandos SQL em uma única chamada, retornando um resultado por comando.
+    Lote só de SELECTs: roda em uma única transação de leitura (todos veem o mesmo estado do banco).
+    Lote com escritas: roda inteiro em uma única transação de escrita; se um comando falhar, nada é gravado.
+    Retorna {"formato": "lote", "transacao", "confirmado", "resultados": [{"linhas"} | {"alteradas"} | {"erro"}]}."""
+    try:
+        if formato not in FORMATOS:
+            return serializar_compacto(resultado_erro(f"Erro: formato '{formato}' inválido (use {', '.join(FORMATOS)})"))
+        colunar = formato == "colunar"
+        validar_lote(comandos)
+        pool_lote = await obter_pool_async()
+        
+        if not tem_escrita(comandos):
+            resultados = []
+            async with pool_lote.leitura() as conn:
+                await conn.execute("BEGIN")  # Mesmo snapshot para todas as consultas
+                for comando in comandos:
+                    try:
+                        # Sem cache: um resultado guardado depois de uma escrita não é deste snapshot
+                        colunas, linhas = await consultar_async(conn, otimizar_consulta(comando), usar_cache=False)
+                        resultados.append(resultado_consulta(colunas, linhas, colunar))
+                    except sqlite3.Error as e:
+                        resultados.append(resultado_erro(f"Erro SQL: {e}"))
+            return serializar_compacto(montar_lote("leitura", resultados, True))
+        
+        resultados = []
+        try:
+            async with pool_lote.escrita() as conn:
+                await conn.execute("BEGIN IMMEDIATE")
+                for comando in comandos:
+                    try:
+                        # Sem cache aqui: as consultas enxergam escritas ainda não confirmadas
+                        async with conn.execute(comando) as cursor:
+                            if cursor.description is not None:
+                                colunas = [desc[0] for desc in cursor.description]
+                                resultados.append(resultado_consulta(colunas, await cursor.fetchall(), colunar))
+                            else:
+                                resultados.append(resultado_escrita(cursor.rowcount))
+                    except sqlite3.Error as e:
+                        resultados.append(resultado_erro(f"Erro SQL: {e}"))
+                        raise LoteCancelado() from e
+        except LoteCancelado:
+            return serializar_compacto(montar_lote("escrita", completar_cancelados(resultados, len(comandos)), False))
+        cache_resultados.invalidar()
+        return serializar_compacto(montar_lote("escrita", resultados, True))
+        
+    except ValueError as e:
+        return serializar_compacto(resultado_erro(f"Erro: {e}"))
+    except Exception as e:
+        return serializar_compacto(resultado_erro(f"Erro: Não foi possível conectar ao banco de dados ({e})"))
+
+async def estatisticas_banco_async() -> dict:
+    """Retorna as estatísticas do pool de conexões (tempos de espera por leitura e escrita), dos planos de consulta e do cache de resultados."""
+    return {**(await obter_pool_async()).estatisticas(), "planos": monitor_planos.estatisticas(), "cache": cache_resultados.estatisticas()}
+
+# --- REGISTRO DAS FERRAMENTAS ---
+
+# Os nomes expostos pelo MCP são os mesmos nos dois backends
+FERRAMENTAS = {
+    "sync": [ler_dados, adicionar_time, adicionar_dados, adicionar_partida, executar_lote, estatisticas_banco],
+    "async": [ler_dados_async, adicionar_time_async, adicionar_dados_async, adicionar_partida_async,
+              executar_lote_async, estatisticas_banco_async],
+}
+
+async def servir(transporte: str) -> None:
+    """Roda o servidor MCP e, ao encerrar, fecha o pool aiosqlite (as threads dele impediriam o processo de sair)"""
+    global pool_async
+    try:
+        if transporte == "sse":
+            await mcp.run_sse_async()
+        else:
+            await mcp.run_stdio_async()
     finally:
-        if conn:
-            conn.close()
+        rastreador.fechar()
+        if pool_async is not None:
+            await fechar_cursores_async(cursores_paginacao.esvaziar())
+            await pool_async.fechar()
+            pool_async = None
+        else:
+            fechar_cursores(cursores_paginacao.esvaziar())
+
+def em_thread(funcao):
+    """Ferramenta síncrona como corrotina que roda em uma thread do anyio: o FastMCP chamaria
+    a função direto no event loop, e uma consulta lenta travaria os outros clientes (com um
+    leitor do pool emprestado por vez). O contextvar do id da requisição vai junto para a thread."""
+    @functools.wraps(funcao)
+    async def envoltorio(*args, **kwargs):
+        return await anyio.to_thread.run_sync(functools.partial(funcao, *args, **kwargs))
+    return envoltorio
+
+def registrar_ferramentas(backend: str = "sync") -> None:
+    """Registra no FastMCP as ferramentas do backend escolhido ('sync' ou 'async')"""
+    for funcao in FERRAMENTAS[backend]:
+        nome = funcao.__name__.removesuffix("_async")
+        if backend == "sync":
+            funcao = em_thread(funcao)
+        # Sem saída estruturada: o resultado já vai no conteúdo de texto, que é o que o cliente lê.
+        # Cada ferramenta ganha um span e o parâmetro opcional 'id_requisicao'.
+        mcp.add_tool(rastreador.rastrear_ferramenta(funcao, nome), name=nome, description=funcao.__doc__,
+                     structured_output=False)
 
 if __name__ == "__main__":
     console.print(Panel.fit("🚀 Iniciando servidor MCP do Brasileirão...", border_style="green", title="Servidor"))
     
-    # Inicializa o banco de dados
-    conn, cursor = init_db()
-    if conn and cursor:
-        console.print(Panel.fit("✅ Banco de dados inicializado com sucesso!", border_style="green", title="Banco de Dados"))
-        conn.close()
-    else:
-        console.print(Panel.fit("❌ Erro ao inicializar banco de dados", border_style="red", title="Erro"))
-    
     parser = argparse.ArgumentParser()
     parser.add_argument("--server_type", type=str, default="sse", choices=["sse", "stdio"])
+    parser.add_argument("--db_backend", type=str, default="sync", choices=["sync", "async"],
+                        help="sync roda as ferramentas em threads com o pool sqlite3; async usa aiosqlite no "
+                             "event loop (ver benchmarks/carga_mcp.py)")
+    parser.add_argument("--cache_mb", type=float, default=32, help="memória do cache de resultados (0 desativa)")
+    parser.add_argument("--spans", type=str, default="", help="arquivo JSONL dos spans (ex.: spans_servidor.jsonl; vazio desativa)")
+    parser.add_argument("--port", type=int, default=8000, help="porta HTTP do modo sse")
     args = parser.parse_args()
+    
+    rastreador.exportar_jsonl(args.spans or None)
+    mcp.settings.port = args.port
+    
+    cache_resultados.max_bytes = int(args.cache_mb * 1024 * 1024)
+    if args.cache_mb <= 0:
+        cache_resultados.max_entradas = 0
+    
+    # Inicializa o banco de dados (schema + pool de conexões, uma única vez).
+    # No backend async o pool é aberto dentro do event loop do servidor, na primeira chamada.
+    if args.db_backend == "sync":
+        try:
+            obter_pool()
+            console.print(Panel.fit("✅ Banco de dados inicializado com sucesso!", border_style="green", title="Banco de Dados"))
+        except Exception as e:
+            console.print(Panel.fit(f"❌ Erro ao inicializar banco de dados: {e}", border_style="red", title="Erro"))
+    
+    registrar_ferramentas(args.db_backend)
+    console.print(Panel.fit(f"🗄️ Backend do banco: {args.db_backend}", border_style="cyan", title="Banco de Dados"))
 
     console.print(Panel.fit(f"🌐 Servidor rodando em modo {args.server_type}", border_style="cyan", title="Modo"))
-    mcp.run(args.server_type)
\ No newline at end of file
+    asyncio.run(servir(args.server_type))
\ No newline at end of file
@@ -0,0 +1,67 @@
+import time
+
+from metricas import EstatisticaLatencia
+
+
+def fim_da_instrucao(texto: str) -> int | None:
+    """Posição logo após o primeiro ';' fora de aspas simples, ou None se a instrução ainda não terminou."""
+    em_aspas = False
+    for i, c in enumerate(texto):
+        if c == "'":
+            # '' dentro de uma string é um apóstrofo escapado; alternar duas vezes mantém o estado
+            em_aspas = not em_aspas
+        elif c == ";" and not em_aspas:
+            return i + 1
+    return None
+
+
+class MetricasGeracao:
+    """Tempo até o primeiro token, tempo total de geração e pedaços recebidos por requisição."""
+
+    def __init__(self):
+        self.primeiro_token = EstatisticaLatencia()
+        self.geracao_total = EstatisticaLatencia()
+        self.pedacos = 0
+        self.interrompidas = 0
+
+    def resumo(self) -> dict:
+        return {
+            "ttft": self.primeiro_token.resumo(),
+            "total": self.geracao_total.resumo(),
+            "pedacos_medios": round(self.pedacos / self.geracao_total.total, 1) if self.geracao_total.total else 0,
+            "interrompidas": self.interrompidas,
+        }
+
+
+async def completar_ate_sql(llm, prompt: str, metricas: MetricasGeracao | None = None) -> str:
+    """
+    Gera a resposta em streaming e encerra a geração assim que uma instrução SQL completa
+    (terminada em ';') aparece. Retorna o texto bruto até o ';' (a limpeza fica com quem chama).
+    """
+    inicio = time.perf_counter()
+    texto = ""
+    pedacos = 0
+    interrompida = False
+
+    stream = await llm.astream_complete(prompt)
+    try:
+        async for resposta in stream:
+            if pedacos == 0 and metricas is not None:
+                metricas.primeiro_token.registrar(time.perf_counter() - inicio)
+            pedacos += 1
+            texto += resposta.delta or ""
+            fim = fim_da_instrucao(texto)
+            if fim is not None:
+                texto = texto[:fim]
+                interrompida = True
+                break
+    finally:
+        # Fechar o gerador encerra a conexão com o Ollama, que para de gerar tokens
+        await stream.aclose()
+
+    if metricas is not None:
+        metricas.geracao_total.registrar(time.perf_counter() - inicio)
+        metricas.pedacos += pedacos
+        if interrompida:
+            metricas.interrompidas += 1
+    return texto
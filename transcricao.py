@@ -0,0 +1,224 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import audio
+from asr import BackendWhisper
+from metricas import EstatisticaLatencia
+
+# Áudios até esta duração cabem em uma única janela do Whisper e podem ser decodificados em lote
+DURACAO_MAXIMA_LOTE_S = 30.0
+
+
+class _ModeloResidente:
+    """Modelo carregado + lock (os modelos não são seguros para inferência concorrente)."""
+
+    def __init__(self, modelo, memoria_mb: float):
+        self.modelo = modelo
+        self.memoria_mb = memoria_mb
+        self.lock = threading.Lock()
+
+
+class ServicoTranscricao:
+    """
+    Mantém os modelos de ASR residentes em memória (LRU por nome, com limite de memória)
+    e executa a transcrição em um pool limitado de threads, fora do event loop do bot.
+    O motor de ASR vem de 'backend' (asr.py); o padrão é o openai-whisper.
+
+    Áudios curtos que chegam juntos (dentro de 'janela_lote' segundos) são transcritos em
+    lote, com até 'max_lote' por passada do modelo; max_lote=1 desliga o agrupamento.
+    """
+
+    def __init__(self, max_modelos: int = 2, limite_memoria_mb: float = 4096,
+                 max_workers: int = 1, idioma: str = "pt", backend=None,
+                 max_lote: int = 8, janela_lote: float = 0.05):
+        self.max_modelos = max_modelos
+        self.limite_memoria_mb = limite_memoria_mb
+        self.idioma = idioma
+        self.backend = backend or BackendWhisper()
+        self.max_lote = max_lote
+        self.janela_lote = janela_lote
+        # Lote em formação por modelo: [(áudio, futuro, enfileirado_em)] e o temporizador que o despacha
+        self._lotes: dict[str, list] = {}
+        self._temporizadores: dict[str, asyncio.TimerHandle] = {}
+        self._modelos: OrderedDict[str, _ModeloResidente] = OrderedDict()
+        self._lock_modelos = threading.Lock()
+        # Threads (e não processos) para que os modelos carregados sejam compartilhados
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asr")
+
+        # Métricas
+        self._lock_fila = threading.Lock()
+        self.na_fila = 0
+        self.em_execucao = 0
+        self.carregamentos = 0
+        self.despejos = 0
+        self.lotes = 0
+        self.itens_em_lote = 0
+        self.espera = EstatisticaLatencia()
+        self.inferencia = EstatisticaLatencia()
+        self.carga_modelo = EstatisticaLatencia()
+
+    # --- Cache LRU de modelos ---
+
+    def _memoria_total_mb(self) -> float:
+        return sum(m.memoria_mb for m in self._modelos.values())
+
+    def _obter_modelo(self, nome: str) -> _ModeloResidente:
+        with self._lock_modelos:
+            residente = self._modelos.get(nome)
+            if residente is not None:
+                self._modelos.move_to_end(nome)
+                return residente
+
+            # Carrega com o lock para evitar carregar o mesmo modelo duas vezes
+            inicio = time.perf_counter()
+            modelo = self.backend.carregar(nome)
+            self.carga_modelo.registrar(time.perf_counter() - inicio)
+            self.carregamentos += 1
+
+            residente = _ModeloResidente(modelo, self.backend.memoria_mb(modelo))
+            self._modelos[nome] = residente
+            self._despejar_excedentes(manter=nome)
+            return residente
+
+    def _despejar_excedentes(self, manter: str) -> None:
+        """Remove os modelos menos usados até respeitar os limites de quantidade e memória."""
+        while len(self._modelos) > 1 and (
+            len(self._modelos) > self.max_modelos
+            or self._memoria_total_mb() > self.limite_memoria_mb
+        ):
+            nome_antigo = next(iter(self._modelos))
+            if nome_antigo == manter:
+                break
+            del self._modelos[nome_antigo]
+            self.despejos += 1
+
+    def definir_backend(self, backend) -> None:
+        """Troca o motor de ASR; os modelos do backend anterior são descartados."""
+        with self._lock_modelos:
+            self.backend = backend
+            self._modelos.clear()
+
+    def modelos_carregados(self) -> list[str]:
+        with self._lock_modelos:
+            return list(self._modelos.keys())
+
+    def pre_carregar(self, nome: str = "small") -> None:
+        """Carrega o modelo antecipadamente (útil na inicialização)."""
+        self._obter_modelo(nome)
+
+    # --- Execução ---
+
+    def _transcrever_sync(self, entrada, nome: str, enfileirado_em: float) -> str:
+        with self._lock_fila:
+            self.na_fila -= 1
+            self.em_execucao += 1
+        self.espera.registrar(time.perf_counter() - enfileirado_em)
+        try:
+            residente = self._obter_modelo(nome)
+            with residente.lock, self.inferencia.medir():
+                return self.backend.transcrever(residente.modelo, entrada, self.idioma)
+        finally:
+            with self._lock_fila:
+                self.em_execucao -= 1
+
+    def _transcrever_lote_sync(self, audios: list, nome: str, enfileirados: list[float]) -> list[str]:
+        with self._lock_fila:
+            self.na_fila -= len(audios)
+            self.em_execucao += len(audios)
+        agora = time.perf_counter()
+        for enfileirado_em in enfileirados:
+            self.espera.registrar(agora - enfileirado_em)
+        try:
+            residente = self._obter_modelo(nome)
+            with residente.lock, self.inferencia.medir():
+                if len(audios) == 1:
+                    return [self.backend.transcrever(residente.modelo, audios[0], self.idioma)]
+                textos = self.backend.transcrever_lote(residente.modelo, audios, self.idioma)
+            self.lotes += 1
+            self.itens_em_lote += len(audios)
+            return textos
+        finally:
+            with self._lock_fila:
+                self.em_execucao -= len(audios)
+
+    def _despachar_lote(self, nome: str) -> None:
+        temporizador = self._temporizadores.pop(nome, None)
+        if temporizador is not None:
+            temporizador.cancel()
+        lote = self._lotes.pop(nome, None)
+        if not lote:
+            return
+
+        futuros = [futuro for _, futuro, _ in lote]
+
+        def distribuir(tarefa):
+            for i, futuro in enumerate(futuros):
+                if futuro.done():
+                    continue
+                if tarefa.exception() is not None:
+                    futuro.set_exception(tarefa.exception())
+                else:
+                    futuro.set_result(tarefa.result()[i])
+
+        tarefa = asyncio.get_running_loop().run_in_executor(
+            self._executor, self._transcrever_lote_sync,
+            [a for a, _, _ in lote], nome, [t for _, _, t in lote],
+        )
+        tarefa.add_done_callback(distribuir)
+
+    async def _transcrever_em_lote(self, entrada: np.ndarray, nome: str) -> str:
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+        with self._lock_fila:
+            self.na_fila += 1
+        lote = self._lotes.setdefault(nome, [])
+        lote.append((entrada, futuro, time.perf_counter()))
+        if len(lote) >= self.max_lote:
+            self._despachar_lote(nome)
+        elif len(lote) == 1:
+            self._temporizadores[nome] = loop.call_later(self.janela_lote, self._despachar_lote, nome)
+        return await futuro
+
+    async def transcrever(self, entrada, modelo: str = "small") -> str:
+        """
+        Transcreve 'entrada' sem bloquear o event loop. Aceita os bytes do áudio (decodificados
+        em memória, sem arquivo temporário), um array float32 de 16 kHz ou o caminho de um arquivo.
+        """
+        if isinstance(entrada, (bytes, bytearray)):
+            entrada = await asyncio.to_thread(audio.preparar, bytes(entrada))
+            if len(entrada) == 0:
+                return ""  # Só silêncio
+        if (self.max_lote > 1 and isinstance(entrada, np.ndarray)
+                and audio.duracao_s(entrada) <= DURACAO_MAXIMA_LOTE_S):
+            return await self._transcrever_em_lote(entrada, modelo)
+
+        with self._lock_fila:
+            self.na_fila += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._transcrever_sync, entrada, modelo, time.perf_counter()
+        )
+
+    def metricas(self) -> dict:
+        return {
+            "na_fila": self.na_fila,
+            "em_execucao": self.em_execucao,
+            "backend": self.backend.nome,
+            "modelos": self.modelos_carregados(),
+            "memoria_mb": round(self._memoria_total_mb(), 1),
+            "carregamentos": self.carregamentos,
+            "despejos": self.despejos,
+            "lotes": self.lotes,
+            "itens_por_lote": round(self.itens_em_lote / self.lotes, 1) if self.lotes else 0,
+            "espera": self.espera.resumo(),
+            "inferencia": self.inferencia.resumo(),
+            "carga_modelo": self.carga_modelo.resumo(),
+        }
+
+    def encerrar(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
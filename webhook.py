@@ -0,0 +1,219 @@
+import asyncio
+import hmac
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from aiohttp import web
+from telebot.types import Update
+
+from metricas import EstatisticaLatencia
+
+
+class DeduplicadorUpdates:
+    """
+    Lembra os update_id já recebidos: o Telegram reenvia o update se não receber o 200 a tempo,
+    e ele não deve ser respondido duas vezes.
+
+    - Sem 'caminho', guarda os últimos 'max_ids' em memória (uma instância do bot).
+    - Com 'caminho', usa uma tabela SQLite compartilhada: várias instâncias do bot atrás do mesmo
+      proxy descartam os reenvios umas das outras.
+    """
+
+    def __init__(self, max_ids: int = 10000, caminho: str | None = None):
+        self.max_ids = max_ids
+        self.caminho = caminho
+        self._vistos: OrderedDict[int, None] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if caminho:
+            self._conn = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA busy_timeout=5000")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS updates_recebidos (update_id INTEGER PRIMARY KEY, recebido_em REAL)"
+            )
+
+    def novo(self, update_id: int) -> bool:
+        """Registra o update_id; retorna False se ele já tinha sido recebido."""
+        with self._lock:
+            if self._conn is not None:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO updates_recebidos (update_id, recebido_em) VALUES (?, ?)",
+                    (update_id, time.time()),
+                )
+                if cursor.rowcount and update_id % 1000 == 0:
+                    # Limpeza ocasional: os update_id crescem, os antigos não voltam
+                    self._conn.execute("DELETE FROM updates_recebidos WHERE update_id < ?", (update_id - self.max_ids,))
+                return cursor.rowcount == 1
+
+            if update_id in self._vistos:
+                return False
+            self._vistos[update_id] = None
+            while len(self._vistos) > self.max_ids:
+                self._vistos.popitem(last=False)
+            return True
+
+    def fechar(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+
+
+# Campos do update que trazem uma mensagem (com o chat em message["chat"]["id"])
+CAMPOS_MENSAGEM = ("message", "edited_message", "channel_post", "edited_channel_post",
+                   "business_message", "edited_business_message")
+
+
+def chat_do_update(dados: dict) -> int:
+    """Chat (ou usuário) a que o update pertence; sem nenhum dos dois, o próprio update_id."""
+    for campo in CAMPOS_MENSAGEM:
+        if isinstance(dados.get(campo), dict):
+            return dados[campo]["chat"]["id"]
+    for valor in dados.values():
+        if isinstance(valor, dict):
+            mensagem = valor.get("message")
+            if isinstance(mensagem, dict) and "chat" in mensagem:
+                return mensagem["chat"]["id"]  # ex.: callback_query de um botão
+            if isinstance(valor.get("from"), dict):
+                return valor["from"]["id"]
+    return dados["update_id"]
+
+
+def rodadas_por_chat(lote: list) -> list[list]:
+    """
+    Divide o lote [(dados, recebido_em), ...] em rodadas com no máximo um update por chat,
+    na ordem de chegada: rodadas seguidas nunca invertem dois updates do mesmo chat.
+    """
+    rodadas: list[list] = []
+    proxima_rodada: dict[int, int] = {}
+    for item in lote:
+        chat = chat_do_update(item[0])
+        indice = proxima_rodada.get(chat, 0)
+        if indice == len(rodadas):
+            rodadas.append([])
+        rodadas[indice].append(item)
+        proxima_rodada[chat] = indice + 1
+    return rodadas
+
+
+class ServidorWebhook:
+    """
+    Recebe os updates do Telegram por HTTP (webhook) em vez de long polling:
+
+    - POST em 'caminho' com o update em JSON; o segredo (setWebhook secret_token) é conferido
+      no cabeçalho X-Telegram-Bot-Api-Secret-Token;
+    - o update é deduplicado pelo update_id, vai para a fila do seu worker e a resposta 200 sai na hora;
+    - há uma fila por worker ('workers'), escolhida pelo chat do update: os updates de um mesmo chat
+      passam sempre pelo mesmo worker, que os entrega aos handlers na ordem de chegada
+      (bot.process_new_updates, até 'max_lote' por vez, com no máximo um update por chat em cada
+      chamada). Depois disso a ordem segue nas filas por chat do agendador dos handlers;
+    - fila cheia responde 503, e o Telegram reenvia o update mais tarde ('max_fila' é dividido
+      entre as filas dos workers);
+    - GET /saude devolve as métricas em JSON.
+    """
+
+    CABECALHO_SEGREDO = "X-Telegram-Bot-Api-Secret-Token"
+
+    def __init__(self, bot, caminho: str = "/webhook", segredo: str | None = None, workers: int = 8,
+                 max_fila: int = 1000, max_lote: int = 32, deduplicador: DeduplicadorUpdates | None = None):
+        self.bot = bot
+        self.caminho = caminho
+        self.segredo = segredo
+        self.workers = workers
+        self.max_lote = max_lote
+        self.deduplicador = deduplicador or DeduplicadorUpdates()
+        self._filas: list[asyncio.Queue] = [asyncio.Queue(maxsize=-(-max_fila // workers)) for _ in range(workers)]
+        self._tarefas: list[asyncio.Task] = []
+        self._runner: web.AppRunner | None = None
+
+        self.recebidos = 0
+        self.duplicados = 0
+        self.rejeitados = 0
+        self.processados = 0
+        self.falhas = 0
+        self.espera = EstatisticaLatencia()
+
+    def criar_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(self.caminho, self._receber)
+        app.router.add_get("/saude", self._saude)
+        return app
+
+    async def _receber(self, request: web.Request) -> web.Response:
+        if self.segredo and not hmac.compare_digest(request.headers.get(self.CABECALHO_SEGREDO, ""), self.segredo):
+            return web.Response(status=401)
+        try:
+            dados = json.loads(await request.read())
+            update_id = int(dados["update_id"])
+        except (ValueError, KeyError, TypeError):
+            return web.Response(status=400)
+
+        try:
+            fila = self._filas[hash(chat_do_update(dados)) % self.workers]
+        except (KeyError, TypeError):
+            return web.Response(status=400)
+        if fila.full():
+            # Sem registrar no deduplicador: o reenvio do Telegram ainda será aceito
+            self.rejeitados += 1
+            return web.Response(status=503)
+        if not self.deduplicador.novo(update_id):
+            self.duplicados += 1
+            return web.Response()
+        self.recebidos += 1
+        fila.put_nowait((dados, time.perf_counter()))
+        return web.Response()
+
+    async def _saude(self, request: web.Request) -> web.Response:
+        return web.json_response(self.metricas())
+
+    async def _worker(self, fila: asyncio.Queue) -> None:
+        while True:
+            # Os updates que já estiverem na fila vão juntos para o bot (até 'max_lote')
+            lote = [await fila.get()]
+            while len(lote) < self.max_lote and not fila.empty():
+                lote.append(fila.get_nowait())
+            agora = time.perf_counter()
+            for _, recebido_em in lote:
+                self.espera.registrar(agora - recebido_em)
+            # O bot roda os updates de uma chamada em paralelo: dois do mesmo chat vão em chamadas seguidas
+            for rodada in rodadas_por_chat(lote):
+                try:
+                    await self.bot.process_new_updates([Update.de_json(dados) for dados, _ in rodada])
+                    self.processados += len(rodada)
+                except Exception:
+                    # Um lote com problema não derruba o worker
+                    self.falhas += len(rodada)
+            for _ in lote:
+                fila.task_done()
+
+    async def iniciar(self, host: str = "0.0.0.0", porta: int = 8443) -> None:
+        """Sobe o servidor HTTP e os workers (não bloqueia)."""
+        self._tarefas = [asyncio.create_task(self._worker(fila)) for fila in self._filas]
+        self._runner = web.AppRunner(self.criar_app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, porta).start()
+
+    async def parar(self) -> None:
+        """Para de receber, espera a fila esvaziar e encerra os workers."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        for fila in self._filas:
+            await fila.join()
+        for tarefa in self._tarefas:
+            tarefa.cancel()
+        self._tarefas = []
+        self.deduplicador.fechar()
+
+    def metricas(self) -> dict:
+        return {
+            "recebidos": self.recebidos,
+            "duplicados": self.duplicados,
+            "rejeitados_fila_cheia": self.rejeitados,
+            "processados": self.processados,
+            "falhas": self.falhas,
+            "na_fila": sum(fila.qsize() for fila in self._filas),
+            "espera_fila": self.espera.resumo(),
+        }